@@ -0,0 +1,36 @@
+"""
+Datos del lead: país por teléfono (config.py) y tier de cualificación
+(services/challenges_research.py)
+"""
+import pytest
+
+from config import detect_country
+from services.challenges_research import calcular_qualification_tier
+
+pytestmark = pytest.mark.benchmark(group="lead")
+
+# E.164 sin el +, como llegan en el webhook de WhatsApp
+TELEFONOS = [
+    "5493415551234",  # Rosario
+    "5491112345678",  # Buenos Aires
+    "5493516543210",  # Córdoba
+    "5219843162719",  # Playa del Carmen
+    "5215512345678",  # CDMX
+    "5511912345678",  # São Paulo
+    "15125551234",  # Austin
+    "34665989983",  # España móvil
+    "56912345678",  # Chile
+    "573001234567",  # Colombia
+    "59899123456",  # Uruguay
+    "99912345678",  # Sin país
+]
+
+
+def bench_detect_country(benchmark):
+    resultados = benchmark(lambda: [detect_country(t) for t in TELEFONOS])
+    assert resultados[0]["country"] != "Desconocido"
+
+
+def bench_calcular_qualification_tier(benchmark, lead):
+    resultado = benchmark(calcular_qualification_tier, **lead)
+    assert resultado["tier"]
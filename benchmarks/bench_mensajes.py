@@ -0,0 +1,24 @@
+"""
+Respuestas del agente antes de salir por WhatsApp
+(utils/text_cleaner.py y services/whatsapp.py)
+"""
+import pytest
+
+from services.whatsapp import split_long_message, MAX_MESSAGE_LENGTH
+from utils.text_cleaner import clean_markdown_formatting
+
+pytestmark = pytest.mark.benchmark(group="mensajes")
+
+
+@pytest.mark.parametrize("fixture", ["respuesta_agente", "informe_diagnostico"])
+def bench_clean_markdown_formatting(benchmark, request, fixture):
+    texto = request.getfixturevalue(fixture)
+    limpio = benchmark(clean_markdown_formatting, texto)
+    assert "**" not in limpio
+
+
+@pytest.mark.parametrize("max_length", [MAX_MESSAGE_LENGTH, 1000])
+def bench_split_long_message(benchmark, informe_diagnostico, max_length):
+    mensaje = clean_markdown_formatting(informe_diagnostico)
+    partes = benchmark(split_long_message, mensaje, max_length)
+    assert all(len(p) <= max_length for p in partes)
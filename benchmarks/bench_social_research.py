@@ -0,0 +1,49 @@
+"""
+Validación de perfiles de LinkedIn y variantes de ubicación
+(services/social_research.py)
+"""
+import pytest
+
+from services.social_research import (calcular_peso_linkedin,
+                                      obtener_variantes_ubicacion,
+                                      EvaluadorLinkedin)
+
+pytestmark = pytest.mark.benchmark(group="social_research")
+
+
+def _candidatos(linkedin_candidatos: dict) -> list:
+    return [(r["url"], f"{r['titulo']} {r['snippet']}")
+            for r in linkedin_candidatos["resultados"]]
+
+
+def bench_calcular_peso_linkedin(benchmark, linkedin_candidatos):
+    """Los ~20 resultados de una búsqueda, uno por uno."""
+    persona = linkedin_candidatos["persona"]
+    candidatos = _candidatos(linkedin_candidatos)
+
+    def _pesar():
+        return [
+            calcular_peso_linkedin(url, texto, **persona)
+            for url, texto in candidatos
+        ]
+
+    pesos = benchmark(_pesar)
+    assert max(pesos) >= 90
+
+
+def bench_evaluador_linkedin_pesos(benchmark, linkedin_candidatos):
+    """Lo mismo con un evaluador por búsqueda (como los call sites)."""
+    persona = linkedin_candidatos["persona"]
+    candidatos = _candidatos(linkedin_candidatos)
+
+    pesos = benchmark(lambda: EvaluadorLinkedin(**persona).pesos(candidatos))
+    assert max(pesos) >= 90
+
+
+@pytest.mark.parametrize("ubicacion", [
+    "Argentina", "Santa Fe", "Rosario", "CDMX", "São Paulo", "Springfield"
+])
+def bench_obtener_variantes_ubicacion(benchmark, ubicacion):
+    # Springfield no está en el diccionario: recorre todo
+    variantes = benchmark(obtener_variantes_ubicacion, ubicacion)
+    assert variantes
@@ -0,0 +1,41 @@
+"""
+Extracción de datos del sitio del lead (services/web_extractor.py)
+Se corren sobre all_content tal como lo arma extract_web_data.
+"""
+import pytest
+
+from services.web_extractor import (extract_with_regex, extract_schema_org,
+                                    merge_results,
+                                    extraer_direccion_por_contexto,
+                                    extraer_cargo_de_equipo)
+
+pytestmark = pytest.mark.benchmark(group="web_extractor")
+
+
+def bench_extract_with_regex(benchmark, sitio):
+    resultado = benchmark(extract_with_regex, sitio["all_content"])
+    assert resultado["emails"]
+
+
+def bench_extract_schema_org(benchmark, sitio):
+    benchmark(extract_schema_org, sitio["all_content"])
+
+
+def bench_merge_results(benchmark, sitio):
+    resultado = benchmark(merge_results, sitio["gpt_data"],
+                          sitio["regex_data"], "", sitio["website"],
+                          sitio["all_content"])
+    assert resultado["business_name"] == sitio["gpt_data"]["business_name"]
+
+
+def bench_extraer_direccion_por_contexto(benchmark, sitio):
+    benchmark(extraer_direccion_por_contexto, sitio["all_content"])
+
+
+@pytest.mark.parametrize("con_nombre", [True, False],
+                         ids=["con_nombre", "sin_nombre"])
+def bench_extraer_cargo_de_equipo(benchmark, sitio, con_nombre):
+    # Mismo contenido que arma extract_web_data para el paso 10B
+    contenido = sitio["secundarias_content"] + "\n" + sitio["main_content"]
+    nombre = sitio["contacto"] if con_nombre else ""
+    benchmark(extraer_cargo_de_equipo, contenido, nombre)
@@ -0,0 +1,113 @@
+"""
+Benchmarks offline de las funciones puras del camino caliente
+Sin red ni MongoDB: todo sale de fixtures/ (HTML y markdown guardados
+de sitios reales de ejemplo, resultados de LinkedIn, leads y
+respuestas del agente).
+
+Uso (desde la raíz del repo):
+    pip install -r benchmarks/requirements.txt
+    python -m pytest benchmarks
+
+Cada corrida queda en benchmarks/.results/ con el id del commit. Para
+comparar contra la anterior y fallar si algo empeoró más de un 10%:
+    python -m pytest benchmarks --benchmark-compare \\
+        --benchmark-compare-fail=mean:10%
+Contra una corrida puntual: --benchmark-compare=0003
+Listar las guardadas: pytest-benchmark --storage \\
+    file://benchmarks/.results list
+"""
+import sys
+import json
+from pathlib import Path
+
+import pytest
+
+RAIZ = Path(__file__).resolve().parent.parent
+if str(RAIZ) not in sys.path:
+    sys.path.insert(0, str(RAIZ))
+
+from services.web_extractor import extract_with_regex  # noqa: E402
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+SITIOS = ["constructora_rosario", "estudio_contable_cdmx"]
+
+
+def leer(nombre: str) -> str:
+    return (FIXTURES / nombre).read_text(encoding="utf-8")
+
+
+def leer_json(nombre: str):
+    return json.loads(leer(nombre))
+
+
+def armar_contenido(carpeta: Path, secundarias: list) -> tuple:
+    """
+    Mismo armado que extract_web_data: Firecrawl, Jina, HTML directo
+    (30k) y páginas secundarias (10k c/u), recortado a 20k.
+
+    Returns:
+        (main_content, secundarias_content, all_content)
+    """
+    def _fuente(archivo: str) -> str:
+        ruta = carpeta / archivo
+        return ruta.read_text(encoding="utf-8") if ruta.exists() else ""
+
+    secundarias_content = ""
+    for pagina in secundarias:
+        secundarias_content += f"\n\n=== PÁGINA: {pagina} ===\n"
+        secundarias_content += _fuente(f"{pagina.strip('/')}.html")[:10000]
+
+    main_content = ""
+    firecrawl_content = _fuente("firecrawl.md")
+    if firecrawl_content:
+        main_content += "=== FIRECRAWL ===\n" + firecrawl_content + "\n\n"
+    jina_content = _fuente("jina.md")
+    if jina_content:
+        main_content += "=== JINA ===\n" + jina_content + "\n\n"
+    http_content = _fuente("home.html")
+    if http_content:
+        main_content += "=== HTTP ===\n" + http_content[:30000] + "\n\n"
+    if secundarias_content:
+        main_content += "=== PÁGINAS SECUNDARIAS ===\n"
+        main_content += secundarias_content + "\n\n"
+
+    return main_content, secundarias_content, main_content[:20000]
+
+
+@pytest.fixture(scope="session", params=SITIOS)
+def sitio(request) -> dict:
+    """Un sitio de fixtures/ con el contenido tal como llega al extractor."""
+    carpeta = FIXTURES / request.param
+    datos = json.loads((carpeta / "sitio.json").read_text(encoding="utf-8"))
+    main_content, secundarias_content, all_content = armar_contenido(
+        carpeta, datos.get("secundarias", []))
+    return {
+        **datos, "nombre": request.param,
+        "main_content": main_content,
+        "secundarias_content": secundarias_content,
+        "all_content": all_content,
+        "regex_data": extract_with_regex(all_content)
+    }
+
+
+@pytest.fixture(scope="session")
+def linkedin_candidatos() -> dict:
+    return leer_json("linkedin_candidatos.json")
+
+
+@pytest.fixture(scope="session",
+                params=leer_json("leads.json"),
+                ids=lambda lead: lead["caso"])
+def lead(request) -> dict:
+    """Datos de un lead como llegan a calcular_qualification_tier."""
+    return {k: v for k, v in request.param.items() if k != "caso"}
+
+
+@pytest.fixture(scope="session")
+def respuesta_agente() -> str:
+    return leer("respuesta_agente.md")
+
+
+@pytest.fixture(scope="session")
+def informe_diagnostico() -> str:
+    return leer("informe_diagnostico.md")
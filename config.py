@@ -11,6 +11,20 @@ logger = logging.getLogger(__name__)
 # ============================================================
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY", "")
 OPENAI_MODEL = os.environ.get("OPENAI_MODEL", "gpt-4o")
+# Enviar la respuesta del agente por párrafos mientras se genera
+AGENT_STREAMING = os.environ.get("AGENT_STREAMING", "true").lower() == "true"
+# Presupuesto de tokens para el historial enviado al agente
+# (lo más viejo se pliega en un resumen incremental)
+HISTORY_TOKEN_BUDGET = int(os.environ.get("HISTORY_TOKEN_BUDGET", "3000"))
+# Respuesta local sin LLM para mensajes triviales ("ok", "gracias", 👍):
+# "off", "shadow" (solo loguea la decisión y la compara con el LLM) u "on"
+FAST_PATH_MODE = os.environ.get("FAST_PATH_MODE", "shadow").lower()
+# Si el mensaje trae una web: resolver DNS y bajar la homepage por
+# adelantado; SPECULATIVE_RESEARCH además lanza la investigación completa
+SPECULATIVE_PREFETCH = os.environ.get("SPECULATIVE_PREFETCH",
+                                      "true").lower() == "true"
+SPECULATIVE_RESEARCH = os.environ.get("SPECULATIVE_RESEARCH",
+                                      "false").lower() == "true"
 
 # ============================================================
 # MONGODB
@@ -19,6 +33,22 @@ MONGODB_URI = os.environ.get("MONGODB_URI", "")
 MONGODB_DB_NAME = os.environ.get("MONGODB_DB_NAME", "dania_fortia")
 MONGODB_DATABASE = MONGODB_DB_NAME
 
+# Cache de sesiones en memoria (historial + datos del lead por teléfono)
+SESSION_CACHE_MAX_SESSIONS = int(
+    os.environ.get("SESSION_CACHE_MAX_SESSIONS", "1000")
+)
+SESSION_CACHE_MAX_MESSAGES = int(
+    os.environ.get("SESSION_CACHE_MAX_MESSAGES", "40")
+)
+SESSION_CACHE_IDLE_SECONDS = int(
+    os.environ.get("SESSION_CACHE_IDLE_SECONDS", "1800")
+)
+# Cada cuánto se compara la versión cacheada con MongoDB (staleness
+# máxima de lo que escriben otros workers o el webhook de Cal.com)
+SESSION_CACHE_VERSION_CHECK_SECONDS = float(
+    os.environ.get("SESSION_CACHE_VERSION_CHECK_SECONDS", "5")
+)
+
 # ============================================================
 # WHATSAPP
 # ============================================================
@@ -27,11 +57,20 @@ WHATSAPP_PHONE_ID = os.environ.get("WHATSAPP_PHONE_NUMBER_ID", "")
 WHATSAPP_VERIFY_TOKEN = os.environ.get(
     "WHATSAPP_VERIFY_TOKEN", "fortia2024"
 )
+# Throughput del número en Meta (mensajes/segundo, todo el número)
+WHATSAPP_MESSAGES_PER_SECOND = float(
+    os.environ.get("WHATSAPP_MESSAGES_PER_SECOND", "20")
+)
+WHATSAPP_MAX_RETRIES = int(os.environ.get("WHATSAPP_MAX_RETRIES", "4"))
 
 # ============================================================
 # TAVILY (Búsqueda web)
 # ============================================================
 TAVILY_API_KEY = os.environ.get("TAVILY_API_KEY", "")
+# Cuota de requests por minuto (todas las búsquedas del proceso)
+TAVILY_REQUESTS_PER_MINUTE = int(
+    os.environ.get("TAVILY_REQUESTS_PER_MINUTE", "100")
+)
 
 # ============================================================
 # JINA AI (Extracción web)
@@ -73,6 +112,12 @@ GOOGLE_API_KEY = os.environ.get("GOOGLE_API_KEY", "")
 GOOGLE_SEARCH_CX = os.environ.get(
     "GOOGLE_SEARCH_CX", "33f5cc1337cde4799"
 )
+# Cuota diaria de la API (100 gratis, hasta 10k pagas)
+GOOGLE_CSE_DAILY_QUOTA = int(os.environ.get("GOOGLE_CSE_DAILY_QUOTA", "100"))
+# Búsquedas que se guardan para lo esencial (sin respaldo en Tavily)
+GOOGLE_CSE_QUOTA_RESERVE = int(
+    os.environ.get("GOOGLE_CSE_QUOTA_RESERVE", "10")
+)
 
 # ============================================================
 # MAPEO DE PAÍSES COMPLETO
@@ -11,6 +11,7 @@ import warnings
 
 warnings.filterwarnings("ignore", message="Can not find any timezone")
 import time
+import asyncio
 from datetime import datetime
 from contextlib import asynccontextmanager
 from collections import OrderedDict
@@ -19,11 +20,18 @@ import pytz
 from fastapi import FastAPI, Request, Response, HTTPException, BackgroundTasks
 from fastapi.responses import PlainTextResponse, JSONResponse
 
-from config import detect_country, WHATSAPP_VERIFY_TOKEN, format_fecha_es
+from config import (detect_country, WHATSAPP_VERIFY_TOKEN, format_fecha_es,
+                    FAST_PATH_MODE)
 from services.whatsapp import send_whatsapp_message, mark_as_read
 from services.openai_agent import process_message
 from services.mongodb import (update_lead_booking, get_database,
                               find_lead_by_email_calcom, get_lead_field)
+from services.session_cache import session_cache
+from services.agent_state import cargar_estado, detectar_etapa
+from services import fast_path
+from services.speculative_research import speculative_research
+from services.conversation_summary import (actualizar_resumen_rolling,
+                                           HISTORIAL_AGENTE)
 from services.reminders import (init_scheduler, shutdown_scheduler,
                                 send_booking_confirmation,
                                 send_booking_cancellation,
@@ -115,6 +123,15 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"⚠️ Error iniciando scheduler: {e}")
 
+    # Índice local de conocimiento DANIA (no bloquea el arranque)
+    try:
+        from services.dania_knowledge import refrescar_indice_dania
+        import asyncio
+        asyncio.create_task(refrescar_indice_dania())
+        logger.info("✅ Índice DANIA en construcción")
+    except Exception as e:
+        logger.error(f"⚠️ Error iniciando índice DANIA: {e}")
+
     # Recovery de recordatorios pendientes
     try:
         from services.reminders import recuperar_recordatorios_pendientes
@@ -132,6 +149,21 @@ async def lifespan(app: FastAPI):
         shutdown_scheduler()
     except:
         pass
+    try:
+        from services.whatsapp import dispatcher
+        await dispatcher.close()
+    except:
+        pass
+    try:
+        from services.tavily_search import tavily
+        await tavily.close()
+    except:
+        pass
+    try:
+        from services.message_status import status_buffer
+        await status_buffer.flush()
+    except:
+        pass
 
 
 app = FastAPI(title="DANIA/Fortia WhatsApp Bot",
@@ -168,6 +200,37 @@ async def health():
     }
 
 
+@app.get("/stats")
+async def stats():
+    """Métricas internas de caches y colas."""
+    from services.gpt_cache import gpt_cache
+    from services.dania_knowledge import answer_cache
+    from services.whatsapp import dispatcher
+    from services.message_status import status_buffer
+    from services.openai_agent import agent_stats
+    from services.hedged_search import hedge_stats
+    from services.tavily_search import tavily
+    from services.google_search import google_cse
+    from services.apify_runs import apify_runs
+    from services import news_dedup
+    return {
+        "agent_requests": agent_stats(),
+        "fast_path": fast_path.stats(),
+        "speculative_research": speculative_research.stats(),
+        "hedged_search": hedge_stats(),
+        "tavily": tavily.stats(),
+        "google_cse": google_cse.stats(),
+        "apify_runs": apify_runs.stats(),
+        "news_dedup": news_dedup.stats(),
+        "session_cache": session_cache.stats(),
+        "whatsapp_outbound": dispatcher.stats(),
+        "whatsapp_delivery": status_buffer.stats(),
+        "gpt_cache": gpt_cache.stats(),
+        "dania_answer_cache": answer_cache.stats(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+
 # =============================================================================
 # WHATSAPP WEBHOOK
 # =============================================================================
@@ -221,7 +284,12 @@ async def receive_webhook(request: Request, background_tasks: BackgroundTasks):
         messages = value.get("messages", [])
 
         if not messages:
-            # Es un status update, ignorar
+            # Status update (sent/delivered/read/failed): solo se bufferea,
+            # el flush a MongoDB lo hace el scheduler
+            statuses = value.get("statuses", [])
+            if statuses:
+                from services.message_status import status_buffer
+                status_buffer.ingest(statuses)
             return JSONResponse({"status": "ok"})
 
         message = messages[0] if messages else {}
@@ -273,6 +341,53 @@ async def receive_webhook(request: Request, background_tasks: BackgroundTasks):
         return JSONResponse({"status": "error", "message": str(e)})
 
 
+async def _transcribir_audio_entrante(audio_id: str) -> dict:
+    """
+    Descarga y transcribe un audio entrante.
+    Retorna {"text": ...} o {"error": mensaje para el usuario}.
+    """
+    from services.whatsapp import get_media_url, download_media, transcribe_audio
+
+    logger.info(f"[AUDIO] Procesando audio {audio_id}...")
+
+    # Paso 1: Obtener URL
+    media_url = await get_media_url(audio_id)
+    if not media_url:
+        return {"error": "No pude procesar el audio. ¿Podés escribirme el mensaje?"}
+
+    # Paso 2: Descargar
+    audio_bytes = await download_media(media_url)
+    if not audio_bytes:
+        return {"error": "No pude descargar el audio. ¿Podés intentar de nuevo?"}
+
+    # Paso 3: Transcribir
+    text = await transcribe_audio(audio_bytes)
+    if not text:
+        return {"error": "No pude transcribir el audio. ¿Podés escribirme el mensaje?"}
+
+    logger.info(f"[AUDIO] ✓ Transcrito: {text[:50]}...")
+    return {"text": text}
+
+
+async def _responder_fast_path(from_number: str, phone_whatsapp: str,
+                               text: str, decision: dict):
+    """Responde (o absorbe) un mensaje trivial con la plantilla local."""
+    respuesta = decision["respuesta"]
+    logger.info(f"[FASTPATH] {decision['clase']} "
+                f"(conf={decision['confianza']}) → "
+                f"{respuesta[:40] if respuesta else '[sin respuesta]'}")
+
+    await asyncio.to_thread(session_cache.append_message, phone_whatsapp,
+                            "human", text)
+    if respuesta:
+        result = await send_whatsapp_message(from_number, respuesta)
+        if not result.get("success"):
+            logger.error(f"❌ Error enviando respuesta: {result.get('error')}")
+        await asyncio.to_thread(session_cache.append_message, phone_whatsapp,
+                                "ai", respuesta)
+    fast_path.marcar_resuelto()
+
+
 async def process_whatsapp_message(from_number: str,
                                    text: str,
                                    message_id: str,
@@ -284,45 +399,93 @@ async def process_whatsapp_message(from_number: str,
     Soporta texto y audio.
     """
     try:
-        # Marcar como leído
-        await mark_as_read(message_id)
-
-        # Si es audio, transcribir primero
-        if message_type == "audio" and audio_id:
-            from services.whatsapp import get_media_url, download_media, transcribe_audio
-
-            logger.info(f"[AUDIO] Procesando audio de {from_number}...")
+        phone_whatsapp = f"+{from_number}"
 
-            # Paso 1: Obtener URL
-            media_url = await get_media_url(audio_id)
-            if not media_url:
-                await send_whatsapp_message(
-                    from_number,
-                    "No pude procesar el audio. ¿Podés escribirme el mensaje?")
-                return
+        # ═══════════════════════════════════════════════════════════════════
+        # PRE-PROCESO EN PARALELO: read receipt, audio, lead, historial, país
+        # ═══════════════════════════════════════════════════════════════════
+        tiempos = {}
+        inicio = time.monotonic()
 
-            # Paso 2: Descargar
-            audio_bytes = await download_media(media_url)
-            if not audio_bytes:
-                await send_whatsapp_message(
-                    from_number,
-                    "No pude descargar el audio. ¿Podés intentar de nuevo?")
-                return
+        async def _medir(nombre, coro):
+            t0 = time.monotonic()
+            try:
+                return await coro
+            finally:
+                tiempos[nombre] = time.monotonic() - t0
+
+        pasos = [
+            _medir("mark_as_read", mark_as_read(message_id)),
+            _medir("lead",
+                   asyncio.to_thread(session_cache.get_lead, phone_whatsapp)),
+            _medir(
+                "historial",
+                asyncio.to_thread(session_cache.get_history, phone_whatsapp,
+                                  HISTORIAL_AGENTE)),
+            _medir("pais", asyncio.to_thread(detect_country, from_number)),
+            _medir("estado", asyncio.to_thread(cargar_estado, phone_whatsapp))
+        ]
+        if message_type == "audio" and audio_id:
+            pasos.append(_medir("audio", _transcribir_audio_entrante(audio_id)))
+
+        resultados = await asyncio.gather(*pasos, return_exceptions=True)
+        _, lead, chat_history, country_info, estado = resultados[:5]
+
+        logger.info("[PRE] " + " ".join(
+            f"{k}={v:.2f}s" for k, v in tiempos.items()) +
+                    f" total={time.monotonic() - inicio:.2f}s")
+
+        if isinstance(lead, Exception):
+            logger.error(f"[PRE] Error buscando lead: {lead}")
+            lead = None
+        if isinstance(chat_history, Exception):
+            logger.error(f"[PRE] Error obteniendo historial: {chat_history}")
+            chat_history = []
+        if isinstance(country_info, Exception):
+            logger.error(f"[PRE] Error detectando país: {country_info}")
+            country_info = {}
+        if isinstance(estado, Exception):
+            logger.error(f"[PRE] Error leyendo estado: {estado}")
+            estado = None
 
-            # Paso 3: Transcribir
-            text = await transcribe_audio(audio_bytes)
-            if not text:
-                await send_whatsapp_message(
-                    from_number,
-                    "No pude transcribir el audio. ¿Podés escribirme el mensaje?"
-                )
+        if message_type == "audio" and audio_id:
+            audio = resultados[5]
+            if isinstance(audio, Exception):
+                logger.error(f"[AUDIO] Error procesando audio: {audio}")
+                audio = {"error": "No pude procesar el audio. ¿Podés escribirme el mensaje?"}
+            if audio.get("error"):
+                await send_whatsapp_message(from_number, audio["error"])
                 return
-
-            logger.info(f"[AUDIO] ✓ Transcrito: {text[:50]}...")
-
-        # Detectar país y zona horaria
-        phone_whatsapp = f"+{from_number}"
-        country_info = detect_country(from_number)
+            text = audio["text"]
+
+        # Si el mensaje trae la web del lead, adelantar DNS/homepage (y la
+        # investigación si está habilitado) antes de que decida el LLM
+        if estado and not estado["campos"].get("investigacion_lanzada"):
+            speculative_research.lanzar(
+                phone_whatsapp,
+                text,
+                nombre=(lead or {}).get("nombre")
+                or estado["campos"].get("nombre_persona", ""),
+                ubicacion={
+                    "city": country_info.get("city", ""),
+                    "province": country_info.get("province", ""),
+                    "country": country_info.get("country", "Argentina")
+                })
+
+        # ═══════════════════════════════════════════════════════════════════
+        # FAST PATH: "ok", "gracias", stickers... sin pasar por el LLM
+        # ═══════════════════════════════════════════════════════════════════
+        decision = None
+        if FAST_PATH_MODE != "off" and estado and message_type != "audio":
+            decision = fast_path.decidir(text, detectar_etapa(estado, lead),
+                                         chat_history)
+
+        if decision and FAST_PATH_MODE == "on":
+            await _responder_fast_path(from_number, phone_whatsapp, text,
+                                       decision)
+            return
+
+        turno = {} if decision else None
 
         # Procesar con el agente
         response = await process_message(
@@ -335,8 +498,18 @@ async def process_whatsapp_message(from_number: str,
             emoji=country_info.get("emoji", ""),
             city_detected=country_info.get("city", ""),
             province_detected=country_info.get("province", ""),
-            original_message_type=original_message_type)
-
+            original_message_type=original_message_type,
+            chat_history=chat_history,
+            lead=lead,
+            estado=estado,
+            stream_to=from_number if original_message_type == "text" else "",
+            turno=turno)
+
+        if decision and turno:
+            fast_path.registrar_shadow(decision, turno.get("respuesta", ""),
+                                       turno.get("uso_tools", False))
+
+        # Con streaming la respuesta ya se envió por párrafos (response == "")
         if response is not None and response and original_message_type == "text":
             result = await send_whatsapp_message(from_number, response)
 
@@ -346,6 +519,9 @@ async def process_whatsapp_message(from_number: str,
                 logger.error(
                     f"❌ Error enviando respuesta: {result.get('error')}")
 
+        # Plegar turnos viejos en el resumen (fuera del hot path)
+        asyncio.create_task(actualizar_resumen_rolling(phone_whatsapp))
+
     except Exception as e:
         logger.error(f"Error procesando mensaje: {e}")
         try:
@@ -449,6 +625,9 @@ async def calcom_webhook(request: Request, background_tasks: BackgroundTasks):
             fecha_str, hora_str = _format_booking_datetime(start_time, lead_tz)
 
             if phone_whatsapp:
+                # La reserva se escribió por fuera del cache de sesiones
+                session_cache.invalidar_lead(phone_whatsapp)
+
                 # Enviar notificación por WhatsApp según el evento
                 if "CREATED" in trigger_event:
                     # Resetear recordatorios anteriores si existían
@@ -0,0 +1,297 @@
+"""
+Estado persistido del agente por sesión para DANIA/Fortia
+process_message arma el context de cero en cada mensaje y el historial
+solo trae texto, así que el modelo volvía a llamar tools ya ejecutadas
+(extraer_datos_web_cliente, buscar_redes_personales...) y perdía datos
+que otras tools esperan en el context (linkedin_empresa, email_principal).
+
+Un documento compacto por teléfono en la colección agent_state con:
+- campos tipados (ESTADO_CAMPOS) que se vuelcan al context
+- digests de resultados de tools, indexados por hash de argumentos
+- resumen incremental de los turnos viejos (ver conversation_summary)
+"""
+import json
+import hashlib
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+
+from pymongo.errors import PyMongoError
+
+from services.mongodb import get_database
+
+logger = logging.getLogger(__name__)
+
+COLLECTION_NAME = "agent_state"
+
+# Campos del estado y su tipo (se copian al context de execute_tool)
+ESTADO_CAMPOS = {
+    "website": str,
+    "nombre_persona": str,
+    "empresa": str,
+    "business_activity": str,
+    "business_model": str,
+    "linkedin_empresa": str,
+    "facebook_empresa": str,
+    "instagram_empresa": str,
+    "email_principal": str,
+    "city_web": str,
+    "province_web": str,
+    "linkedin_personal": str,
+    "challenges_detected": list,
+    "investigacion_lanzada": bool,
+    "lead_guardado": bool,
+}
+
+# Tools cuyo resultado se reutiliza si se piden con los mismos argumentos
+TOOLS_REUTILIZABLES = {
+    "extraer_datos_web_cliente", "buscar_redes_personales",
+    "investigar_desafios_empresa"
+}
+
+# Qué campos de cada resultado alimentan el estado
+# (campo del resultado → campo del estado)
+MAPEO_RESULTADOS = {
+    "buscar_redes_personales": {
+        "linkedin_personal": "linkedin_personal",
+        "linkedin_empresa": "linkedin_empresa",
+        "facebook_empresa": "facebook_empresa",
+        "instagram_empresa": "instagram_empresa",
+    },
+    "verificar_investigacion_completa": {
+        "business_name": "empresa",
+        "business_activity": "business_activity",
+        "business_model": "business_model",
+        "linkedin_empresa": "linkedin_empresa",
+        "facebook_empresa": "facebook_empresa",
+        "instagram_empresa": "instagram_empresa",
+        "email_principal": "email_principal",
+        "city": "city_web",
+        "province": "province_web",
+        "linkedin_personal": "linkedin_personal",
+    },
+    "investigar_desafios_empresa": {
+        "desafios": "challenges_detected",
+    },
+}
+
+VALORES_VACIOS = {
+    "", "No encontrado", "No encontrada", "No detectado", "No proporcionado"
+}
+
+DIGEST_MAX_CHARS = 500
+DIGEST_MAX_ITEMS = 5
+
+
+def estado_vacio() -> dict:
+    return {
+        "campos": {campo: tipo() for campo, tipo in ESTADO_CAMPOS.items()},
+        "tools": {},
+        # Resumen incremental de los mensajes que quedaron fuera de la
+        # ventana de historial (mensajes = cuántos ya están resumidos)
+        "resumen": {
+            "texto": "",
+            "mensajes": 0
+        }
+    }
+
+
+def _coercionar(campo: str, valor):
+    """Convierte un valor al tipo declarado en ESTADO_CAMPOS."""
+    tipo = ESTADO_CAMPOS[campo]
+    if tipo is list:
+        if isinstance(valor, list):
+            return valor[:DIGEST_MAX_ITEMS]
+        return [v.strip() for v in str(valor).split(",") if v.strip()]
+    if tipo is bool:
+        return bool(valor)
+    return str(valor)[:DIGEST_MAX_CHARS]
+
+
+def _hash_argumentos(arguments: dict) -> str:
+    normalizados = {
+        k: v.strip().lower() if isinstance(v, str) else v
+        for k, v in (arguments or {}).items()
+    }
+    texto = json.dumps(normalizados, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()[:16]
+
+
+def _digest(valor):
+    """Versión compacta de un resultado (strings cortos, listas acotadas)."""
+    if isinstance(valor, dict):
+        return {k: _digest(v) for k, v in valor.items() if v not in (None, "")}
+    if isinstance(valor, list):
+        return [_digest(v) for v in valor[:DIGEST_MAX_ITEMS]]
+    if isinstance(valor, str):
+        return valor[:DIGEST_MAX_CHARS]
+    return valor
+
+
+# ═══════════════════════════════════════════════════════════════════
+# PERSISTENCIA
+# ═══════════════════════════════════════════════════════════════════
+def cargar_estado(phone: str) -> dict:
+    """Lee el estado de la sesión (o uno vacío)."""
+    estado = estado_vacio()
+    try:
+        db = get_database()
+        if db is None:
+            return estado
+        doc = db[COLLECTION_NAME].find_one({"_id": phone})
+    except PyMongoError as e:
+        logger.error(f"[STATE] Error leyendo estado: {e}")
+        return estado
+
+    if doc:
+        for campo, valor in (doc.get("campos") or {}).items():
+            if campo in ESTADO_CAMPOS and valor is not None:
+                estado["campos"][campo] = _coercionar(campo, valor)
+        estado["tools"] = doc.get("tools") or {}
+        resumen = doc.get("resumen") or {}
+        estado["resumen"] = {
+            "texto": resumen.get("texto", ""),
+            "mensajes": resumen.get("mensajes", 0)
+        }
+    return estado
+
+
+def guardar_estado(phone: str, estado: dict) -> bool:
+    """Persiste el estado completo (es chico: un documento por sesión)."""
+    try:
+        db = get_database()
+        if db is None:
+            return False
+        db[COLLECTION_NAME].update_one({"_id": phone}, {
+            "$set": {
+                "campos": estado["campos"],
+                "tools": estado["tools"],
+                "actualizado_en": datetime.now(timezone.utc)
+            }
+        },
+                                       upsert=True)
+        return True
+    except PyMongoError as e:
+        logger.error(f"[STATE] Error guardando estado: {e}")
+        return False
+
+
+def guardar_resumen(phone: str, texto: str, mensajes: int) -> bool:
+    """Persiste solo el resumen (no pisa campos/tools del estado)."""
+    try:
+        db = get_database()
+        if db is None:
+            return False
+        db[COLLECTION_NAME].update_one({"_id": phone}, {
+            "$set": {
+                "resumen": {
+                    "texto": texto,
+                    "mensajes": mensajes,
+                    "actualizado_en": datetime.now(timezone.utc)
+                }
+            }
+        },
+                                       upsert=True)
+        return True
+    except PyMongoError as e:
+        logger.error(f"[STATE] Error guardando resumen: {e}")
+        return False
+
+
+# ═══════════════════════════════════════════════════════════════════
+# USO DESDE EL AGENTE
+# ═══════════════════════════════════════════════════════════════════
+def aplicar_a_context(estado: dict, context: dict):
+    """Vuelca los campos no vacíos del estado al context de las tools."""
+    for campo, valor in estado["campos"].items():
+        if valor and not context.get(campo):
+            context[campo] = valor
+
+
+def resultado_previo(estado: dict, tool_name: str,
+                     arguments: dict) -> Optional[dict]:
+    """Digest de una ejecución anterior con los mismos argumentos."""
+    if tool_name not in TOOLS_REUTILIZABLES:
+        return None
+    previo = estado["tools"].get(tool_name)
+    if previo and previo.get("args_hash") == _hash_argumentos(arguments):
+        return previo.get("resultado")
+    return None
+
+
+def registrar_tool(estado: dict, tool_name: str, arguments: dict,
+                   result: dict, context: dict) -> bool:
+    """
+    Actualiza el estado con el resultado de una tool.
+    Retorna True si cambió algo (para saber si hay que persistir).
+    """
+    if not isinstance(result, dict) or result.get("error"):
+        return False
+
+    cambios = False
+
+    # Campos que la tool dejó en el context (website, nombre_persona...)
+    for campo in ESTADO_CAMPOS:
+        valor = context.get(campo)
+        if valor and valor != estado["campos"][campo]:
+            estado["campos"][campo] = _coercionar(campo, valor)
+            cambios = True
+
+    if tool_name == "extraer_datos_web_cliente":
+        estado["campos"]["investigacion_lanzada"] = True
+        cambios = True
+
+    if (tool_name == "guardar_lead_mongodb"
+            and result.get("operation_status") == "success"):
+        estado["campos"]["lead_guardado"] = True
+        cambios = True
+
+    fuente = result.get("datos", result) if isinstance(
+        result.get("datos"), dict) else result
+    for campo_resultado, campo in MAPEO_RESULTADOS.get(tool_name, {}).items():
+        valor = fuente.get(campo_resultado)
+        if valor and valor not in VALORES_VACIOS:
+            estado["campos"][campo] = _coercionar(campo, valor)
+            context[campo] = estado["campos"][campo]
+            cambios = True
+
+    if tool_name in TOOLS_REUTILIZABLES:
+        estado["tools"][tool_name] = {
+            "args_hash": _hash_argumentos(arguments),
+            "resultado": _digest(result),
+            "ejecutado_en": datetime.now(timezone.utc).isoformat()
+        }
+        cambios = True
+
+    return cambios
+
+
+def detectar_etapa(estado: dict, lead: Optional[dict] = None) -> str:
+    """
+    Etapa de la conversación para elegir las tools (TOOLS_POR_ETAPA).
+    Usa el estado de sesión y, para leads de sesiones anteriores, los
+    campos calientes del lead (nivel_calificacion, reserva_estado).
+    """
+    campos = estado["campos"]
+    lead = lead or {}
+    if (campos.get("lead_guardado")
+            or lead.get("nivel_calificacion") not in VALORES_VACIOS | {None}
+            or lead.get("reserva_estado") not in VALORES_VACIOS | {None}):
+        return "derivacion"
+    if campos.get("investigacion_lanzada"):
+        return "investigacion"
+    return "captacion"
+
+
+def resumen_estado(estado: dict) -> str:
+    """Bloque corto para el prompt con lo ya conocido de la sesión."""
+    lineas = []
+    for campo, valor in estado["campos"].items():
+        if not valor or campo in ("investigacion_lanzada", "lead_guardado"):
+            continue
+        if isinstance(valor, list):
+            valor = ", ".join(str(v) for v in valor)
+        lineas.append(f"{campo}: {valor}")
+    if estado["tools"]:
+        lineas.append("Tools ya ejecutadas: " + ", ".join(estado["tools"]))
+    return "\n".join(lineas)
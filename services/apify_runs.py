@@ -0,0 +1,168 @@
+"""
+Corridas asíncronas de actores Apify con reutilización del dataset
+apify_buscar_noticias corría el actor en modo síncrono
+(waitForFinish) y lo cortaba un wait_for de 30s: si el crawler tardaba
+más, la corrida (paga) seguía en Apify y su resultado se tiraba.
+
+Modo asíncrono:
+1. Se inicia la corrida sin esperar (POST /runs)
+2. Se consulta el estado con long polling (GET /actor-runs/{id})
+3. Al terminar se baja el dataset y se procesa
+
+La corrida vive en una tarea propia: quien la pidió puede dejar de
+esperarla sin perderla. El resultado procesado queda cacheado por clave
+(ej. empresa + ubicación) y una segunda consulta con la misma clave,
+mientras la corrida sigue en vuelo, se suma a ella en vez de lanzar otra.
+"""
+import time
+import asyncio
+import logging
+from typing import Callable
+
+import httpx
+
+from config import APIFY_API_TOKEN
+from services.gpt_cache import GPTResultCache
+
+logger = logging.getLogger(__name__)
+
+APIFY_API_URL = "https://api.apify.com/v2"
+CACHE_TTL_SECONDS = 24 * 3600
+# Long polling de la API (máximo 60s por request)
+POLL_WAIT_SECONDS = 30
+# Límite de la corrida en Apify (acota el costo) y de la espera local
+RUN_TIMEOUT_SECONDS = 240
+ESTADOS_TERMINALES = {"SUCCEEDED", "FAILED", "ABORTED", "TIMED-OUT"}
+# Con TIMED-OUT el dataset parcial sigue sirviendo
+ESTADOS_CON_DATASET = {"SUCCEEDED", "TIMED-OUT"}
+
+
+class ApifyRuns:
+    """Corridas asíncronas de Apify con cache y corridas compartidas."""
+
+    def __init__(self):
+        self._cache = GPTResultCache(collection_name="apify_cache",
+                                     log_tag="APIFY-CACHE")
+        self._en_vuelo = {}
+        self._stats = {
+            "corridas": 0,
+            "compartidas": 0,
+            "fallidas": 0,
+            "segundos_corrida": 0.0
+        }
+
+    async def _correr_actor(self, actor: str, entrada: dict) -> list:
+        """Inicia la corrida, espera a que termine y retorna los items."""
+        t0 = time.monotonic()
+        self._stats["corridas"] += 1
+        async with httpx.AsyncClient(timeout=POLL_WAIT_SECONDS + 15) as client:
+            response = await client.post(
+                f"{APIFY_API_URL}/acts/{actor}/runs"
+                f"?token={APIFY_API_TOKEN}&timeout={RUN_TIMEOUT_SECONDS}",
+                json=entrada)
+            if response.status_code != 201:
+                logger.warning(f"[APIFY] Error iniciando corrida: "
+                               f"{response.status_code}")
+                self._stats["fallidas"] += 1
+                return []
+
+            run = response.json().get("data", {})
+            run_id = run.get("id")
+            logger.info(f"[APIFY] Corrida {run_id} iniciada ({actor})")
+
+            limite = t0 + RUN_TIMEOUT_SECONDS + POLL_WAIT_SECONDS
+            while (run.get("status") not in ESTADOS_TERMINALES
+                   and time.monotonic() < limite):
+                response = await client.get(
+                    f"{APIFY_API_URL}/actor-runs/{run_id}"
+                    f"?token={APIFY_API_TOKEN}"
+                    f"&waitForFinish={POLL_WAIT_SECONDS}")
+                if response.status_code == 200:
+                    run = response.json().get("data", {})
+                else:
+                    await asyncio.sleep(5)
+
+            estado = run.get("status", "")
+            duracion = time.monotonic() - t0
+            self._stats["segundos_corrida"] += duracion
+            if estado not in ESTADOS_CON_DATASET:
+                logger.warning(f"[APIFY] Corrida {run_id} terminó en "
+                               f"{estado or 'sin estado'} ({duracion:.0f}s)")
+                self._stats["fallidas"] += 1
+                return []
+
+            response = await client.get(
+                f"{APIFY_API_URL}/datasets/{run['defaultDatasetId']}/items"
+                f"?token={APIFY_API_TOKEN}")
+            if response.status_code != 200:
+                self._stats["fallidas"] += 1
+                return []
+
+            items = response.json()
+            logger.info(f"[APIFY] Corrida {run_id} {estado}: "
+                        f"{len(items)} items en {duracion:.0f}s")
+            return items
+
+    async def _correr_y_cachear(self, clave: str, actor: str, entrada: dict,
+                                procesar: Callable, call_site: str,
+                                key: str) -> list:
+        try:
+            items = await self._correr_actor(actor, entrada)
+            resultado = procesar(items) if items else []
+            await asyncio.to_thread(self._cache.set, call_site, key,
+                                    resultado, CACHE_TTL_SECONDS)
+            return resultado
+        except Exception as e:
+            logger.error(f"[APIFY] Error en corrida {clave}: {e}")
+            self._stats["fallidas"] += 1
+            return []
+        finally:
+            self._en_vuelo.pop(key, None)
+
+    async def obtener(self,
+                      clave: str,
+                      actor: str,
+                      entrada: dict,
+                      procesar: Callable,
+                      call_site: str = "apify") -> asyncio.Task:
+        """
+        Tarea con el resultado procesado para la clave.
+
+        Cacheado: tarea ya resuelta. En vuelo: la misma tarea de la
+        corrida existente. Si no, inicia una corrida nueva.
+        Quien espera la tarea debería usar asyncio.shield para que un
+        timeout propio no cancele la corrida.
+
+        Args:
+            procesar: items del dataset -> resultado a cachear/devolver
+        """
+        key = GPTResultCache.make_key(call_site, "v1", actor, clave)
+
+        cached = await asyncio.to_thread(self._cache.get, call_site, key)
+        if cached is not None:
+            tarea = asyncio.get_running_loop().create_future()
+            tarea.set_result(cached)
+            return tarea
+
+        tarea = self._en_vuelo.get(key)
+        if tarea is not None:
+            self._stats["compartidas"] += 1
+            logger.info(f"[APIFY] Corrida en vuelo reutilizada: {clave}")
+            return tarea
+
+        tarea = asyncio.create_task(
+            self._correr_y_cachear(clave, actor, entrada, procesar,
+                                   call_site, key))
+        self._en_vuelo[key] = tarea
+        return tarea
+
+    def stats(self) -> dict:
+        return {
+            **self._stats, "segundos_corrida":
+            round(self._stats["segundos_corrida"], 1),
+            "en_vuelo": len(self._en_vuelo),
+            "cache": self._cache.stats()
+        }
+
+
+apify_runs = ApifyRuns()
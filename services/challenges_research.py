@@ -8,14 +8,97 @@ VERSIÓN 2.4 - Prompt mejorado para adaptación flexible
 import os
 import re
 import logging
+import difflib
 import httpx
-from typing import List, Dict
+from datetime import datetime, timezone, timedelta
+from typing import List, Dict, Optional
+
+from pymongo.errors import PyMongoError
+
+from services.gpt_cache import gpt_cache
+from services.tavily_search import tavily
+from services.mongodb import get_database
+from utils.text_cleaner import fold_accents
+from utils.token_budget import pack_content, KEYWORDS_DESAFIOS
 
 logger = logging.getLogger(__name__)
 
 TAVILY_API_KEY = os.environ.get("TAVILY_API_KEY", "")
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY", "")
-HTTP_TIMEOUT = 30.0
+GPT_CONTENT_TOKENS = 2000
+# Subir cuando cambie el prompt de _extraer_desafios_con_gpt
+GPT_PROMPT_VERSION = "desafios-v2.4"
+
+# ═══════════════════════════════════════════════════════════════════
+# CACHE DE DESAFÍOS POR (RUBRO, PAÍS)
+# ═══════════════════════════════════════════════════════════════════
+DESAFIOS_CACHE_COLLECTION = "desafios_rubro_cache"
+DESAFIOS_CACHE_TTL_DIAS = 14
+PREWARM_TOP_N = 20
+FUZZY_UMBRAL = 0.88
+
+# Sinónimos → rubro canónico (sin acentos, en singular). Se comparan por
+# palabras completas; nada de palabras sueltas genéricas ("obra",
+# "sistema", "it", "app", "bar", "legal", "clinica") que también son de
+# otros rubros ("obra social", "sistemas de riego", "clínica dental")
+SINONIMOS_RUBRO = {
+    "inmobiliaria": [
+        "inmobiliaria", "bienes raices", "real estate", "corredor inmobiliario",
+        "corredora inmobiliaria", "propiedades", "desarrolladora inmobiliaria"
+    ],
+    "restaurante": [
+        "restaurante", "restaurant", "gastronomia", "gastronomico",
+        "gastronomica", "cafeteria", "parrilla"
+    ],
+    "software": [
+        "software", "desarrollo de software", "saas", "programacion",
+        "desarrollo web", "desarrollo de aplicacion", "empresa de tecnologia"
+    ],
+    "salud": [
+        "salud", "clinica medica", "consultorio medico", "hospital",
+        "medicina", "centro medico", "sanatorio"
+    ],
+    "odontologia": [
+        "odontologia", "odontologica", "odontologico", "dental", "odontologo",
+        "dentista"
+    ],
+    "estudio juridico": [
+        "estudio juridico", "abogado", "servicio legal", "bufete"
+    ],
+    "estudio contable": [
+        "estudio contable", "contador", "contabilidad", "contable",
+        "asesoria contable"
+    ],
+    "construccion": [
+        "construccion", "constructora", "obra civil", "arquitectura"
+    ],
+    "agencia de marketing": [
+        "agencia de marketing", "marketing digital", "agencia digital",
+        "publicidad", "agencia de publicidad"
+    ],
+    "ecommerce": [
+        "ecommerce", "e commerce", "tienda online", "tienda virtual"
+    ],
+    "educacion": [
+        "educacion", "escuela", "colegio", "universidad", "capacitacion",
+        "academia"
+    ],
+    "logistica": [
+        "logistica", "transporte", "distribucion", "flete", "mudanza"
+    ],
+    "seguro": ["seguro", "aseguradora", "broker de seguro", "productor de seguro"],
+}
+
+_SINONIMO_A_CANONICO = {
+    sinonimo: canonico
+    for canonico, sinonimos in SINONIMOS_RUBRO.items()
+    for sinonimo in sinonimos
+}
+
+_STOPWORDS_RUBRO = {
+    "de", "del", "la", "las", "el", "los", "y", "e", "en", "para", "con",
+    "empresa", "negocio", "rubro", "sector"
+}
 
 # ═══════════════════════════════════════════════════════════════════
 # TABLA DE SALARIOS POR PAÍS (USD/mes)
@@ -97,15 +180,164 @@ RUBROS_ALTO_VALOR = {
 }
 
 
+def _singular(palabra: str) -> str:
+    """
+    Singular aproximado para español (restaurantes → restaurante,
+    hoteles → hotel, padres → padre).
+    """
+    if len(palabra) > 4 and palabra.endswith("ces"):
+        return palabra[:-3] + "z"
+    # Vocal + l/r/n/d + "es": el singular termina en consonante
+    if (len(palabra) > 4 and palabra.endswith("es")
+            and palabra[-3] in "lrnd" and palabra[-4] in "aeiou"):
+        return palabra[:-2]
+    if len(palabra) > 3 and palabra.endswith("s"):
+        return palabra[:-1]
+    return palabra
+
+
+def normalizar_rubro(rubro: str) -> str:
+    """
+    Clave normalizada de rubro: sin acentos, minúsculas, singular,
+    sin stopwords y con sinónimos colapsados al rubro canónico.
+
+    Ej: "Inmobiliarias" / "Bienes Raíces" / "real estate" → "inmobiliaria"
+    """
+    if not rubro:
+        return ""
+
+    original = fold_accents(rubro).lower()
+    original = re.sub(r'[^a-z0-9]+', ' ', original).strip()
+    palabras = [_singular(p) for p in original.split()]
+    texto = " ".join(palabras)
+
+    sin_stopwords = " ".join(p for p in palabras
+                             if p not in _STOPWORDS_RUBRO)
+
+    # Frase completa, en plural original y en singular
+    for variante in (original, texto, sin_stopwords):
+        if variante in _SINONIMO_A_CANONICO:
+            return _SINONIMO_A_CANONICO[variante]
+
+    # Sub-frase conocida (palabras completas). Si aparecen sinónimos de
+    # más de un rubro no se adivina: mejor sin cache que desafíos ajenos
+    canonicos = {
+        canonico
+        for sinonimo, canonico in _SINONIMO_A_CANONICO.items()
+        if re.search(r'\b' + re.escape(sinonimo) + r'\b', original)
+        or re.search(r'\b' + re.escape(sinonimo) + r'\b', texto)
+    }
+    if len(canonicos) == 1:
+        return canonicos.pop()
+
+    return sin_stopwords
+
+
+def normalizar_pais(pais: str) -> str:
+    """Clave normalizada de país (sin acentos, minúsculas)."""
+    return re.sub(r'\s+', ' ', fold_accents(pais or "").lower()).strip()
+
+
+def _desafios_cache_collection():
+    db = get_database()
+    if db is None:
+        return None
+    collection = db[DESAFIOS_CACHE_COLLECTION]
+    try:
+        collection.create_index("expira_en", expireAfterSeconds=0)
+    except PyMongoError:
+        pass
+    return collection
+
+
+def _leer_cache_desafios(rubro: str, pais: str,
+                         fuzzy: bool = True) -> Optional[Dict]:
+    """
+    Busca desafíos cacheados para (rubro, país).
+    Si no hay match exacto y fuzzy=True, usa la clave existente
+    más parecida del mismo país (difflib, umbral FUZZY_UMBRAL).
+    """
+    rubro_key = normalizar_rubro(rubro)
+    pais_key = normalizar_pais(pais)
+    if not rubro_key:
+        return None
+
+    try:
+        collection = _desafios_cache_collection()
+        if collection is None:
+            return None
+
+        ahora = datetime.now(timezone.utc)
+        doc = collection.find_one({
+            "_id": f"{rubro_key}|{pais_key}",
+            "expira_en": {"$gt": ahora}
+        })
+
+        if not doc and fuzzy:
+            claves = [
+                d["rubro_key"] for d in collection.find(
+                    {"pais_key": pais_key, "expira_en": {"$gt": ahora}},
+                    {"rubro_key": 1})
+            ]
+            parecidas = difflib.get_close_matches(rubro_key, claves, n=1,
+                                                  cutoff=FUZZY_UMBRAL)
+            if parecidas:
+                logger.info(f"[CHALLENGES] Cache fuzzy: '{rubro_key}' → "
+                            f"'{parecidas[0]}'")
+                doc = collection.find_one(
+                    {"_id": f"{parecidas[0]}|{pais_key}"})
+
+        return doc
+
+    except PyMongoError as e:
+        logger.warning(f"[CHALLENGES] Error leyendo cache: {e}")
+        return None
+
+
+def _guardar_cache_desafios(rubro: str, pais: str,
+                            desafios_reales: List[str], fuentes: List[str]):
+    """Guarda desafíos reales de (rubro, país) con TTL."""
+    rubro_key = normalizar_rubro(rubro)
+    pais_key = normalizar_pais(pais)
+    if not rubro_key or not desafios_reales:
+        return
+
+    try:
+        collection = _desafios_cache_collection()
+        if collection is None:
+            return
+
+        ahora = datetime.now(timezone.utc)
+        collection.update_one({"_id": f"{rubro_key}|{pais_key}"}, {
+            "$set": {
+                "rubro_key": rubro_key,
+                "pais_key": pais_key,
+                "rubro_ejemplo": rubro,
+                "desafios_reales": desafios_reales[:5],
+                "fuentes": fuentes,
+                "actualizado_en": ahora,
+                "expira_en": ahora + timedelta(days=DESAFIOS_CACHE_TTL_DIAS)
+            }
+        },
+                              upsert=True)
+        logger.info(f"[CHALLENGES] ✓ Cache guardado: {rubro_key}|{pais_key}")
+
+    except PyMongoError as e:
+        logger.warning(f"[CHALLENGES] Error guardando cache: {e}")
+
+
 async def investigar_desafios_empresa(rubro: str,
                                       pais: str,
                                       team_size: str = "",
-                                      business_description: str = "") -> Dict:
+                                      business_description: str = "",
+                                      usar_cache: bool = True) -> Dict:
     """
     Investiga desafíos REALES del sector usando Tavily + GPT.
     Busca artículos de 2026-2027 y extrae desafíos específicos con IA.
 
     VERSIÓN 2.4: Prompt mejorado para adaptación flexible.
+    Los desafíos dependen de (rubro, país): se cachean por clave
+    normalizada y el prewarm los refresca para los rubros frecuentes.
     """
     logger.info(f"[CHALLENGES] ========== Investigando desafíos ==========")
     logger.info(
@@ -128,6 +360,21 @@ async def investigar_desafios_empresa(rubro: str,
     # Obtener genéricos siempre (se usarán solos o combinados)
     genericos = _get_desafios_genericos()
 
+    # Paso 0: Cache por (rubro, país)
+    if usar_cache:
+        cached = _leer_cache_desafios(rubro, pais)
+        if cached and cached.get("desafios_reales"):
+            desafios_reales = cached["desafios_reales"]
+            results["desafios"] = desafios_reales[:5] + genericos[:3]
+            results["fuentes"] = cached.get("fuentes", [])
+            results["success"] = True
+            results["source"] = "cache"
+            results["desafios_texto"] = _formatear_desafios_combinados(
+                desafios_reales, genericos, rubro, pais)
+            logger.info(f"[CHALLENGES] ✓ Desde cache "
+                        f"({cached.get('rubro_key')}|{cached.get('pais_key')})")
+            return results
+
     # Paso 1: Buscar artículos reales con Tavily
     contenido_articulos, fuentes = await _buscar_articulos_tavily(rubro, pais)
     results["fuentes"] = fuentes
@@ -143,6 +390,7 @@ async def investigar_desafios_empresa(rubro: str,
             results["success"] = True
             results["desafios_texto"] = _formatear_desafios_combinados(
                 desafios_reales, genericos, rubro, pais)
+            _guardar_cache_desafios(rubro, pais, desafios_reales, fuentes)
             logger.info(f"[CHALLENGES] ✓ {len(desafios_reales)} reales + "
                         f"3 genéricos combinados")
             return results
@@ -155,6 +403,85 @@ async def investigar_desafios_empresa(rubro: str,
     return results
 
 
+async def precalentar_desafios_top_rubros(top_n: int = PREWARM_TOP_N):
+    """
+    Job programado: refresca el cache de los top-N (rubro, país)
+    más frecuentes en leads_fortia, así la mayoría de los leads
+    obtiene desafíos al instante.
+    Solo investiga los que no están en cache o vencen en < 1/2 TTL.
+    """
+    try:
+        db = get_database()
+        if db is None:
+            logger.warning("[PREWARM] No hay conexión a MongoDB")
+            return
+
+        logger.info("[PREWARM] ══════ Precalentando desafíos ══════")
+
+        pipeline = [{
+            "$project": {
+                "rubro": {"$ifNull": ["$business_activity", "$rubro"]},
+                "pais": {"$ifNull": ["$country_detected", "$pais_detectado"]}
+            }
+        }, {
+            "$match": {
+                "rubro": {"$nin": [None, "", "No encontrado",
+                                   "No proporcionado"]}
+            }
+        }, {
+            "$group": {
+                "_id": {"rubro": "$rubro", "pais": "$pais"},
+                "count": {"$sum": 1}
+            }
+        }]
+
+        # Agrupar por clave normalizada (muchas variantes → una clave)
+        conteo = {}
+        for row in db["leads_fortia"].aggregate(pipeline):
+            rubro = row["_id"].get("rubro") or ""
+            pais = row["_id"].get("pais") or "Argentina"
+            if not isinstance(rubro, str):
+                continue
+            clave = (normalizar_rubro(rubro), normalizar_pais(pais))
+            if not clave[0]:
+                continue
+            total, ejemplo = conteo.get(clave, (0, (rubro, pais)))
+            conteo[clave] = (total + row["count"], ejemplo)
+
+        top = sorted(conteo.items(), key=lambda x: x[1][0],
+                     reverse=True)[:top_n]
+
+        collection = _desafios_cache_collection()
+        limite = datetime.now(timezone.utc) + timedelta(
+            days=DESAFIOS_CACHE_TTL_DIAS / 2)
+        refrescados = 0
+
+        for (rubro_key, pais_key), (total, (rubro, pais)) in top:
+            doc = None
+            if collection is not None:
+                doc = collection.find_one({
+                    "_id": f"{rubro_key}|{pais_key}",
+                    "expira_en": {"$gt": limite}
+                })
+            if doc:
+                continue
+
+            logger.info(f"[PREWARM] Investigando {rubro_key}|{pais_key} "
+                        f"({total} leads)")
+            try:
+                await investigar_desafios_empresa(rubro, pais,
+                                                  usar_cache=False)
+                refrescados += 1
+            except Exception as e:
+                logger.error(f"[PREWARM] Error en {rubro_key}: {e}")
+
+        logger.info(f"[PREWARM] ✓ {refrescados} rubros refrescados "
+                    f"(top {len(top)})")
+
+    except Exception as e:
+        logger.error(f"[PREWARM] Error general: {e}")
+
+
 async def _buscar_articulos_tavily(rubro: str, pais: str) -> tuple:
     """
     Busca artículos reales sobre desafíos del sector en 2026-2027.
@@ -176,43 +503,27 @@ async def _buscar_articulos_tavily(rubro: str, pais: str) -> tuple:
     all_content = []
     fuentes = []
 
-    try:
-        async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-            for query in queries[:2]:  # Solo 2 queries
-                try:
-                    logger.info(f"[CHALLENGES] Tavily query: {query}")
-                    response = await client.post(
-                        "https://api.tavily.com/search",
-                        json={
-                            "api_key": TAVILY_API_KEY,
-                            "query": query,
-                            "search_depth": "advanced",
-                            "include_raw_content": True,
-                            "max_results": 5
-                        })
-
-                    if response.status_code == 200:
-                        data = response.json()
-
-                        # Usar answer de Tavily si existe
-                        if data.get("answer"):
-                            all_content.append(data["answer"])
-
-                        for r in data.get("results", []):
-                            content = (r.get("raw_content")
-                                       or r.get("content", ""))
-                            if content and len(content) > 100:
-                                all_content.append(content[:2000])
-                            url = r.get("url", "")
-                            if url and url not in fuentes:
-                                fuentes.append(url)
-
-                except Exception as e:
-                    logger.warning(f"[CHALLENGES] Error en query: {e}")
-                    continue
-
-    except Exception as e:
-        logger.error(f"[CHALLENGES] Error Tavily: {e}")
+    for query in queries[:2]:  # Solo 2 queries
+        logger.info(f"[CHALLENGES] Tavily query: {query}")
+        try:
+            data = await tavily.buscar(query,
+                                       "advanced",
+                                       call_site="desafios_articulos")
+
+            # Usar answer de Tavily si existe
+            if data.get("answer"):
+                all_content.append(data["answer"])
+
+            for r in data.get("results", []):
+                content = (r.get("raw_content") or r.get("content", ""))
+                if content and len(content) > 100:
+                    all_content.append(content[:2000])
+                url = r.get("url", "")
+                if url and url not in fuentes:
+                    fuentes.append(url)
+        except Exception as e:
+            logger.warning(f"[CHALLENGES] Error en query: {e}")
+            continue
 
     contenido = "\n\n---\n\n".join(all_content[:5])
     logger.info(f"[CHALLENGES] Tavily: {len(all_content)} fragmentos, "
@@ -230,12 +541,18 @@ async def _extraer_desafios_con_gpt(contenido: str, rubro: str,
     if not OPENAI_API_KEY or not contenido:
         return []
 
+    # Fragmentos con más densidad de desafíos/tendencias
+    contenido_gpt = pack_content(contenido,
+                                 GPT_CONTENT_TOKENS,
+                                 keywords=KEYWORDS_DESAFIOS,
+                                 separator="\n\n---\n\n")
+
     # PROMPT MEJORADO - Más flexible
     prompt = f"""Sos un analista de negocios experto. Analiza el siguiente 
 contenido sobre empresas en el sector: "{rubro}" ({pais}).
 
 CONTENIDO DE INVESTIGACIÓN:
-{contenido[:8000]}
+{contenido_gpt}
 
 ---
 
@@ -263,6 +580,13 @@ retos o desafíos, responde: NONE
 
 Responde SOLO los 5 desafíos, uno por línea:"""
 
+    cache_key = gpt_cache.make_key("extraer_desafios", GPT_PROMPT_VERSION,
+                                   rubro, pais, contenido_gpt)
+    cached = gpt_cache.get("extraer_desafios", cache_key)
+    if cached is not None:
+        logger.info(f"[CHALLENGES] ✓ Desafíos desde cache: {cached}")
+        return list(cached)
+
     try:
         async with httpx.AsyncClient(timeout=30.0) as client:
             response = await client.post(
@@ -313,6 +637,7 @@ Responde SOLO los 5 desafíos, uno por línea:"""
                         desafios.append(linea)
 
                 logger.info(f"[CHALLENGES] GPT extrajo: {desafios}")
+                gpt_cache.set("extraer_desafios", cache_key, desafios[:5])
                 return desafios[:5]
 
     except Exception as e:
@@ -0,0 +1,181 @@
+"""
+Resumen incremental de conversaciones largas para DANIA/Fortia
+El agente recibe el resumen más los turnos más nuevos que entran, junto
+con él, en HISTORY_TOKEN_BUDGET; lo que queda afuera se pliega en el
+resumen, que se actualiza después de enviar la respuesta (fuera del
+hot path).
+
+El resumen vive en agent_state (campo resumen) junto con cuántos
+mensajes del historial ya cubre, así cada corrida solo resume lo nuevo.
+Como se pliega de a RESUMEN_MIN_MENSAJES, los que ya salieron de la
+ventana pero todavía no se resumieron se le pasan al agente igual
+(historial_para_agente).
+"""
+import asyncio
+import logging
+from typing import Optional
+
+from pymongo.errors import PyMongoError
+
+from config import HISTORY_TOKEN_BUDGET
+from services.mongodb import get_database, formatear_historial
+from services.agent_state import cargar_estado, guardar_resumen
+from utils.token_budget import count_tokens, window_messages
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_MODEL = "gpt-4o-mini"
+# Límite de mensajes del historial que recibe el agente (process_message)
+HISTORY_MAX_MESSAGES = 20
+# No llamar al modelo por 1-2 mensajes: acumular un poco antes
+RESUMEN_MIN_MENSAJES = 6
+# Mensajes a traer para el agente: ventana + cola todavía sin resumir
+HISTORIAL_AGENTE = HISTORY_MAX_MESSAGES + RESUMEN_MIN_MENSAJES
+
+_en_progreso = set()
+
+
+def presupuesto_historial(resumen: str = "") -> int:
+    """Tokens para los turnos: HISTORY_TOKEN_BUDGET menos el resumen."""
+    return max(HISTORY_TOKEN_BUDGET - count_tokens(resumen), 0)
+
+
+def ventana_historial(historial: list, resumen: str = "") -> list:
+    """
+    Ventana de historial del agente (la misma para el agente y el
+    resumen): últimos HISTORY_MAX_MESSAGES que entran, junto con el
+    resumen, en HISTORY_TOKEN_BUDGET.
+    """
+    return window_messages(historial[-HISTORY_MAX_MESSAGES:],
+                           presupuesto_historial(resumen))
+
+
+def historial_para_agente(historial: list,
+                          total: Optional[int],
+                          resumidos: int,
+                          resumen: str = "") -> list:
+    """
+    Ventana + los mensajes anteriores a ella que el resumen todavía no
+    cubre, para que ningún mensaje quede fuera del resumen y del prompt.
+    La cola sin resumir también respeta el presupuesto (resumen + cola
+    dentro de HISTORY_TOKEN_BUDGET): si el resumen está muy atrasado, se
+    recorta por los más viejos.
+
+    Args:
+        historial: Últimos mensajes de la conversación, el último es el
+            más nuevo
+        total: Cantidad de mensajes (con texto) de la conversación
+            completa (None si no se conoce: solo la ventana)
+        resumidos: Mensajes (desde el inicio) que cubre el resumen
+        resumen: Texto del resumen que acompaña al historial
+    """
+    ventana = ventana_historial(historial, resumen)
+    if total is None:
+        return ventana
+
+    # Posición en `historial` del primer mensaje sin resumir
+    anteriores = max(total - len(historial), 0)
+    inicio = min(max(resumidos - anteriores, 0), len(historial) - len(ventana))
+    if resumidos < anteriores:
+        logger.warning(f"[RESUMEN] Resumen atrasado: cubre {resumidos} de "
+                       f"{total} mensajes, {anteriores - resumidos} fuera "
+                       f"del historial")
+
+    cola = historial[inicio:]
+    if len(cola) == len(ventana):
+        return ventana
+    recortada = window_messages(cola, presupuesto_historial(resumen))
+    if len(recortada) < len(cola):
+        logger.warning(f"[RESUMEN] Cola sin resumir recortada por "
+                       f"presupuesto: {len(recortada)}/{len(cola)} mensajes")
+    return recortada
+
+
+def _mensajes_fuera_de_ventana(historial: list, resumen: str = "") -> int:
+    """Cuántos mensajes (desde el inicio) no entran en la ventana."""
+    return len(historial) - len(ventana_historial(historial, resumen))
+
+
+def _generar_resumen(resumen_previo: str, nuevos: list) -> str:
+    """Llama al modelo para integrar los mensajes nuevos al resumen."""
+    from services.openai_agent import client
+    if client is None:
+        return ""
+
+    conversacion = "\n".join(
+        f"{'Lead' if m['role'] == 'user' else 'DANIA'}: {m['content']}"
+        for m in nuevos)
+
+    response = client.chat.completions.create(
+        model=SUMMARY_MODEL,
+        messages=[{
+            "role":
+            "system",
+            "content":
+            ("Actualizá el resumen de esta conversación de WhatsApp en "
+             "español, en máximo 200 palabras. Conservá: datos del lead y "
+             "su empresa, desafíos mencionados, respuestas a las preguntas "
+             "de calificación, compromisos y siguiente paso. No inventes.")
+        }, {
+            "role":
+            "user",
+            "content":
+            (f"RESUMEN ACTUAL:\n{resumen_previo or '(vacío)'}\n\n"
+             f"MENSAJES NUEVOS:\n{conversacion}")
+        }],
+        temperature=0.3,
+        max_tokens=400)
+    return (response.choices[0].message.content or "").strip()
+
+
+async def actualizar_resumen_rolling(phone: str) -> bool:
+    """
+    Pliega en el resumen los mensajes que ya no entran en la ventana.
+    Pensado para correr con asyncio.create_task después de responder.
+    """
+    if phone in _en_progreso:
+        return False
+    _en_progreso.add(phone)
+
+    try:
+        db = get_database()
+        if db is None:
+            return False
+
+        doc = await asyncio.to_thread(db["chat_history"].find_one,
+                                      {"sessionId": phone}, {
+                                          "mensajes": 1,
+                                          "messages": 1
+                                      })
+        if not doc:
+            return False
+
+        historial = formatear_historial(
+            doc.get("mensajes") or doc.get("messages") or [])
+        estado = await asyncio.to_thread(cargar_estado, phone)
+        resumen = estado["resumen"]
+        hasta = _mensajes_fuera_de_ventana(historial, resumen["texto"])
+        nuevos = historial[resumen["mensajes"]:hasta]
+
+        if len(nuevos) < RESUMEN_MIN_MENSAJES:
+            return False
+
+        logger.info(f"[RESUMEN] Plegando {len(nuevos)} mensajes de {phone} "
+                    f"({resumen['mensajes']}→{hasta})")
+        texto = await asyncio.to_thread(_generar_resumen, resumen["texto"],
+                                        nuevos)
+        if not texto:
+            return False
+
+        await asyncio.to_thread(guardar_resumen, phone, texto, hasta)
+        logger.info(f"[RESUMEN] ✓ Resumen actualizado para {phone}")
+        return True
+
+    except PyMongoError as e:
+        logger.error(f"[RESUMEN] Error leyendo historial: {e}")
+        return False
+    except Exception as e:
+        logger.error(f"[RESUMEN] Error generando resumen: {e}")
+        return False
+    finally:
+        _en_progreso.discard(phone)
@@ -2,10 +2,22 @@
 Búsqueda de info DANIA/Fortia desde hello.dania.ai
 Reemplaza Tool_Milvus_DANIA de n8n
 """
+import re
+import os
+import math
+import time
+import asyncio
 import logging
 import httpx
-import os
-from typing import Optional, Dict
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Optional, Dict, List
+
+from services.gpt_cache import gpt_cache
+from services.tavily_search import tavily
+from services.mongodb import get_database
+from utils.text_cleaner import fold_accents
+from utils.token_budget import pack_content, split_chunks
 
 logger = logging.getLogger(__name__)
 
@@ -21,7 +33,159 @@ DANIA_PAGES = [
     "https://hello.dania.ai/precios",
 ]
 
-_dania_cache: Dict[str, str] = {}
+GPT_CONTEXT_TOKENS = 3000
+GPT_PROMPT_VERSION = "dania-v1"
+
+# Índice local (BM25) sobre las páginas de DANIA
+INDEX_TTL_SECONDS = 12 * 3600
+INDEX_COLLECTION = "dania_knowledge"
+INDEX_TOP_K = 5
+# Tras un fetch fallido de Jina no se reintenta hasta pasado este tiempo
+# (se sigue usando el índice viejo, si hay)
+INDEX_RETRY_SECONDS = 5 * 60
+
+_STOPWORDS = {
+    "que", "para", "con", "por", "los", "las", "del", "una", "uno", "como",
+    "mas", "pero", "sus", "les", "nos", "este", "esta", "esto", "son", "hay",
+    "the", "and", "for", "you", "your", "con", "sin", "sobre", "entre",
+    "cual", "cuales", "cuanto", "tiene", "tienen", "puedo", "pueden"
+}
+
+
+def _tokenizar(texto: str) -> List[str]:
+    texto = fold_accents(texto or "").lower()
+    return [t for t in re.findall(r'[a-z0-9]+', texto)
+            if len(t) > 2 and t not in _STOPWORDS]
+
+
+class BM25Index:
+    """Índice BM25 en memoria sobre chunks de texto (sin dependencias)."""
+
+    def __init__(self, chunks: List[Dict], k1: float = 1.5, b: float = 0.75):
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+        self._tfs = [Counter(_tokenizar(c["texto"])) for c in chunks]
+        self._lens = [sum(tf.values()) for tf in self._tfs]
+        self._avg_len = (sum(self._lens) / len(self._lens)) if chunks else 0
+        df = Counter()
+        for tf in self._tfs:
+            df.update(tf.keys())
+        n = len(chunks)
+        self._idf = {
+            t: math.log(1 + (n - f + 0.5) / (f + 0.5))
+            for t, f in df.items()
+        }
+
+    def search(self, query: str, top_k: int = INDEX_TOP_K) -> List[Dict]:
+        """Retorna los top_k chunks con score > 0, ordenados por score."""
+        terminos = set(_tokenizar(query))
+        if not terminos or not self.chunks:
+            return []
+
+        scores = []
+        for i, tf in enumerate(self._tfs):
+            score = 0.0
+            norm = self.k1 * (1 - self.b + self.b * self._lens[i] /
+                              (self._avg_len or 1))
+            for t in terminos:
+                f = tf.get(t)
+                if f:
+                    score += self._idf[t] * f * (self.k1 + 1) / (f + norm)
+            if score > 0:
+                scores.append((score, i))
+
+        scores.sort(reverse=True)
+        return [{**self.chunks[i], "score": round(sc, 3)}
+                for sc, i in scores[:top_k]]
+
+
+class DaniaAnswerCache:
+    """
+    Cache de respuestas para preguntas repetidas sobre DANIA.
+    Matchea casi-duplicados con Jaccard de trigramas de caracteres
+    (local, sin embeddings). Se invalida al refrescar el índice.
+    """
+
+    def __init__(self, umbral: float = 0.72, max_size: int = 300,
+                 ttl_seconds: int = INDEX_TTL_SECONDS):
+        self._entries: List[Dict] = []
+        self._umbral = umbral
+        self._max_size = max_size
+        self._ttl = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalizar(query: str) -> str:
+        texto = fold_accents(query or "").lower()
+        return " ".join(re.findall(r'[a-z0-9]+', texto))
+
+    @staticmethod
+    def _ngramas(texto: str, n: int = 3) -> set:
+        texto = f" {texto} "
+        return {texto[i:i + n] for i in range(max(len(texto) - n + 1, 1))}
+
+    def get(self, query: str) -> Optional[Dict]:
+        normalizada = self.normalizar(query)
+        if not normalizada:
+            return None
+        ngramas = self._ngramas(normalizada)
+        ahora = time.time()
+
+        mejor, mejor_sim = None, 0.0
+        for entry in self._entries:
+            if ahora - entry["ts"] > self._ttl:
+                continue
+            inter = len(ngramas & entry["ngramas"])
+            sim = inter / (len(ngramas | entry["ngramas"]) or 1)
+            if sim > mejor_sim:
+                mejor, mejor_sim = entry, sim
+
+        if mejor and mejor_sim >= self._umbral:
+            self.hits += 1
+            logger.info(f"[DANIA] ✓ Respuesta cacheada (sim {mejor_sim:.2f}): "
+                        f"'{mejor['query']}'")
+            return mejor["respuesta"]
+
+        self.misses += 1
+        return None
+
+    def set(self, query: str, respuesta: Dict):
+        normalizada = self.normalizar(query)
+        if not normalizada:
+            return
+        self._entries = [e for e in self._entries if e["query"] != normalizada]
+        self._entries.append({
+            "query": normalizada,
+            "ngramas": self._ngramas(normalizada),
+            "respuesta": respuesta,
+            "ts": time.time()
+        })
+        if len(self._entries) > self._max_size:
+            self._entries = self._entries[-self._max_size:]
+
+    def clear(self):
+        self._entries = []
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "entradas": len(self._entries)
+        }
+
+
+answer_cache = DaniaAnswerCache()
+
+_dania_pages: Dict[str, str] = {}
+_indice: Optional[BM25Index] = None
+_indice_actualizado: float = 0.0
+_indice_version: int = 0
+_indice_fallo: float = 0.0
+_indice_lock = asyncio.Lock()
 
 
 async def fetch_dania_page_jina(url: str) -> Optional[str]:
@@ -41,42 +205,157 @@ async def search_dania_tavily(query: str) -> Optional[str]:
     if not TAVILY_API_KEY:
         return None
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                "https://api.tavily.com/search",
-                json={"api_key": TAVILY_API_KEY, "query": f"site:hello.dania.ai {query}", "search_depth": "advanced", "include_answer": True, "include_raw_content": True, "max_results": 5}
-            )
-            if response.status_code == 200:
-                data = response.json()
-                parts = []
-                if data.get("answer"):
-                    parts.append(f"Resumen: {data['answer']}")
-                for r in data.get("results", []):
-                    if "dania" in r.get("url", "").lower():
-                        parts.append(f"\n{r.get('title', '')}:\n{(r.get('raw_content') or r.get('content', ''))[:2000]}")
-                if parts:
-                    return "\n".join(parts)[:15000]
+        data = await tavily.buscar(f"site:hello.dania.ai {query}", "advanced", call_site="dania_knowledge")
+        parts = []
+        if data.get("answer"):
+            parts.append(f"Resumen: {data['answer']}")
+        for r in data.get("results", []):
+            if "dania" in r.get("url", "").lower():
+                parts.append(f"\n{r.get('title', '')}:\n{(r.get('raw_content') or r.get('content', ''))[:2000]}")
+        if parts:
+            return "\n".join(parts)[:15000]
         return None
     except:
         return None
 
 
+def _construir_indice(pages: Dict[str, str]):
+    """Chunkea las páginas y reconstruye el índice BM25 en memoria."""
+    global _dania_pages, _indice, _indice_version
+    chunks = []
+    for url, content in pages.items():
+        for texto in split_chunks(content):
+            chunks.append({"url": url, "texto": texto})
+    _dania_pages = dict(pages)
+    _indice = BM25Index(chunks)
+    _indice_version += 1
+    # Las respuestas cacheadas pueden estar desactualizadas
+    answer_cache.clear()
+    logger.info(f"[DANIA] ✓ Índice v{_indice_version}: {len(pages)} páginas, "
+                f"{len(chunks)} chunks")
+
+
+def _cargar_paginas_mongo() -> Optional[dict]:
+    try:
+        db = get_database()
+        if db is None:
+            return None
+        return db[INDEX_COLLECTION].find_one({"_id": "paginas"})
+    except Exception as e:
+        logger.warning(f"[DANIA] Error leyendo índice de MongoDB: {e}")
+        return None
+
+
+def _guardar_paginas_mongo(pages: Dict[str, str]):
+    try:
+        db = get_database()
+        if db is None:
+            return
+        db[INDEX_COLLECTION].update_one({"_id": "paginas"}, {
+            "$set": {
+                "paginas": [{"url": u, "contenido": c}
+                            for u, c in pages.items()],
+                "actualizado_en": datetime.now(timezone.utc)
+            }
+        }, upsert=True)
+    except Exception as e:
+        logger.warning(f"[DANIA] Error guardando índice en MongoDB: {e}")
+
+
+async def refrescar_indice_dania(forzar: bool = False) -> int:
+    """
+    Construye/refresca el índice local de DANIA.
+    1. Si el índice en memoria está vigente → nada
+    2. Si MongoDB tiene páginas vigentes → reconstruir desde ahí
+    3. Si no → fetch concurrente de DANIA_PAGES (Jina) y persistir
+
+    Si el fetch falla, se recuerda el fallo y durante INDEX_RETRY_SECONDS
+    no se vuelve a intentar: las consultas usan el índice viejo (o las
+    páginas vencidas de MongoDB) en vez de esperar otro timeout.
+    Mientras otro refresco está en curso, quien ya tiene índice no espera.
+
+    Returns: versión actual del índice
+    """
+    global _indice_actualizado, _indice_fallo
+
+    if not forzar and _indice is not None and _indice_lock.locked():
+        return _indice_version
+
+    async with _indice_lock:
+        ahora = time.time()
+        if (not forzar and _indice is not None
+                and ahora - _indice_actualizado < INDEX_TTL_SECONDS):
+            return _indice_version
+
+        if not forzar and ahora - _indice_fallo < INDEX_RETRY_SECONDS:
+            return _indice_version
+
+        doc = None
+        if not forzar:
+            doc = _cargar_paginas_mongo()
+            if doc and doc.get("paginas") and doc.get("actualizado_en"):
+                actualizado = doc["actualizado_en"]
+                if actualizado.tzinfo is None:
+                    actualizado = actualizado.replace(tzinfo=timezone.utc)
+                if ahora - actualizado.timestamp() < INDEX_TTL_SECONDS:
+                    _construir_indice({p["url"]: p["contenido"]
+                                       for p in doc["paginas"]})
+                    _indice_actualizado = actualizado.timestamp()
+                    return _indice_version
+
+        contenidos = await asyncio.gather(
+            *[fetch_dania_page_jina(url) for url in DANIA_PAGES])
+        pages = {url: c for url, c in zip(DANIA_PAGES, contenidos) if c}
+
+        if not pages:
+            _indice_fallo = ahora
+            logger.warning(f"[DANIA] No se pudo descargar ninguna página, "
+                           f"reintento en {INDEX_RETRY_SECONDS}s")
+            if _indice is None and doc and doc.get("paginas"):
+                # Mejor páginas vencidas que ningún índice
+                _construir_indice({p["url"]: p["contenido"]
+                                   for p in doc["paginas"]})
+            return _indice_version
+
+        _indice_fallo = 0.0
+
+        _construir_indice(pages)
+        _indice_actualizado = ahora
+        _guardar_paginas_mongo(pages)
+        return _indice_version
+
+
 async def get_dania_knowledge_base() -> str:
-    global _dania_cache
-    if _dania_cache:
-        return "\n\n".join(_dania_cache.values())
-    all_content = []
-    for url in DANIA_PAGES:
-        content = await fetch_dania_page_jina(url)
-        if content:
-            _dania_cache[url] = content
-            all_content.append(f"=== {url} ===\n{content}")
-    return "\n\n".join(all_content) if all_content else ""
+    await refrescar_indice_dania()
+    return "\n\n".join(f"=== {url} ===\n{content}"
+                       for url, content in _dania_pages.items())
+
+
+async def buscar_chunks_dania(query: str,
+                              top_k: int = INDEX_TOP_K) -> List[Dict]:
+    """Top chunks del índice local para la consulta (sin red si está vigente)."""
+    await refrescar_indice_dania()
+    if _indice is None:
+        return []
+    return _indice.search(query, top_k=top_k)
+
+
+def _keywords_consulta(query: str) -> Dict[str, list]:
+    """Palabras de la pregunta (sin stopwords cortas) para puntuar chunks."""
+    palabras = [p.strip("¿?¡!.,;:()").lower() for p in query.split()]
+    return {"consulta": [p for p in palabras if len(p) > 3]}
 
 
 async def generate_dania_response(query: str, context: str) -> str:
     if not OPENAI_API_KEY or not context:
         return "No encontré información sobre eso en la documentación de Dania."
+    context = pack_content(context, GPT_CONTEXT_TOKENS,
+                           keywords=_keywords_consulta(query))
+    cache_key = gpt_cache.make_key("dania_response", GPT_PROMPT_VERSION,
+                                   query.strip().lower(), context)
+    cached = gpt_cache.get("dania_response", cache_key)
+    if cached is not None:
+        return cached
     try:
         async with httpx.AsyncClient(timeout=60.0) as client:
             response = await client.post(
@@ -86,14 +365,17 @@ async def generate_dania_response(query: str, context: str) -> str:
                     "model": "gpt-4o",
                     "messages": [
                         {"role": "system", "content": "Sos un asistente experto en DANIA y Fortia. Respondé SOLO con información del contexto. Usá voseo argentino. NO inventes."},
-                        {"role": "user", "content": f"CONTEXTO:\n{context[:12000]}\n\nPREGUNTA:\n{query}"}
+                        {"role": "user", "content": f"CONTEXTO:\n{context}\n\nPREGUNTA:\n{query}"}
                     ],
                     "temperature": 0.3,
                     "max_tokens": 1000
                 }
             )
             if response.status_code == 200:
-                return response.json()["choices"][0]["message"]["content"]
+                answer = response.json()["choices"][0]["message"]["content"]
+                gpt_cache.set("dania_response", cache_key, answer,
+                              ttl_seconds=24 * 3600)
+                return answer
         return "Hubo un error al procesar tu consulta sobre Dania."
     except:
         return "Hubo un error al procesar tu consulta sobre Dania."
@@ -102,15 +384,29 @@ async def generate_dania_response(query: str, context: str) -> str:
 async def buscar_info_dania(query: str) -> Dict:
     logger.info(f"[DANIA] Buscando: {query}")
     try:
-        tavily_content = await search_dania_tavily(query)
-        if not tavily_content or len(tavily_content) < 200:
-            jina_content = await get_dania_knowledge_base()
-            context = jina_content if jina_content else tavily_content
+        # 0. Pregunta repetida (o casi igual) ya respondida
+        cached = answer_cache.get(query)
+        if cached:
+            return {**cached, "query": query, "cache": True}
+
+        # 1. Índice local (sin round trip a Tavily)
+        chunks = await buscar_chunks_dania(query)
+        if chunks:
+            logger.info(f"[DANIA] ✓ {len(chunks)} chunks del índice local "
+                        f"(top score {chunks[0]['score']})")
+            context = "\n\n".join(f"[{c['url']}]\n{c['texto']}"
+                                   for c in chunks)
         else:
-            context = tavily_content
+            # 2. Fallback: búsqueda en el sitio con Tavily
+            context = await search_dania_tavily(query)
+            if not context or len(context) < 200:
+                context = await get_dania_knowledge_base() or context
         if not context:
             return {"response": "No pude acceder a la información de Dania.", "source": "error", "query": query}
         response = await generate_dania_response(query, context)
+        if not response.startswith(("Hubo un error", "No encontré")):
+            answer_cache.set(query, {"response": response,
+                                     "source": "hello.dania.ai"})
         return {"response": response, "source": "hello.dania.ai", "query": query}
     except Exception as e:
         return {"response": "Hubo un error buscando información de Dania.", "source": "error", "query": query, "error": str(e)}
@@ -0,0 +1,273 @@
+"""
+Respuesta rápida local para mensajes triviales (sin LLM)
+"ok", "gracias", "👍", "dale", stickers y mensajes vacíos pasaban por una
+ronda completa de function calling con system prompt e historial.
+
+Clasificador en dos niveles:
+1. Reglas: vacío, placeholder de sticker/reacción, solo emojis
+   (positivos; 👎 y compañía van al agente), frases exactas conocidas
+   (confianza 1.0). Un "?" o cualquier palabra fuera del vocabulario
+   de EJEMPLOS ("ok pero cuanto sale", "ok cancelalo", "no gracias")
+   manda el mensaje al agente
+2. Modelo local: Naive Bayes multinomial sobre n-gramas de caracteres,
+   entrenado al importar con los ejemplos de EJEMPLOS, solo para
+   combinar palabras conocidas ("dale genial gracias"). Decide por
+   margen entre las dos clases más probables, no por la posterior
+   (que con n-gramas satura en ~1.0)
+
+La decisión depende de la etapa de la conversación y de si el último
+mensaje del bot fue una pregunta (ahí "dale"/"ok" es una respuesta y
+va al agente).
+
+Modos (FAST_PATH_MODE): "off", "shadow" (decide y loguea acuerdo con el
+LLM, pero responde el LLM) y "on".
+"""
+import re
+import math
+import logging
+from collections import Counter, defaultdict
+from typing import Optional
+
+from config import FAST_PATH_MODE
+from utils.text_cleaner import fold_accents
+
+logger = logging.getLogger(__name__)
+
+# Margen mínimo (nats por n-grama) entre la 1ª y la 2ª clase del modelo.
+# Con leave-one-out sobre EJEMPLOS, desde 0.3 acierta el 94%
+MARGEN_MINIMO = 0.3
+MAX_CHARS = 40
+# Respuesta del LLM considerada "trivial" al comparar en modo shadow
+SHADOW_MAX_CHARS_RESPUESTA = 120
+
+EJEMPLOS = {
+    "agradecimiento": [
+        "gracias", "muchas gracias", "mil gracias", "gracias!",
+        "graciass", "gracias genio", "gracias crack", "te agradezco",
+        "muy amable", "gracias por todo", "buenisimo gracias",
+        "genial gracias", "perfecto gracias", "ok gracias", "dale gracias",
+        "gracias igualmente", "mil gracias!!", "thanks", "grax", "grs"
+    ],
+    "confirmacion": [
+        "ok", "oka", "okey", "okk", "dale", "dale dale", "perfecto",
+        "perfecto!", "genial", "listo", "buenisimo", "excelente", "joya",
+        "barbaro", "de una", "entendido", "va", "bien", "ok perfecto",
+        "dale perfecto", "si ok", "copiado", "esta bien", "mmm ok",
+        "ah ok", "oki", "bueno", "buenisimo!", "okis", "super"
+    ],
+    "otro": [
+        "hola", "buenas", "quiero info", "cuanto cuesta", "mi web es",
+        "somos 15 personas", "no tenemos web", "pablo pansa", "si tengo",
+        "no", "si", "mas o menos", "nada", "poco", "bastante", "quiero agendar",
+        "como funciona", "que es dania", "tengo una duda", "cancelar reunion",
+        "mi email es", "5 personas", "si intentamos", "no todavia",
+        "www.empresa.com", "me interesa", "precio", "no entiendo",
+        "me llamo juan", "trabajamos en construccion", "no se",
+        "mmm no se", "no sabria", "tal vez", "depende"
+    ],
+}
+
+EMOJIS_AGRADECIMIENTO = {"🙏", "🙌", "❤", "🤗", "😘"}
+EMOJIS_CONFIRMACION = {
+    "👍", "👌", "✅", "💪", "👏", "😊", "🙂", "😀", "😁", "😃", "😄", "😉",
+    "🔥", "💯", "🤝", "✌", "☺"
+}
+# Modificadores que no cambian el emoji (tono de piel, variación, ZWJ)
+RE_MODIFICADORES_EMOJI = re.compile(r'[\U0001F3FB-\U0001F3FF\uFE0F\u200D]')
+
+RE_PLACEHOLDER = re.compile(r'^\[Mensaje tipo (\w+) recibido\]$')
+RE_SOLO_EMOJIS = re.compile(
+    r'^[\U0001F000-\U0001FAFF☀-➿‍️\s]+$')
+
+# Respuestas por (clase, etapa). None = absorber sin responder.
+PLANTILLAS = {
+    ("agradecimiento", "derivacion"):
+    "¡De nada! Cualquier cosa escribime por acá 🙌",
+    ("confirmacion", "derivacion"): None,
+    ("agradecimiento", "investigacion"): "Dale, sigo investigando...",
+    ("confirmacion", "investigacion"): "Dale, sigo investigando...",
+    ("sticker", "derivacion"): None,
+    ("sticker", "investigacion"): None,
+}
+
+
+def _normalizar(texto: str) -> str:
+    """Minúsculas sin acentos ni puntuación ("?" se chequea antes)."""
+    texto = fold_accents((texto or "").lower().strip())
+    texto = re.sub(r'[!¡.,;:¿?]+', ' ', texto)
+    # "okkkk" → "okk", "graciassss" → "graciass"
+    texto = re.sub(r'([a-z])\1{2,}', r'\1\1', texto)
+    return re.sub(r'\s+', ' ', texto).strip()
+
+
+FRASES_EXACTAS = {
+    _normalizar(f): clase
+    for clase in ("otro", "agradecimiento", "confirmacion")
+    for f in EJEMPLOS[clase]
+}
+
+# Palabras de los ejemplos triviales: otra palabra = contenido real
+VOCABULARIO_TRIVIAL = {
+    palabra
+    for clase in ("agradecimiento", "confirmacion")
+    for ejemplo in EJEMPLOS[clase] for palabra in _normalizar(ejemplo).split()
+}
+
+
+def _emojis(texto: str) -> set:
+    return {c for c in RE_MODIFICADORES_EMOJI.sub('', texto) if not c.isspace()}
+
+
+def _ngramas(texto: str) -> list:
+    t = f" {texto} "
+    return [t[i:i + n] for n in (2, 3) for i in range(len(t) - n + 1)]
+
+
+class NaiveBayesNgramas:
+    """Naive Bayes multinomial sobre n-gramas de caracteres (Laplace)."""
+
+    def __init__(self, ejemplos: dict):
+        self.conteos = defaultdict(Counter)
+        self.totales = Counter()
+        self.docs = Counter()
+        vocab = set()
+        for clase, textos in ejemplos.items():
+            for texto in textos:
+                grams = _ngramas(_normalizar(texto))
+                self.conteos[clase].update(grams)
+                self.totales[clase] += len(grams)
+                self.docs[clase] += 1
+                vocab.update(grams)
+        self.vocab_size = len(vocab)
+        self.total_docs = sum(self.docs.values())
+
+    def predecir(self, texto: str) -> tuple:
+        """
+        Retorna (clase, margen): log-verosimilitud de la clase ganadora
+        menos la de la segunda, promediada por n-grama.
+        """
+        grams = _ngramas(_normalizar(texto))
+        log_probs = {}
+        for clase in self.conteos:
+            lp = math.log(self.docs[clase] / self.total_docs)
+            denom = self.totales[clase] + self.vocab_size
+            for g in grams:
+                lp += math.log((self.conteos[clase][g] + 1) / denom)
+            log_probs[clase] = lp
+        primera, segunda = sorted(log_probs.values(), reverse=True)[:2]
+        clase = max(log_probs, key=log_probs.get)
+        return clase, (primera - segunda) / max(1, len(grams))
+
+
+_modelo = NaiveBayesNgramas(EJEMPLOS)
+
+_stats = {
+    "evaluados": 0,
+    "resueltos": 0,
+    "shadow_decisiones": 0,
+    "shadow_acuerdos": 0,
+}
+
+
+def clasificar(texto: str) -> tuple:
+    """
+    Clasifica un mensaje entrante.
+    Retorna (clase, confianza) con clase en agradecimiento /
+    confirmacion / sticker / otro. confianza es 1.0 en las reglas y el
+    margen del modelo (recortado a 1.0) en el resto.
+    """
+    texto = (texto or "").strip()
+    if not texto:
+        return "sticker", 1.0
+
+    match = RE_PLACEHOLDER.match(texto)
+    if match:
+        tipo = match.group(1)
+        # Imágenes, documentos, ubicación... pueden ser información útil
+        if tipo in ("sticker", "reaction"):
+            return "sticker", 1.0
+        return "otro", 1.0
+
+    if RE_SOLO_EMOJIS.match(texto):
+        emojis = _emojis(texto)
+        if emojis <= EMOJIS_AGRADECIMIENTO | EMOJIS_CONFIRMACION:
+            if emojis & EMOJIS_AGRADECIMIENTO:
+                return "agradecimiento", 1.0
+            return "confirmacion", 1.0
+        # 👎, 😡, 🤔... pueden ser un rechazo o una duda
+        return "otro", 1.0
+
+    # "ok?" es una pregunta
+    if (len(texto) > MAX_CHARS or "?" in texto or "¿" in texto
+            or any(c.isdigit() for c in texto)):
+        return "otro", 1.0
+
+    normalizado = _normalizar(texto)
+    if normalizado in FRASES_EXACTAS:
+        return FRASES_EXACTAS[normalizado], 1.0
+
+    if not normalizado or any(p not in VOCABULARIO_TRIVIAL
+                              for p in normalizado.split()):
+        return "otro", 1.0
+
+    clase, margen = _modelo.predecir(texto)
+    return clase, min(1.0, margen)
+
+
+def decidir(texto: str, etapa: str, chat_history: list) -> Optional[dict]:
+    """
+    Decide si el mensaje se resuelve sin LLM.
+
+    Returns:
+        None si va al agente, o {"clase", "confianza", "respuesta"}
+        (respuesta None = absorber sin contestar)
+    """
+    _stats["evaluados"] += 1
+
+    # Sin historial: corresponde el saludo inicial del agente
+    if not chat_history:
+        return None
+
+    clase, confianza = clasificar(texto)
+    if clase == "otro" or confianza < MARGEN_MINIMO:
+        return None
+
+    # Si el bot hizo una pregunta, "dale"/"ok" es la respuesta
+    ultimo_bot = next((m["content"] for m in reversed(chat_history)
+                       if m.get("role") == "assistant"), "")
+    if clase != "sticker" and ultimo_bot.rstrip().endswith("?"):
+        return None
+
+    if (clase, etapa) not in PLANTILLAS:
+        return None
+
+    return {
+        "clase": clase,
+        "confianza": round(confianza, 3),
+        "respuesta": PLANTILLAS[(clase, etapa)]
+    }
+
+
+def registrar_shadow(decision: dict, respuesta_llm: str, uso_tools: bool):
+    """
+    Compara la decisión local con lo que hizo el LLM.
+    Acuerdo = el LLM tampoco usó tools y respondió algo corto.
+    """
+    _stats["shadow_decisiones"] += 1
+    acuerdo = (not uso_tools
+               and len(respuesta_llm or "") <= SHADOW_MAX_CHARS_RESPUESTA)
+    if acuerdo:
+        _stats["shadow_acuerdos"] += 1
+    logger.info(f"[FASTPATH] shadow clase={decision['clase']} "
+                f"conf={decision['confianza']} acuerdo={acuerdo} "
+                f"llm={respuesta_llm[:60]!r}")
+
+
+def marcar_resuelto():
+    _stats["resueltos"] += 1
+
+
+def stats() -> dict:
+    decisiones = _stats["shadow_decisiones"]
+    acuerdo = _stats["shadow_acuerdos"] / decisiones if decisiones else 0.0
+    return {**_stats, "modo": FAST_PATH_MODE, "acuerdo_shadow": round(acuerdo, 3)}
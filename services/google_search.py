@@ -0,0 +1,244 @@
+"""
+Cliente único de Google Custom Search (CSE) para DANIA/Fortia
+google_buscar_linkedin_personal, _google_buscar_linkedin_interno y
+google_buscar_noticias llamaban a la API directo, sin cache y sin
+llevar la cuenta de la cuota diaria (100 gratis / 10k pagas).
+
+- Cache por query normalizada + CX: LRU en memoria + MongoDB con TTL
+  (colección google_cse_cache, mismo esquema que gpt_cache)
+- Cuota diaria: contador por día del Pacífico (cuando Google la
+  reinicia) en api_cuotas, compartido entre workers. Con la cuota baja
+  solo se gastan búsquedas esenciales y los call sites con respaldo
+  (LinkedIn → Tavily) dejan de usar Google
+- Variantes de fallback (opcional=True) no gastan la reserva de la
+  cuota: se piden solo si la búsqueda esencial no alcanzó
+- 429: solo si Google dice que es el límite diario se deja de usar
+  hasta mañana; si es por minuto, pausa corta (RATE_LIMIT_PAUSA_SECONDS)
+"""
+import json
+import time
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional
+from urllib.parse import quote
+
+import httpx
+import pytz
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
+
+from config import (GOOGLE_API_KEY, GOOGLE_SEARCH_CX, GOOGLE_CSE_DAILY_QUOTA,
+                    GOOGLE_CSE_QUOTA_RESERVE)
+from services.gpt_cache import GPTResultCache
+from services.mongodb import get_database
+from services.tavily_search import normalizar_query
+
+logger = logging.getLogger(__name__)
+
+CSE_URL = "https://www.googleapis.com/customsearch/v1"
+CACHE_TTL_SECONDS = 3 * 24 * 3600  # 3 días
+HTTP_TIMEOUT = 15.0
+CUOTAS_COLLECTION = "api_cuotas"
+# Google reinicia la cuota diaria a medianoche del Pacífico
+TZ_CUOTA = pytz.timezone("America/Los_Angeles")
+# 429 por límite por minuto: pausa antes de volver a pedir
+RATE_LIMIT_PAUSA_SECONDS = 60.0
+RAZONES_LIMITE_DIARIO = {"dailyLimitExceeded", "dailyLimitExceededUnreg"}
+
+
+def _dia_cuota() -> str:
+    return datetime.now(TZ_CUOTA).strftime("%Y-%m-%d")
+
+
+def _es_limite_diario(response: httpx.Response) -> bool:
+    """El 429 es por la cuota del día (y no por el límite por minuto)."""
+    try:
+        error = response.json().get("error") or {}
+    except ValueError:
+        return False
+    razones = {e.get("reason", "") for e in error.get("errors") or []}
+    mensaje = (error.get("message") or "").lower()
+    return bool(razones & RAZONES_LIMITE_DIARIO) or "per day" in mensaje
+
+
+class GoogleCSEClient:
+    """Búsquedas CSE con cache y cuota diaria."""
+
+    def __init__(self,
+                 cuota_diaria: int = GOOGLE_CSE_DAILY_QUOTA,
+                 reserva: int = GOOGLE_CSE_QUOTA_RESERVE):
+        self._cache = GPTResultCache(collection_name="google_cse_cache",
+                                     log_tag="GOOGLE-CACHE")
+        self._cuota = cuota_diaria
+        self._reserva = reserva
+        self._dia = ""
+        self._usados = 0
+        self._pausa_hasta = 0.0
+        self._tareas = set()
+        self._stats = {
+            "requests": 0,
+            "errores": 0,
+            "omitidas_sin_cuota": 0,
+            "omitidas_pausa": 0,
+            "cuota_agotada_api": 0,
+            "rate_limit_api": 0
+        }
+
+    # ═══════════════════════════════════════════════════════════════
+    # CUOTA DIARIA
+    # ═══════════════════════════════════════════════════════════════
+    def _cuotas(self):
+        db = get_database()
+        return db[CUOTAS_COLLECTION] if db is not None else None
+
+    def _cargar_dia(self):
+        """Al cambiar de día, leer lo ya gastado por otros workers."""
+        dia = _dia_cuota()
+        if dia == self._dia:
+            return
+        self._dia = dia
+        self._usados = 0
+        try:
+            collection = self._cuotas()
+            if collection is not None:
+                doc = collection.find_one({"_id": f"google_cse:{dia}"})
+                self._usados = (doc or {}).get("usados", 0)
+        except PyMongoError as e:
+            logger.warning(f"[GOOGLE] Error leyendo cuota: {e}")
+
+    def _registrar_uso(self, dia: str):
+        try:
+            collection = self._cuotas()
+            if collection is None:
+                return
+            doc = collection.find_one_and_update(
+                {"_id": f"google_cse:{dia}"}, {"$inc": {
+                    "usados": 1
+                }},
+                upsert=True,
+                return_document=ReturnDocument.AFTER)
+            if dia == self._dia:
+                self._usados = max(self._usados, doc.get("usados", 0))
+        except PyMongoError as e:
+            logger.warning(f"[GOOGLE] Error registrando cuota: {e}")
+
+    def restante(self) -> int:
+        # Día nuevo todavía sin cargar (buscar() lo carga antes de gastar)
+        if _dia_cuota() != self._dia:
+            return self._cuota
+        return max(0, self._cuota - self._usados)
+
+    def disponible(self) -> bool:
+        """
+        Hay cuota para búsquedas opcionales. Los call sites con otro
+        proveedor de respaldo deberían no usar Google si es False.
+        """
+        return bool(GOOGLE_API_KEY and GOOGLE_SEARCH_CX
+                    and time.monotonic() >= self._pausa_hasta
+                    and self.restante() > self._reserva)
+
+    def _reservar(self, opcional: bool) -> bool:
+        if time.monotonic() < self._pausa_hasta:
+            self._stats["omitidas_pausa"] += 1
+            return False
+        minimo = self._reserva if opcional else 0
+        if self.restante() <= minimo:
+            self._stats["omitidas_sin_cuota"] += 1
+            return False
+        self._usados += 1
+        if self.restante() == self._reserva:
+            logger.warning(f"[GOOGLE] Cuota diaria baja: quedan "
+                           f"{self._reserva}, solo búsquedas esenciales")
+        return True
+
+    # ═══════════════════════════════════════════════════════════════
+    # BÚSQUEDA
+    # ═══════════════════════════════════════════════════════════════
+    async def _request(self, query: str, num: int, date_restrict: str) -> dict:
+        url = (f"{CSE_URL}?cx={GOOGLE_SEARCH_CX}"
+               f"&q={quote(query)}&num={num}&key={GOOGLE_API_KEY}")
+        if date_restrict:
+            url += f"&dateRestrict={date_restrict}"
+        self._stats["requests"] += 1
+        registro = asyncio.create_task(
+            asyncio.to_thread(self._registrar_uso, self._dia))
+        self._tareas.add(registro)
+        registro.add_done_callback(self._tareas.discard)
+        try:
+            async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
+                response = await client.get(url)
+            if response.status_code == 200:
+                return response.json()
+            if response.status_code == 429 and _es_limite_diario(response):
+                # La API ya no acepta más hoy: no insistir hasta mañana
+                self._stats["cuota_agotada_api"] += 1
+                self._usados = self._cuota
+                logger.warning("[GOOGLE] Cuota diaria agotada (429)")
+            elif response.status_code == 429:
+                # Límite por minuto: pausa corta, la cuota del día sigue
+                self._stats["rate_limit_api"] += 1
+                try:
+                    pausa = float(response.headers.get("Retry-After", ""))
+                except ValueError:
+                    pausa = RATE_LIMIT_PAUSA_SECONDS
+                self._pausa_hasta = time.monotonic() + pausa
+                logger.warning(f"[GOOGLE] Rate limit (429), pausa de "
+                               f"{pausa:.0f}s")
+            else:
+                logger.warning(f"[GOOGLE] HTTP {response.status_code}")
+        except Exception as e:
+            logger.error(f"[GOOGLE] Error: {e}")
+        self._stats["errores"] += 1
+        return {}
+
+    async def buscar(self,
+                     query: str,
+                     call_site: str = "google",
+                     num: int = 10,
+                     opcional: bool = False,
+                     date_restrict: str = "") -> dict:
+        """
+        Búsqueda CSE.
+
+        Args:
+            opcional: si True, no se gasta la reserva de la cuota diaria
+            date_restrict: solo resultados recientes ("d7" = 7 días)
+
+        Returns:
+            JSON de la API ({"items": [...]}) o {} si falla o no hay cuota
+        """
+        if not GOOGLE_API_KEY or not GOOGLE_SEARCH_CX or not query:
+            return {}
+
+        key = GPTResultCache.make_key(
+            "google_cse", "v1",
+            json.dumps(
+                [GOOGLE_SEARCH_CX, num, date_restrict,
+                 normalizar_query(query)]))
+        cached = await asyncio.to_thread(self._cache.get, call_site, key)
+        if cached is not None:
+            return cached
+
+        await asyncio.to_thread(self._cargar_dia)
+        if not self._reservar(opcional):
+            logger.info(f"[GOOGLE] Sin cuota, omitida: {query[:60]}")
+            return {}
+
+        data = await self._request(query, num, date_restrict)
+        if data:
+            await asyncio.to_thread(self._cache.set, call_site, key, data,
+                                    CACHE_TTL_SECONDS)
+        return data
+
+    def stats(self) -> dict:
+        return {
+            **self._stats, "dia": self._dia,
+            "cuota_diaria": self._cuota,
+            "usados_hoy": self._usados,
+            "restante": max(0, self._cuota - self._usados),
+            "cache": self._cache.stats()
+        }
+
+
+google_cse = GoogleCSEClient()
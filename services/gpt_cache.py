@@ -0,0 +1,165 @@
+"""
+Cache de resultados de GPT por hash de contenido para DANIA/Fortia
+Si el prompt (versión + contenido empaquetado + parámetros) no cambió,
+se reutiliza la respuesta en vez de pagar otra completion.
+
+Dos niveles:
+- LRU en memoria (por proceso, TTL corto)
+- MongoDB colección gpt_cache con índice TTL (compartido entre workers)
+
+get/set se llaman desde asyncio.to_thread: el LRU en memoria va con lock.
+"""
+import time
+import hashlib
+import threading
+import logging
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timezone, timedelta
+from typing import Any, Optional
+
+from pymongo.errors import PyMongoError
+
+from services.mongodb import get_database
+
+logger = logging.getLogger(__name__)
+
+COLLECTION_NAME = "gpt_cache"
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600  # 7 días
+MEMORY_TTL_SECONDS = 3600
+MEMORY_MAX_SIZE = 500
+
+
+class GPTResultCache:
+    """Cache LRU en memoria + MongoDB con TTL. Contadores por call site."""
+
+    def __init__(self,
+                 memory_ttl: int = MEMORY_TTL_SECONDS,
+                 memory_max_size: int = MEMORY_MAX_SIZE,
+                 collection_name: str = COLLECTION_NAME,
+                 log_tag: str = "GPT-CACHE"):
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._collection_name = collection_name
+        self._log_tag = log_tag
+        self._memory_ttl = memory_ttl
+        self._memory_max_size = memory_max_size
+        self._index_ready = False
+        self._stats = defaultdict(lambda: {
+            "hits_memoria": 0,
+            "hits_mongo": 0,
+            "misses": 0
+        })
+
+    @staticmethod
+    def make_key(call_site: str, version: str, *parts: str) -> str:
+        """Hash estable de call site + versión del prompt + partes."""
+        h = hashlib.sha256()
+        for part in (call_site, version) + parts:
+            h.update((part or "").encode("utf-8", errors="ignore"))
+            h.update(b"\x1f")
+        return h.hexdigest()
+
+    def _collection(self):
+        db = get_database()
+        if db is None:
+            return None
+        collection = db[self._collection_name]
+        if not self._index_ready:
+            try:
+                collection.create_index("expira_en", expireAfterSeconds=0)
+                self._index_ready = True
+            except PyMongoError as e:
+                logger.warning(
+                    f"[{self._log_tag}] No se pudo crear índice TTL: {e}")
+        return collection
+
+    def _memory_get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            guardado, value = entry
+            if time.time() - guardado > self._memory_ttl:
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            return value
+
+    def _memory_set(self, key: str, value: Any):
+        with self._lock:
+            self._memory[key] = (time.time(), value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self._memory_max_size:
+                self._memory.popitem(last=False)
+
+    def get(self, call_site: str, key: str) -> Optional[Any]:
+        """Retorna el resultado cacheado o None (y cuenta hit/miss)."""
+        stats = self._stats[call_site]
+
+        value = self._memory_get(key)
+        if value is not None:
+            stats["hits_memoria"] += 1
+            logger.info(f"[{self._log_tag}] ✓ Hit memoria ({call_site})")
+            return value
+
+        try:
+            collection = self._collection()
+            if collection is not None:
+                doc = collection.find_one({"_id": key})
+                if doc and doc.get("expira_en"):
+                    expira = doc["expira_en"]
+                    if expira.tzinfo is None:
+                        expira = expira.replace(tzinfo=timezone.utc)
+                    if expira > datetime.now(timezone.utc):
+                        self._memory_set(key, doc.get("valor"))
+                        stats["hits_mongo"] += 1
+                        logger.info(
+                            f"[{self._log_tag}] ✓ Hit MongoDB ({call_site})")
+                        return doc.get("valor")
+        except PyMongoError as e:
+            logger.warning(f"[{self._log_tag}] Error leyendo cache: {e}")
+
+        stats["misses"] += 1
+        return None
+
+    def set(self,
+            call_site: str,
+            key: str,
+            value: Any,
+            ttl_seconds: int = DEFAULT_TTL_SECONDS):
+        """Guarda un resultado. No cachea valores vacíos."""
+        if not value:
+            return
+
+        self._memory_set(key, value)
+
+        try:
+            collection = self._collection()
+            if collection is None:
+                return
+            now = datetime.now(timezone.utc)
+            collection.update_one({"_id": key}, {
+                "$set": {
+                    "call_site": call_site,
+                    "valor": value,
+                    "creado_en": now,
+                    "expira_en": now + timedelta(seconds=ttl_seconds)
+                }
+            },
+                                  upsert=True)
+        except PyMongoError as e:
+            logger.warning(f"[{self._log_tag}] Error guardando cache: {e}")
+
+    def stats(self) -> dict:
+        """Contadores hit/miss por call site."""
+        resultado = {}
+        for call_site, s in self._stats.items():
+            total = s["hits_memoria"] + s["hits_mongo"] + s["misses"]
+            hits = s["hits_memoria"] + s["hits_mongo"]
+            resultado[call_site] = {
+                **s, "hit_rate": round(hits / total, 3) if total else 0.0
+            }
+        return resultado
+
+
+gpt_cache = GPTResultCache()
@@ -0,0 +1,131 @@
+"""
+Búsquedas con cobertura (hedging) entre proveedores
+Tavily + Google (LinkedIn) y Google + Apify (noticias) corrían en
+paralelo pero con asyncio.gather: se esperaba siempre al más lento
+aunque el otro ya hubiera devuelto un resultado excelente.
+
+primer_resultado_bueno() lanza todas las fuentes, retorna apenas una
+devuelve algo que pasa el umbral de calidad del call site y cancela el
+resto. Si ninguna pasa el umbral, espera a todas (como gather).
+
+Por call site se registra qué proveedor ganó y una estimación del
+tiempo ahorrado (latencia promedio del cancelado menos lo esperado).
+"""
+import time
+import asyncio
+import logging
+from collections import Counter
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Peso de la media móvil de latencia por proveedor
+EWMA_ALPHA = 0.3
+
+_latencias = {}
+_stats = {}
+
+
+def _registrar_latencia(clave: tuple, segundos: float):
+    previo = _latencias.get(clave)
+    _latencias[clave] = (segundos if previo is None else
+                         EWMA_ALPHA * segundos + (1 - EWMA_ALPHA) * previo)
+
+
+async def primer_resultado_bueno(fuentes: dict,
+                                 es_bueno: Callable,
+                                 call_site: str,
+                                 timeout: Optional[float] = None) -> dict:
+    """
+    Corre las fuentes en paralelo y corta en el primer resultado bueno.
+
+    Args:
+        fuentes: {proveedor: corrutina}
+        es_bueno: (proveedor, resultado) -> bool
+        call_site: nombre para métricas/logs ("linkedin", "noticias")
+        timeout: máximo total (lo que no terminó se cancela)
+
+    Returns:
+        {"ganador": proveedor o None,
+         "resultados": {proveedor: resultado} (solo los que terminaron
+                        sin error; los cancelados no aparecen)}
+    """
+    stats = _stats.setdefault(call_site, {
+        "llamadas": 0,
+        "cortes_tempranos": 0,
+        "ganadores": Counter(),
+        "segundos_ahorrados_est": 0.0
+    })
+    stats["llamadas"] += 1
+
+    inicio = time.monotonic()
+    tareas = {
+        asyncio.create_task(corrutina): proveedor
+        for proveedor, corrutina in fuentes.items()
+    }
+    resultados = {}
+    ganador = None
+    limite = inicio + timeout if timeout else None
+
+    try:
+        pendientes = set(tareas)
+        while pendientes:
+            restante = limite - time.monotonic() if limite else None
+            if restante is not None and restante <= 0:
+                break
+            hechas, pendientes = await asyncio.wait(
+                pendientes,
+                timeout=restante,
+                return_when=asyncio.FIRST_COMPLETED)
+            if not hechas:
+                break
+
+            for tarea in hechas:
+                proveedor = tareas[tarea]
+                _registrar_latencia((call_site, proveedor),
+                                    time.monotonic() - inicio)
+                try:
+                    resultado = tarea.result()
+                except Exception as e:
+                    logger.error(f"[HEDGE-{call_site.upper()}] "
+                                 f"{proveedor}: {e}")
+                    continue
+                resultados[proveedor] = resultado
+                if ganador is None and es_bueno(proveedor, resultado):
+                    ganador = proveedor
+
+            if ganador:
+                break
+    finally:
+        transcurrido = time.monotonic() - inicio
+        cancelados = [t for t in tareas if not t.done()]
+        for tarea in cancelados:
+            tarea.cancel()
+            ahorro = _latencias.get((call_site, tareas[tarea]),
+                                    transcurrido) - transcurrido
+            stats["segundos_ahorrados_est"] += max(0.0, ahorro)
+
+    if ganador:
+        stats["ganadores"][ganador] += 1
+        if cancelados:
+            stats["cortes_tempranos"] += 1
+        logger.info(f"[HEDGE-{call_site.upper()}] Ganó {ganador} en "
+                    f"{transcurrido:.1f}s, cancelados: "
+                    f"{[tareas[t] for t in cancelados] or 'ninguno'}")
+
+    return {"ganador": ganador, "resultados": resultados}
+
+
+def hedge_stats() -> dict:
+    return {
+        call_site: {
+            **s, "ganadores": dict(s["ganadores"]),
+            "segundos_ahorrados_est": round(s["segundos_ahorrados_est"], 1),
+            "latencia_prom_s": {
+                proveedor: round(v, 2)
+                for (sitio, proveedor), v in _latencias.items()
+                if sitio == call_site
+            }
+        }
+        for call_site, s in _stats.items()
+    }
@@ -0,0 +1,190 @@
+"""
+Ingesta de estados de entrega de WhatsApp (sent, delivered, read, failed)
+Los status updates del webhook se acumulan en memoria y se escriben en
+la colección message_status con bulk_write (por timer o por tamaño),
+así el webhook no hace ninguna escritura a MongoDB.
+
+Correlaciona con los message_id que devuelve send_whatsapp_message para
+medir latencia de entrega y detectar envíos fallidos.
+"""
+import time
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import List
+
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+from services.mongodb import get_database
+
+logger = logging.getLogger(__name__)
+
+COLLECTION_NAME = "message_status"
+FLUSH_MAX_OPS = 200
+FLUSH_INTERVAL_SECONDS = 10
+# Si MongoDB no está disponible, las ops vuelven al buffer hasta este
+# tope; pasado el tope se descartan las más viejas
+MAX_OPS_EN_BUFFER = 5000
+MAX_ENVIADOS_TRACKEADOS = 5000
+
+ESTADOS_VALIDOS = {"sent", "delivered", "read", "failed"}
+
+
+class MessageStatusBuffer:
+    """Buffer en memoria de estados + envíos, con flush en bulk."""
+
+    def __init__(self, max_ops: int = FLUSH_MAX_OPS):
+        self._ops: List[UpdateOne] = []
+        self._max_ops = max_ops
+        self._flushing = False
+        # message_id → (timestamp envío, destinatario)
+        self._enviados = OrderedDict()
+        self._latencias = {
+            "delivered": deque(maxlen=1000),
+            "read": deque(maxlen=1000)
+        }
+        self._fallidos_recientes = deque(maxlen=50)
+        self._stats = {
+            "estados_recibidos": 0,
+            "fallidos": 0,
+            "flushes": 0,
+            "ops_escritas": 0,
+            "flushes_fallidos": 0,
+            "ops_descartadas": 0
+        }
+
+    def record_sent(self, message_id: str, to: str):
+        """Registra un envío exitoso (llamado por el dispatcher)."""
+        if not message_id:
+            return
+        ahora = time.time()
+        self._enviados[message_id] = (ahora, to)
+        while len(self._enviados) > MAX_ENVIADOS_TRACKEADOS:
+            self._enviados.popitem(last=False)
+
+        self._ops.append(
+            UpdateOne({"_id": message_id}, {
+                "$set": {
+                    "to": to,
+                    "enviado_en": datetime.fromtimestamp(ahora, timezone.utc)
+                }
+            },
+                      upsert=True))
+        self._maybe_flush()
+
+    def ingest(self, statuses: list):
+        """Parsea los status del webhook y los encola (sin I/O)."""
+        for st in statuses or []:
+            message_id = st.get("id", "")
+            estado = st.get("status", "")
+            if not message_id or estado not in ESTADOS_VALIDOS:
+                continue
+
+            self._stats["estados_recibidos"] += 1
+            try:
+                ts = float(st.get("timestamp", "") or time.time())
+            except ValueError:
+                ts = time.time()
+
+            update = {
+                f"estados.{estado}": datetime.fromtimestamp(ts, timezone.utc),
+                "recipient_id": st.get("recipient_id", "")
+            }
+
+            enviado = self._enviados.get(message_id)
+            if estado in self._latencias and enviado:
+                latencia = max(ts - enviado[0], 0.0)
+                self._latencias[estado].append(latencia)
+                update[f"latencia_{estado}_s"] = round(latencia, 3)
+
+            if estado == "failed":
+                self._stats["fallidos"] += 1
+                errores = st.get("errors", [])
+                update["fallido"] = True
+                update["errores"] = errores
+                self._fallidos_recientes.append({
+                    "message_id": message_id,
+                    "recipient_id": st.get("recipient_id", ""),
+                    "error": (errores[0].get("title", "")
+                              if errores else "")
+                })
+                logger.warning(f"[STATUS] ✗ Envío fallido {message_id[:25]} "
+                               f"→ {st.get('recipient_id', '')}: {errores}")
+
+            self._ops.append(
+                UpdateOne({"_id": message_id}, {"$set": update}, upsert=True))
+
+        self._maybe_flush()
+
+    def _maybe_flush(self):
+        if len(self._ops) >= self._max_ops and not self._flushing:
+            try:
+                asyncio.get_running_loop().create_task(self.flush())
+            except RuntimeError:
+                pass
+
+    def _reencolar(self, ops: List[UpdateOne]):
+        """Devuelve al frente del buffer las ops que no se escribieron."""
+        self._stats["flushes_fallidos"] += 1
+        self._ops = ops + self._ops
+        sobrantes = len(self._ops) - MAX_OPS_EN_BUFFER
+        if sobrantes > 0:
+            del self._ops[:sobrantes]
+            self._stats["ops_descartadas"] += sobrantes
+            logger.warning(f"[STATUS] Buffer lleno: {sobrantes} estados "
+                           f"descartados")
+
+    async def flush(self):
+        """
+        Escribe el buffer con bulk_write (en un thread, no bloquea).
+        Si no hay base o bulk_write falla, las ops vuelven al buffer
+        (los UpdateOne son upserts con $set: reescribirlos es idempotente).
+        """
+        if not self._ops or self._flushing:
+            return
+
+        self._flushing = True
+        ops, self._ops = self._ops, []
+        try:
+            db = get_database()
+            if db is None:
+                self._reencolar(ops)
+                return
+            await asyncio.to_thread(db[COLLECTION_NAME].bulk_write,
+                                    ops,
+                                    ordered=False)
+            self._stats["flushes"] += 1
+            self._stats["ops_escritas"] += len(ops)
+            logger.info(f"[STATUS] ✓ {len(ops)} estados escritos")
+        except PyMongoError as e:
+            logger.error(f"[STATUS] Error en bulk_write: {e}")
+            self._reencolar(ops)
+        finally:
+            self._flushing = False
+
+    def stats(self) -> dict:
+        """Percentiles de latencia de entrega/lectura y fallidos."""
+
+        def percentiles(valores):
+            ordenados = sorted(valores)
+            if not ordenados:
+                return {"p50_s": 0.0, "p95_s": 0.0, "n": 0}
+            n = len(ordenados)
+            return {
+                "p50_s": round(ordenados[int(n * 0.5)], 3),
+                "p95_s": round(ordenados[min(int(n * 0.95), n - 1)], 3),
+                "n": n
+            }
+
+        return {
+            **self._stats,
+            "buffer": len(self._ops),
+            "latencia_delivered": percentiles(self._latencias["delivered"]),
+            "latencia_read": percentiles(self._latencias["read"]),
+            "fallidos_recientes": list(self._fallidos_recientes)[-10:]
+        }
+
+
+status_buffer = MessageStatusBuffer()
@@ -236,7 +236,11 @@ def save_lead(lead_data: dict) -> dict:
             if existing.get("phone_whatsapp"):
                 filter_query = {"phone_whatsapp": phone}
             
-            collection.update_one(filter_query, {"$set": cleaned_data})
+            # version: invalida el lead en cache (services/session_cache.py)
+            collection.update_one(filter_query, {
+                "$set": cleaned_data,
+                "$inc": {"version": 1}
+            })
             logger.info(f"✓ Lead actualizado: {phone}")
             return {
                 "success": True, 
@@ -245,6 +249,7 @@ def save_lead(lead_data: dict) -> dict:
                 "message": "Lead actualizado correctamente"
             }
         else:
+            cleaned_data["version"] = 1
             collection.insert_one(cleaned_data)
             logger.info(f"✓ Lead creado: {phone}")
             return {
@@ -340,7 +345,7 @@ def update_lead_calcom_email(phone_whatsapp: str, email_calcom: str, name: str =
                 {"telefono_whatsapp": phone_whatsapp},
                 {"phone_whatsapp": phone_whatsapp}
             ]},
-            {"$set": update_data}
+            {"$set": update_data, "$inc": {"version": 1}}
         )
         
         if result.modified_count > 0 or result.matched_count > 0:
@@ -356,7 +361,8 @@ def update_lead_calcom_email(phone_whatsapp: str, email_calcom: str, name: str =
                 "email_calcom": email_calcom,
                 "calcom_link": calcom_link,
                 "creado_en": datetime.now(timezone.utc).isoformat(),
-                "actualizado_en": datetime.now(timezone.utc).isoformat()
+                "actualizado_en": datetime.now(timezone.utc).isoformat(),
+                "version": 1
             })
             return {
                 "success": True,
@@ -397,7 +403,7 @@ def update_lead_booking(email_calcom: str, booking_data: dict) -> dict:
         
         result = collection.update_one(
             {"email_calcom": email_calcom},
-            {"$set": update_data}
+            {"$set": update_data, "$inc": {"version": 1}}
         )
         
         if result.modified_count > 0:
@@ -427,10 +433,12 @@ def save_chat_message(session_id: str, msg_type: str, text: str) -> bool:
             "timestamp": datetime.now(timezone.utc)
         }
         
+        # version: invalida las copias en cache de otros workers
         collection.update_one(
             {"sessionId": session_id},
             {
                 "$push": {"mensajes": message},
+                "$inc": {"version": 1},
                 "$set": {"actualizado_en": datetime.now(timezone.utc)},
                 "$setOnInsert": {"creado_en": datetime.now(timezone.utc)}
             },
@@ -444,6 +452,22 @@ def save_chat_message(session_id: str, msg_type: str, text: str) -> bool:
         return False
 
 
+def formatear_historial(messages: list) -> list:
+    """Convierte mensajes de chat_history al formato de OpenAI."""
+    history = []
+    for msg in messages:
+        msg_type = msg.get("tipo") or msg.get("type", "")
+        msg_text = msg.get("texto") or msg.get("text", "")
+        
+        if not msg_text:
+            continue
+            
+        role = "user" if msg_type == "human" else "assistant"
+        history.append({"role": role, "content": msg_text})
+    
+    return history
+
+
 def get_chat_history(session_id: str, limit: int = 20) -> list:
     """Obtiene historial de chat para un usuario."""
     try:
@@ -461,18 +485,7 @@ def get_chat_history(session_id: str, limit: int = 20) -> list:
         messages = doc.get("mensajes") or doc.get("messages") or []
         messages = messages[-limit:] if len(messages) > limit else messages
         
-        history = []
-        for msg in messages:
-            msg_type = msg.get("tipo") or msg.get("type", "")
-            msg_text = msg.get("texto") or msg.get("text", "")
-            
-            if not msg_text:
-                continue
-                
-            role = "user" if msg_type == "human" else "assistant"
-            history.append({"role": role, "content": msg_text})
-        
-        return history
+        return formatear_historial(messages)
         
     except PyMongoError as e:
         logger.error(f"Error obteniendo historial: {e}")
@@ -497,7 +510,8 @@ def update_lead_summary(phone_whatsapp: str, summary: str) -> dict:
                 "resumen_conversacion": summary,
                 "fecha_resumen": datetime.now(timezone.utc).isoformat(),
                 "actualizado_en": datetime.now(timezone.utc).isoformat()
-            }}
+            },
+             "$inc": {"version": 1}}
         )
         
         if result.modified_count > 0:
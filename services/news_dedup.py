@@ -0,0 +1,220 @@
+"""
+Deduplicación de noticias por SimHash
+La misma nota sindicada en varios medios llegaba repetida de Google y
+de Apify, y cada copia pasaba por es_url_valida_noticia y
+es_noticia_valida por separado.
+
+- simhash(): huella de 64 bits sobre las palabras de título + snippet
+  (sin acentos, sin stopwords, sin el " - Medio" del título). Con
+  textos tan cortos, shingles de varias palabras separaban copias de
+  la misma nota por 12-20 bits
+- Del snippet se toman las primeras SNIPPET_MAX_PALABRAS, sin la fecha
+  que antepone Google ("15 mar 2024 ...") ni los "...": cada medio lo
+  corta en otro punto y eso solo ya separaba copias por 9-19 bits
+- colapsar(): antes de validar, deja una sola copia por grupo de
+  huellas a distancia de Hamming <= UMBRAL_HAMMING
+- Historial por empresa + ubicación (colección noticias_huellas): las
+  noticias ya vistas con su huella. Una búsqueda posterior de la misma
+  empresa pide solo lo publicado desde la anterior (desde_dias) y suma
+  lo guardado
+"""
+import re
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from pymongo.errors import PyMongoError
+
+from services.mongodb import get_database
+from utils.text_cleaner import fold_accents
+
+logger = logging.getLogger(__name__)
+
+UMBRAL_HAMMING = 7
+STOPWORDS = {
+    "a", "al", "ante", "con", "de", "del", "desde", "e", "el", "en", "es",
+    "la", "las", "lo", "los", "o", "para", "por", "que", "se", "su", "sus",
+    "un", "una", "y", "the", "of", "and", "in", "to", "for"
+}
+# " - La Voz", " | Infobae": el medio que agrega cada sindicación
+RE_SUFIJO_MEDIO = re.compile(r'\s+[-|–—]\s+[^-|–—]{1,40}$')
+# Fecha que Google CSE antepone al snippet: "15 mar 2024 ...",
+# "Mar 15, 2024 ...", "hace 3 días ...", "2 days ago ..."
+RE_FECHA_SNIPPET = re.compile(
+    r'^\s*(?:\d{1,2}\s+(?:de\s+)?\w{3,10}\.?\s+(?:de\s+)?\d{4}'
+    r'|\w{3,10}\.?\s+\d{1,2},\s+\d{4}'
+    r'|hace\s+\d+\s+\w+|\d+\s+\w+\s+ago)'
+    r'\s*(?:\.\.\.|…|—|-|·)\s*', re.IGNORECASE)
+RE_ELIPSIS = re.compile(r'\.\.\.|…')
+# Copias recortadas en distinto punto comparten el comienzo del snippet
+SNIPPET_MAX_PALABRAS = 15
+COLLECTION_NAME = "noticias_huellas"
+# Noticias guardadas por empresa
+HISTORIAL_MAX = 30
+# Pasado este tiempo el historial no alcanza y se busca todo de nuevo
+HISTORIAL_MAX_DIAS = 30
+
+_stats = {"evaluadas": 0, "colapsadas": 0, "busquedas_incrementales": 0}
+
+
+def _tokens(texto: str) -> list:
+    texto = fold_accents((texto or "").lower())
+    return re.findall(r'[a-z0-9]+', texto)
+
+
+def texto_para_huella(titulo: str, snippet: str) -> str:
+    titulo = RE_SUFIJO_MEDIO.sub('', (titulo or '').strip())
+    snippet = RE_ELIPSIS.sub(' ', RE_FECHA_SNIPPET.sub('', snippet or ''))
+    return f"{titulo} {' '.join(snippet.split()[:SNIPPET_MAX_PALABRAS])}"
+
+
+def _hash64(token: str) -> int:
+    # hash() de Python cambia entre procesos: las huellas se persisten
+    return int.from_bytes(
+        hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def simhash(texto: str) -> int:
+    """Huella SimHash de 64 bits del texto (0 si está vacío)."""
+    features = {
+        t
+        for t in _tokens(texto) if len(t) > 1 and t not in STOPWORDS
+    }
+    if not features:
+        return 0
+
+    pesos = [0] * 64
+    for feature in features:
+        h = _hash64(feature)
+        for bit in range(64):
+            pesos[bit] += 1 if h >> bit & 1 else -1
+    return sum(1 << bit for bit in range(64) if pesos[bit] > 0)
+
+
+def distancia(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def colapsar(items: list,
+             texto_de: Callable,
+             huella_de: Optional[Callable] = None) -> list:
+    """
+    Deja la primera copia de cada grupo de casi-duplicados.
+
+    Args:
+        texto_de: item -> texto a comparar (título + snippet)
+        huella_de: item -> huella ya calculada (por defecto, simhash)
+    """
+    huellas = []
+    unicos = []
+    for item in items:
+        _stats["evaluadas"] += 1
+        huella = (huella_de(item) if huella_de else simhash(texto_de(item)))
+        if huella and any(
+                distancia(huella, h) <= UMBRAL_HAMMING for h in huellas):
+            _stats["colapsadas"] += 1
+            continue
+        if huella:
+            huellas.append(huella)
+        unicos.append(item)
+    if len(unicos) < len(items):
+        logger.info(f"[NEWS-DEDUP] {len(items)} → {len(unicos)} "
+                    f"(casi-duplicados colapsados)")
+    return unicos
+
+
+def texto_noticia(noticia: dict) -> str:
+    return texto_para_huella(noticia.get("titulo", ""),
+                             noticia.get("resumen", ""))
+
+
+def _huella_noticia(noticia: dict) -> int:
+    # Las del historial traen la huella guardada (hex)
+    if noticia.get("huella"):
+        return int(noticia["huella"], 16)
+    return simhash(texto_noticia(noticia))
+
+
+# ═══════════════════════════════════════════════════════════════════
+# HISTORIAL POR EMPRESA
+# ═══════════════════════════════════════════════════════════════════
+def _clave_empresa(empresa: str, ubicacion: str) -> str:
+    # Como la clave de Apify: la misma empresa en otra ciudad es otra
+    return f"{' '.join(_tokens(empresa))}|{' '.join(_tokens(ubicacion))}"
+
+
+def _collection():
+    db = get_database()
+    return db[COLLECTION_NAME] if db is not None else None
+
+
+def _cargar(empresa: str, ubicacion: str) -> Optional[dict]:
+    try:
+        collection = _collection()
+        if collection is None:
+            return None
+        return collection.find_one({"_id": _clave_empresa(empresa, ubicacion)})
+    except PyMongoError as e:
+        logger.warning(f"[NEWS-DEDUP] Error leyendo historial: {e}")
+        return None
+
+
+def _guardar(empresa: str, ubicacion: str, noticias: list):
+    try:
+        collection = _collection()
+        if collection is None:
+            return
+        collection.update_one({"_id": _clave_empresa(empresa, ubicacion)}, {
+            "$set": {
+                "noticias": [{
+                    **n, "huella": format(_huella_noticia(n), "016x")
+                } for n in noticias[:HISTORIAL_MAX]],
+                "actualizado_en": datetime.now(timezone.utc)
+            }
+        },
+                              upsert=True)
+    except PyMongoError as e:
+        logger.warning(f"[NEWS-DEDUP] Error guardando historial: {e}")
+
+
+async def historial(empresa: str, ubicacion: str = "") -> dict:
+    """
+    Noticias ya vistas de la empresa (en esa ubicación) y desde cuándo
+    buscar.
+
+    Returns:
+        {"noticias": [... con "huella"], "desde_dias": int (0 = todo)}
+    """
+    doc = (await asyncio.to_thread(_cargar, empresa, ubicacion)
+           if empresa else None)
+    if not doc or not doc.get("actualizado_en"):
+        return {"noticias": [], "desde_dias": 0}
+
+    actualizado = doc["actualizado_en"]
+    if actualizado.tzinfo is None:
+        actualizado = actualizado.replace(tzinfo=timezone.utc)
+    dias = (datetime.now(timezone.utc) - actualizado).days + 1
+    if dias > HISTORIAL_MAX_DIAS:
+        return {"noticias": [], "desde_dias": 0}
+
+    _stats["busquedas_incrementales"] += 1
+    return {"noticias": doc.get("noticias", []), "desde_dias": dias}
+
+
+async def combinar_y_guardar(empresa: str, ubicacion: str, nuevas: list,
+                             previas: list) -> list:
+    """
+    Nuevas primero, sin repetir las ya vistas; actualiza el historial.
+    Retorna las noticias sin la huella.
+    """
+    noticias = colapsar(nuevas + previas, texto_noticia, _huella_noticia)
+    if empresa and noticias:
+        await asyncio.to_thread(_guardar, empresa, ubicacion, noticias)
+    return [{k: v
+             for k, v in n.items() if k != "huella"} for n in noticias]
+
+
+def stats() -> dict:
+    return dict(_stats)
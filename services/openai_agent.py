@@ -2,18 +2,29 @@
 Agente de OpenAI con function calling para DANIA/Fortia
 Versión 2.0 - Incluye tool de investigación de desafíos
 """
+import copy
+import time
 import logging
 import json
 import asyncio
+from types import SimpleNamespace
 from typing import Optional
 from datetime import datetime, timezone
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 
-from config import OPENAI_API_KEY, OPENAI_MODEL
+from config import OPENAI_API_KEY, OPENAI_MODEL, AGENT_STREAMING
 from services.mongodb import (save_lead, find_lead_by_phone,
-                              update_lead_calcom_email, save_chat_message,
+                              update_lead_calcom_email,
                               get_chat_history, update_lead_summary,
                               get_lead_field)
+from services.session_cache import session_cache
+from services.conversation_summary import (historial_para_agente,
+                                           HISTORIAL_AGENTE)
+from services.speculative_research import speculative_research
+from services.agent_state import (cargar_estado, guardar_estado,
+                                  aplicar_a_context, resultado_previo,
+                                  registrar_tool, resumen_estado,
+                                  detectar_etapa)
 from services.web_extractor import extract_web_data
 from services.social_research import research_person_and_company
 from services.gmail import send_lead_notification
@@ -21,8 +32,10 @@ from services.dania_knowledge import buscar_info_dania
 from services.tts import text_to_audio_response
 from services.challenges_research import (investigar_desafios_empresa,
                                           calcular_qualification_tier)
-from tools.definitions import SYSTEM_PROMPT, TOOLS as TOOLS_DEFINITIONS
+from tools.definitions import (SYSTEM_PROMPT, TOOLS as TOOLS_DEFINITIONS,
+                               tools_para_etapa)
 from utils.text_cleaner import clean_markdown_formatting
+from utils.token_budget import count_tokens
 
 logger = logging.getLogger(__name__)
 
@@ -30,19 +43,24 @@ logger = logging.getLogger(__name__)
 # ═════════════════════════════════════════════════════════════════
 # INVESTIGACIÓN EN BACKGROUND
 # ═════════════════════════════════════════════════════════════════
-async def iniciar_investigacion_background(phone: str, nombre: str, web: str,
-                                           ubicacion: dict):
+async def iniciar_investigacion_background(phone: str,
+                                           nombre: str,
+                                           web: str,
+                                           ubicacion: dict,
+                                           empresa: str = "",
+                                           rubro: str = ""):
     """
     Ejecuta investigación completa en background mientras
     el usuario responde las preguntas.
 
-    Guarda resultados en MongoDB para leerlos después.
+    Las etapas (web, LinkedIn/noticias, desafíos) corren como DAG:
+    cada una arranca cuando tiene sus datos y se guarda en MongoDB
+    apenas termina. Si empresa/rubro ya se conocen, LinkedIn y
+    desafíos no esperan a la extracción web.
     """
     try:
         from services.mongodb import get_database
-        from services.web_extractor import extract_web_data
-        from services.social_research import research_person_and_company
-        from services.challenges_research import investigar_desafios_empresa
+        from services.research_dag import ejecutar_dag, ETAPAS_INVESTIGACION
 
         db = get_database()
         if db is None:
@@ -52,137 +70,61 @@ async def iniciar_investigacion_background(phone: str, nombre: str, web: str,
         collection = db["leads_fortia"]
 
         # Marcar como "en progreso"
-        collection.update_one({"phone_whatsapp": phone}, {
-            "$set": {
-                "investigacion_status": "en_progreso",
-                "investigacion_started_at": datetime.now(
-                    timezone.utc).isoformat()
-            }
-        },
-                              upsert=True)
+        await asyncio.to_thread(
+            collection.update_one, {"phone_whatsapp": phone}, {
+                "$set": {
+                    "investigacion_status":
+                    "en_progreso",
+                    "investigacion_etapas": {},
+                    "investigacion_started_at":
+                    datetime.now(timezone.utc).isoformat()
+                }
+            },
+            upsert=True)
 
         logger.info(f"[BACKGROUND] ══════ INICIANDO para {phone} ══════")
 
-        # ═══════════════════════════════════════════════════════
-        # 1. EXTRACCIÓN WEB
-        # ═══════════════════════════════════════════════════════
-        logger.info(f"[BACKGROUND] Extrayendo web: {web}")
-        datos_web = await extract_web_data(web)
-
-        if datos_web:
-            collection.update_one({"phone_whatsapp": phone}, {
-                "$set": {
-                    "datos_web_background":
-                    datos_web,
-                    "business_name":
-                    datos_web.get("business_name", "No encontrado"),
-                    "business_activity":
-                    datos_web.get("business_activity", "No encontrado"),
-                    "business_model":
-                    datos_web.get("business_model", "No encontrado"),
-                    "business_description":
-                    datos_web.get("business_description", "No encontrado"),
-                    "services":
-                    datos_web.get("services", "No encontrado"),
-                    "phone_empresa":
-                    datos_web.get("phone_empresa", "No encontrado"),
-                    "whatsapp_empresa":
-                    datos_web.get("whatsapp_empresa", "No encontrado"),
-                    "email_principal":
-                    datos_web.get("email_principal", "No encontrado"),
-                    "address":
-                    datos_web.get("address", "No encontrada"),
-                    "city":
-                    datos_web.get("city", "No encontrado"),
-                    "province":
-                    datos_web.get("province", "No encontrado"),
-                    "linkedin_empresa":
-                    datos_web.get("linkedin_empresa", "No encontrado"),
-                    "instagram_empresa":
-                    datos_web.get("instagram_empresa", "No encontrado"),
-                    "facebook_empresa":
-                    datos_web.get("facebook_empresa", "No encontrado"),
-                    "youtube":
-                    datos_web.get("youtube", "No encontrado"),
-                    "twitter":
-                    datos_web.get("twitter", "No encontrado"),
-                    "horarios":
-                    datos_web.get("horarios", "No encontrado"),
-                    "cargo_detectado":
-                    datos_web.get("cargo_detectado", "No detectado")
-                }
-            })
-            logger.info(f"[BACKGROUND] ✓ Datos web guardados")
+        async def _persistir(etapa: dict, estado: str, salida: dict):
+            # Datos + marcador de la etapa en el mismo update: quien lee
+            # el marcador ya encuentra los datos
+            campos = _campos_etapa(etapa["nombre"], salida)
+            campos[f"investigacion_etapas.{etapa['nombre']}"] = {
+                "estado": estado,
+                "en": datetime.now(timezone.utc).isoformat()
+            }
+            await asyncio.to_thread(collection.update_one,
+                                    {"phone_whatsapp": phone}, {
+                                        "$set": campos,
+                                        "$inc": {"version": 1}
+                                    })
+            logger.info(f"[BACKGROUND] ✓ {etapa['nombre']} guardado "
+                        f"({estado})")
+
+        await ejecutar_dag(ETAPAS_INVESTIGACION, {
+            "phone": phone,
+            "web": web,
+            "nombre": nombre,
+            "empresa": empresa,
+            "rubro": rubro,
+            "city": ubicacion.get("city", ""),
+            "province": ubicacion.get("province", ""),
+            "country": ubicacion.get("country", "Argentina")
+        },
+                           on_completa=_persistir,
+                           etiqueta=phone)
 
         # ═══════════════════════════════════════════════════════
-        # 2. LINKEDIN + NOTICIAS (en paralelo con datos de web)
+        # MARCAR COMO COMPLETADA
         # ═══════════════════════════════════════════════════════
-        rubro = datos_web.get("business_activity", "") if datos_web else ""
-        empresa = datos_web.get("business_name", "") if datos_web else ""
-        city = ubicacion.get(
-            "city", "") or (datos_web.get("city", "") if datos_web else "")
-        province = ubicacion.get("province", "") or (datos_web.get(
-            "province", "") if datos_web else "")
-        country = ubicacion.get("country", "Argentina")
-        email_contacto = datos_web.get("email_principal",
-                                       "") if datos_web else ""
-
-        logger.info(f"[BACKGROUND] Buscando LinkedIn de: {nombre}")
-        linkedin_data = await research_person_and_company(
-            nombre_persona=nombre,
-            empresa=empresa,
-            website=web,
-            linkedin_empresa_input=datos_web.get("linkedin_empresa", "")
-            if datos_web else "",
-            facebook_empresa_input=datos_web.get("facebook_empresa", "")
-            if datos_web else "",
-            instagram_empresa_input=datos_web.get("instagram_empresa", "")
-            if datos_web else "",
-            city=city,
-            province=province,
-            country=country,
-            email_contacto=email_contacto)
-
-        if linkedin_data:
-            collection.update_one({"phone_whatsapp": phone}, {
+        await asyncio.to_thread(
+            collection.update_one, {"phone_whatsapp": phone}, {
                 "$set": {
-                    "linkedin_personal":
-                    linkedin_data.get("linkedin_personal", "No encontrado"),
-                    "linkedin_personal_confianza":
-                    linkedin_data.get("linkedin_personal_confianza", 0),
-                    "noticias_empresa":
-                    linkedin_data.get("noticias_empresa", "No encontrado")
+                    "investigacion_status":
+                    "completada",
+                    "investigacion_completada_at":
+                    datetime.now(timezone.utc).isoformat()
                 }
             })
-            logger.info(f"[BACKGROUND] ✓ LinkedIn y noticias guardados")
-
-        # ═══════════════════════════════════════════════════════
-        # 3. INVESTIGAR DESAFÍOS DEL RUBRO
-        # ═══════════════════════════════════════════════════════
-        if rubro and rubro != "No encontrado":
-            logger.info(f"[BACKGROUND] Investigando desafíos: {rubro}")
-            desafios_data = await investigar_desafios_empresa(rubro, country)
-
-            if desafios_data:
-                collection.update_one({"phone_whatsapp": phone}, {
-                    "$set": {
-                        "desafios_rubro": desafios_data.get("desafios", []),
-                        "desafios_source": desafios_data.get("source", "")
-                    }
-                })
-                logger.info(f"[BACKGROUND] ✓ Desafíos guardados")
-
-        # ═══════════════════════════════════════════════════════
-        # MARCAR COMO COMPLETADA
-        # ═══════════════════════════════════════════════════════
-        collection.update_one({"phone_whatsapp": phone}, {
-            "$set": {
-                "investigacion_status":
-                "completada",
-                "investigacion_completada_at":
-                datetime.now(timezone.utc).isoformat()
-            }
-        })
 
         logger.info(f"[BACKGROUND] ══════ COMPLETADO para {phone} ══════")
 
@@ -200,19 +142,103 @@ async def iniciar_investigacion_background(phone: str, nombre: str, web: str,
             pass
 
 
+def _campos_etapa(etapa: str, salida: dict) -> dict:
+    """Campos de leads_fortia que escribe cada etapa del DAG."""
+    if etapa == "web" and salida.get("datos_web"):
+        datos_web = salida["datos_web"]
+        return {
+            "datos_web_background":
+            datos_web,
+            "business_name":
+            datos_web.get("business_name", "No encontrado"),
+            "business_activity":
+            datos_web.get("business_activity", "No encontrado"),
+            "business_model":
+            datos_web.get("business_model", "No encontrado"),
+            "business_description":
+            datos_web.get("business_description", "No encontrado"),
+            "services":
+            datos_web.get("services", "No encontrado"),
+            "phone_empresa":
+            datos_web.get("phone_empresa", "No encontrado"),
+            "whatsapp_empresa":
+            datos_web.get("whatsapp_empresa", "No encontrado"),
+            "email_principal":
+            datos_web.get("email_principal", "No encontrado"),
+            "address":
+            datos_web.get("address", "No encontrada"),
+            "city":
+            datos_web.get("city", "No encontrado"),
+            "province":
+            datos_web.get("province", "No encontrado"),
+            "linkedin_empresa":
+            datos_web.get("linkedin_empresa", "No encontrado"),
+            "instagram_empresa":
+            datos_web.get("instagram_empresa", "No encontrado"),
+            "facebook_empresa":
+            datos_web.get("facebook_empresa", "No encontrado"),
+            "youtube":
+            datos_web.get("youtube", "No encontrado"),
+            "twitter":
+            datos_web.get("twitter", "No encontrado"),
+            "horarios":
+            datos_web.get("horarios", "No encontrado"),
+            "cargo_detectado":
+            datos_web.get("cargo_detectado", "No detectado")
+        }
+
+    if etapa == "redes" and salida.get("linkedin_data"):
+        linkedin_data = salida["linkedin_data"]
+        return {
+            "linkedin_personal":
+            linkedin_data.get("linkedin_personal", "No encontrado"),
+            "linkedin_personal_confianza":
+            linkedin_data.get("linkedin_personal_confianza", 0)
+        }
+
+    if etapa == "noticias" and salida.get("noticias_data"):
+        return dict(salida["noticias_data"])
+
+    if etapa == "desafios" and salida.get("desafios_data"):
+        desafios_data = salida["desafios_data"]
+        return {
+            "desafios_rubro": desafios_data.get("desafios", []),
+            "desafios_source": desafios_data.get("source", "")
+        }
+
+    return {}
+
+
 async def esperar_investigacion_completa(phone: str,
-                                         max_wait_seconds: int = 180) -> dict:
+                                         max_wait_seconds: int = 180,
+                                         etapas: Optional[set] = None
+                                         ) -> dict:
     """
-    Espera a que termine la investigación en background.
-    Hace polling cada 5 segundos.
+    Espera a que terminen las etapas pedidas de la investigación en
+    background (todas si etapas es None). Hace polling cada 2 segundos.
 
     Returns:
         {
-            "completada": bool,
+            "completada": bool (toda la investigación terminó),
             "rubro": str,
-            "datos": dict (todos los datos)
+            "datos": dict (solo lo ya conocido),
+            "pendiente": list (campos que todavía se están buscando),
+            "etapas": dict (estado de cada etapa)
         }
     """
+    from services.research_dag import investigacion_parcial, CAMPOS_POR_ETAPA
+
+    requeridas = set(etapas or CAMPOS_POR_ETAPA)
+
+    def _respuesta(parcial: dict) -> dict:
+        return {
+            "completada": parcial["status"] == "completada",
+            "rubro": parcial["rubro"],
+            "datos": parcial["conocido"],
+            "pendiente": parcial["pendiente"],
+            "etapas": parcial["etapas"]
+        }
+
     try:
         from services.mongodb import get_database
 
@@ -222,118 +248,33 @@ async def esperar_investigacion_completa(phone: str,
 
         collection = db["leads_fortia"]
         waited = 0
-        interval = 5
+        interval = 2
+        parcial = investigacion_parcial({})
 
         while waited < max_wait_seconds:
-            lead = collection.find_one({"phone_whatsapp": phone})
-
-            if lead:
-                status = lead.get("investigacion_status", "")
-
-                if status == "completada":
-                    logger.info(
-                        f"[WAIT] ✓ Investigación completada ({waited}s)")
-
-                    # Leer todos los datos
-                    dwb = lead.get("datos_web_background", {})
-
-                    return {
-                        "completada":
-                        True,
-                        "rubro":
-                        lead.get("business_activity")
-                        or dwb.get("business_activity", ""),
-                        "datos": {
-                            "business_name":
-                            lead.get("business_name")
-                            or dwb.get("business_name", "No encontrado"),
-                            "business_activity":
-                            lead.get("business_activity")
-                            or dwb.get("business_activity", "No encontrado"),
-                            "business_model":
-                            lead.get("business_model")
-                            or dwb.get("business_model", "No encontrado"),
-                            "business_description":
-                            lead.get("business_description") or dwb.get(
-                                "business_description", "No encontrado"),
-                            "services":
-                            lead.get("services")
-                            or dwb.get("services", "No encontrado"),
-                            "phone_empresa":
-                            lead.get("phone_empresa")
-                            or dwb.get("phone_empresa", "No encontrado"),
-                            "whatsapp_empresa":
-                            lead.get("whatsapp_empresa")
-                            or dwb.get("whatsapp_empresa", "No encontrado"),
-                            "email_principal":
-                            lead.get("email_principal")
-                            or dwb.get("email_principal", "No encontrado"),
-                            "address":
-                            lead.get("address")
-                            or dwb.get("address", "No encontrada"),
-                            "city":
-                            lead.get("city")
-                            or dwb.get("city", "No encontrado"),
-                            "province":
-                            lead.get("province")
-                            or dwb.get("province", "No encontrado"),
-                            "linkedin_empresa":
-                            lead.get("linkedin_empresa")
-                            or dwb.get("linkedin_empresa", "No encontrado"),
-                            "instagram_empresa":
-                            lead.get("instagram_empresa")
-                            or dwb.get("instagram_empresa", "No encontrado"),
-                            "facebook_empresa":
-                            lead.get("facebook_empresa")
-                            or dwb.get("facebook_empresa", "No encontrado"),
-                            "youtube":
-                            lead.get("youtube")
-                            or dwb.get("youtube", "No encontrado"),
-                            "twitter":
-                            lead.get("twitter")
-                            or dwb.get("twitter", "No encontrado"),
-                            "linkedin_personal":
-                            lead.get("linkedin_personal", "No encontrado"),
-                            "linkedin_personal_confianza":
-                            lead.get("linkedin_personal_confianza", 0),
-                            "noticias_empresa":
-                            lead.get("noticias_empresa", "No encontrado"),
-                            "desafios_rubro":
-                            lead.get("desafios_rubro", []),
-                            "cargo_detectado":
-                            lead.get("cargo_detectado")
-                            or dwb.get("cargo_detectado", "No detectado"),
-                            "horarios":
-                            lead.get("horarios")
-                            or dwb.get("horarios", "No encontrado")
-                        }
-                    }
-
-                elif status == "fallida":
-                    logger.warning(f"[WAIT] ✗ Investigación falló")
-                    return {"completada": False, "rubro": "", "datos": {}}
-
-            logger.info(f"[WAIT] Esperando... ({waited}s/{max_wait_seconds}s)")
+            lead = await asyncio.to_thread(collection.find_one,
+                                           {"phone_whatsapp": phone})
+            parcial = investigacion_parcial(lead)
+
+            if parcial["status"] == "fallida":
+                logger.warning(f"[WAIT] ✗ Investigación falló")
+                return _respuesta(parcial)
+
+            if requeridas <= parcial["listas"]:
+                logger.info(f"[WAIT] ✓ Etapas {sorted(requeridas)} listas "
+                            f"({waited}s), pendiente: "
+                            f"{len(parcial['pendiente'])} campos")
+                return _respuesta(parcial)
+
+            logger.info(f"[WAIT] Esperando... ({waited}s/{max_wait_seconds}s)"
+                        f" etapas: {parcial['etapas']}")
             await asyncio.sleep(interval)
             waited += interval
 
         logger.warning(f"[WAIT] Timeout después de {max_wait_seconds}s")
 
         # Retornar lo que haya aunque no esté completo
-        lead = collection.find_one({"phone_whatsapp": phone})
-        if lead:
-            dwb = lead.get("datos_web_background", {})
-            return {
-                "completada":
-                False,
-                "rubro":
-                lead.get("business_activity")
-                or dwb.get("business_activity", ""),
-                "datos":
-                dwb
-            }
-
-        return {"completada": False, "rubro": "", "datos": {}}
+        return _respuesta(parcial)
 
     except Exception as e:
         logger.error(f"[WAIT] Error: {e}")
@@ -360,9 +301,12 @@ async def send_progress_message(phone: str, message: str) -> None:
 
 # Inicializar cliente OpenAI
 client = None
+async_client = None
 try:
     if OPENAI_API_KEY:
         client = OpenAI(api_key=OPENAI_API_KEY)
+        # Cliente async para streaming de respuestas
+        async_client = AsyncOpenAI(api_key=OPENAI_API_KEY)
         logger.info("Cliente OpenAI inicializado")
     else:
         logger.error("OPENAI_API_KEY no configurada")
@@ -370,6 +314,218 @@ except Exception as e:
     logger.error(f"Error inicializando OpenAI: {e}")
 
 
+# ═════════════════════════════════════════════════════════
+# MÉTRICAS POR REQUEST (tokens de tools, prompt, cache, latencia)
+# ═════════════════════════════════════════════════════════
+_TOKENS_TOOLS_COMPLETAS = count_tokens(
+    json.dumps(TOOLS_DEFINITIONS, ensure_ascii=False))
+_tokens_tools_cache = {}
+_metricas_requests = {}
+
+
+def _registrar_request(etapa: str, tools: list, usage, latencia: float):
+    """Acumula métricas del request y loguea el ahorro de tokens."""
+    if etapa not in _tokens_tools_cache:
+        _tokens_tools_cache[etapa] = count_tokens(
+            json.dumps(tools, ensure_ascii=False))
+    tokens_tools = _tokens_tools_cache[etapa]
+
+    prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+    detalles = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = getattr(detalles, "cached_tokens", 0) or 0
+
+    m = _metricas_requests.setdefault(
+        etapa, {
+            "requests": 0,
+            "prompt_tokens": 0,
+            "cached_tokens": 0,
+            "latencia_total_s": 0.0
+        })
+    m["requests"] += 1
+    m["prompt_tokens"] += prompt_tokens
+    m["cached_tokens"] += cached_tokens
+    m["latencia_total_s"] += latencia
+
+    logger.info(f"[AGENT] etapa={etapa} tools={len(tools)}/"
+                f"{len(TOOLS_DEFINITIONS)} (~{tokens_tools}/"
+                f"{_TOKENS_TOOLS_COMPLETAS} tokens) prompt={prompt_tokens} "
+                f"cached={cached_tokens} latencia={latencia:.2f}s")
+
+
+def agent_stats() -> dict:
+    """Promedios por etapa para comparar antes/después del subsetting."""
+    resultado = {}
+    for etapa, m in _metricas_requests.items():
+        n = m["requests"] or 1
+        resultado[etapa] = {
+            "requests": m["requests"],
+            "tokens_tools": _tokens_tools_cache.get(etapa, 0),
+            "tokens_tools_completas": _TOKENS_TOOLS_COMPLETAS,
+            "prompt_tokens_prom": round(m["prompt_tokens"] / n),
+            "cached_tokens_prom": round(m["cached_tokens"] / n),
+            "latencia_prom_s": round(m["latencia_total_s"] / n, 3)
+        }
+    return resultado
+
+
+# ═════════════════════════════════════════════════════════
+# STREAMING DE RESPUESTAS
+# ═════════════════════════════════════════════════════════
+# Mínimo de caracteres por mensaje enviado durante el stream
+# (evita mandar párrafos de una línea como mensajes sueltos)
+STREAM_MIN_CHARS = 200
+# Cierre si el stream se corta con párrafos ya enviados (en vez del
+# mensaje de error genérico encima de la respuesta a medias)
+STREAM_CORTADO = "Perdón, se me cortó el mensaje. ¿Querés que lo complete?"
+
+
+class _EnvioPorParrafos:
+    """
+    Acumula deltas del stream y envía por WhatsApp cada párrafo completo
+    (ya limpio de Markdown) apenas termina.
+    """
+
+    def __init__(self, to: str):
+        self.to = to
+        self.buffer = ""
+        self.pendiente = ""
+        self.enviados = 0
+        # Respuesta que ya le llegó al usuario (sin el aviso de corte):
+        # es lo que se guarda en el historial
+        self.enviado = ""
+        self.inicio = time.monotonic()
+
+    async def agregar(self, delta: str):
+        self.buffer += delta
+        while "\n\n" in self.buffer:
+            parrafo, self.buffer = self.buffer.split("\n\n", 1)
+            limpio = clean_markdown_formatting(parrafo)
+            if not limpio:
+                continue
+            self.pendiente = (f"{self.pendiente}\n\n{limpio}"
+                              if self.pendiente else limpio)
+            if len(self.pendiente) >= STREAM_MIN_CHARS:
+                await self._enviar()
+
+    async def cerrar(self):
+        limpio = clean_markdown_formatting(self.buffer)
+        self.buffer = ""
+        if limpio:
+            self.pendiente = (f"{self.pendiente}\n\n{limpio}"
+                              if self.pendiente else limpio)
+        if self.pendiente:
+            await self._enviar()
+
+    async def cortar(self, aviso: str):
+        """
+        Envía los párrafos completos pendientes + aviso; descarta el resto.
+        El aviso no entra en `enviado` (no es parte de la respuesta).
+        """
+        self.buffer = ""
+        parrafos = self.pendiente
+        self.pendiente = f"{parrafos}\n\n{aviso}" if parrafos else aviso
+        await self._enviar(respuesta=parrafos)
+
+    async def _enviar(self, respuesta: Optional[str] = None):
+        """respuesta: parte del texto a registrar en `enviado` (todo si None)."""
+        from services.whatsapp import send_whatsapp_message
+        texto, self.pendiente = self.pendiente, ""
+        if self.enviados == 0:
+            logger.info(f"[STREAM] Primer párrafo a "
+                        f"{time.monotonic() - self.inicio:.2f}s")
+        result = await send_whatsapp_message(self.to, texto)
+        self.enviados += 1
+        if not result.get("success"):
+            logger.error(f"[STREAM] Error enviando párrafo: "
+                         f"{result.get('error')}")
+            return
+        texto = texto if respuesta is None else respuesta
+        if texto:
+            self.enviado = (f"{self.enviado}\n\n{texto}"
+                            if self.enviado else texto)
+
+
+async def _completar_streaming(messages: list, stream_to: str,
+                               tools: list) -> tuple:
+    """
+    Llama al modelo con stream=True.
+    Si el modelo responde texto, lo envía por párrafos a stream_to.
+    Si aparecen tool calls, deja de enviar y las acumula.
+    Si el stream falla con párrafos ya enviados, cierra con
+    STREAM_CORTADO y devuelve como respuesta final solo lo que le llegó
+    al usuario (sin el aviso), que es lo que queda en el historial.
+
+    Returns:
+        (content, tool_calls, usage): tool_calls es una lista de objetos
+        con .id y .function.name/.arguments (misma forma que el SDK)
+    """
+    model_to_use = OPENAI_MODEL if OPENAI_MODEL else "gpt-4o-mini"
+    stream = await async_client.chat.completions.create(
+        model=model_to_use,
+        messages=messages,
+        tools=tools,
+        tool_choice="auto",
+        temperature=0.7,
+        max_tokens=2000,
+        stream=True,
+        # openai==1.12 no tiene el kwarg stream_options: va en el body
+        extra_body={"stream_options": {
+            "include_usage": True
+        }})
+
+    envio = _EnvioPorParrafos(stream_to)
+    content = ""
+    tool_calls = {}
+    usage = None
+
+    try:
+        async for chunk in stream:
+            # El último chunk trae solo el uso de tokens
+            if getattr(chunk, "usage", None):
+                usage = chunk.usage
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+
+            if delta.tool_calls:
+                for tc in delta.tool_calls:
+                    actual = tool_calls.setdefault(tc.index, {
+                        "id": "",
+                        "name": "",
+                        "arguments": ""
+                    })
+                    if tc.id:
+                        actual["id"] = tc.id
+                    if tc.function:
+                        actual["name"] += tc.function.name or ""
+                        actual["arguments"] += tc.function.arguments or ""
+
+            if delta.content:
+                content += delta.content
+                if not tool_calls:
+                    await envio.agregar(delta.content)
+    except Exception as e:
+        if not envio.enviados:
+            raise
+        logger.error(f"[STREAM] Cortado después de {envio.enviados} "
+                     f"párrafos: {e}")
+        await envio.cortar(STREAM_CORTADO)
+        return envio.enviado, [], usage
+
+    if tool_calls:
+        if envio.enviados:
+            logger.warning("[STREAM] Tool call después de texto ya enviado")
+        return content, [
+            SimpleNamespace(id=tc["id"],
+                            function=SimpleNamespace(name=tc["name"],
+                                                     arguments=tc["arguments"]))
+            for _, tc in sorted(tool_calls.items())
+        ], usage
+
+    await envio.cerrar()
+    return content, [], usage
+
+
 async def process_message(user_message: str,
                           phone_whatsapp: str,
                           country_detected: str = "",
@@ -379,27 +535,75 @@ async def process_message(user_message: str,
                           emoji: str = "",
                           city_detected: str = "",
                           province_detected: str = "",
-                          original_message_type: str = "text") -> str:
+                          original_message_type: str = "text",
+                          chat_history: Optional[list] = None,
+                          lead: Optional[dict] = None,
+                          estado: Optional[dict] = None,
+                          stream_to: str = "",
+                          turno: Optional[dict] = None) -> str:
     """
     Procesa un mensaje del usuario y genera respuesta usando el agente.
+
+    Si el caller ya trajo chat_history (pre-proceso en paralelo), no se
+    vuelve a leer de MongoDB: el mensaje del usuario se agrega localmente
+    y se persiste en un thread mientras corre el LLM.
+
+    estado: documento de agent_state de la sesión (se lee si no viene).
+    Los resultados de tools ya ejecutadas se reutilizan desde ahí.
+
+    stream_to: si viene (y AGENT_STREAMING está activo), la respuesta se
+    envía por WhatsApp a ese número párrafo a párrafo mientras se genera
+    y se retorna "" (ya enviada).
+
+    turno: si viene un dict, se completa con la respuesta final y si se
+    usaron tools (lo usa el fast path en modo shadow para comparar).
     """
     try:
         if not client:
             logger.error("Cliente OpenAI no disponible")
             return "Hubo un error de configuración. Por favor intentá más tarde."
 
-        # Guardar mensaje del usuario en historial
-        try:
-            save_chat_message(phone_whatsapp, "human", user_message)
-        except Exception as e:
-            logger.error(f"Error guardando mensaje en historial: {e}")
+        guardado_usuario = None
+        if chat_history is None:
+            # Guardar mensaje del usuario en historial
+            try:
+                await asyncio.to_thread(session_cache.append_message,
+                                        phone_whatsapp, "human",
+                                        user_message)
+            except Exception as e:
+                logger.error(f"Error guardando mensaje en historial: {e}")
 
-        # Obtener historial de conversación
-        chat_history = []
-        try:
-            chat_history = get_chat_history(phone_whatsapp, limit=20)
-        except Exception as e:
-            logger.error(f"Error obteniendo historial: {e}")
+            # Obtener historial de conversación
+            chat_history = []
+            try:
+                chat_history = await asyncio.to_thread(
+                    session_cache.get_history, phone_whatsapp,
+                    HISTORIAL_AGENTE)
+            except Exception as e:
+                logger.error(f"Error obteniendo historial: {e}")
+            total_mensajes = session_cache.total_mensajes(phone_whatsapp)
+        else:
+            # Historial ya traído: agregar el mensaje localmente (mismo
+            # resultado que guardar + releer) y persistir sin bloquear
+            total_mensajes = session_cache.total_mensajes(phone_whatsapp)
+            if total_mensajes is not None:
+                total_mensajes += 1
+            guardado_usuario = asyncio.create_task(
+                asyncio.to_thread(session_cache.append_message,
+                                  phone_whatsapp, "human", user_message))
+            chat_history = (chat_history + [{
+                "role": "user",
+                "content": user_message
+            }])[-HISTORIAL_AGENTE:]
+
+        if estado is None:
+            estado = await asyncio.to_thread(cargar_estado, phone_whatsapp)
+
+        # Lo ya conocido de turnos anteriores (evita repetir tools)
+        bloque_estado = ""
+        resumen = resumen_estado(estado)
+        if resumen:
+            bloque_estado = f"\n[ESTADO DE SESIÓN]\n{resumen}\n"
 
         # Construir el mensaje con DATOS DETECTADOS (como hace n8n)
         mensaje_con_datos = f"""[DATOS DETECTADOS]
@@ -409,15 +613,33 @@ Provincia: {province_detected if province_detected else "No detectada"}
 WhatsApp: {phone_whatsapp}
 Zona horaria: {timezone_detected}
 UTC: {utc_offset}
-
+{bloque_estado}
 [MENSAJE DEL USUARIO]
 {user_message}"""
 
-        # Construir mensajes para OpenAI
+        # Construir mensajes para OpenAI: ventana de historial por
+        # presupuesto de tokens + resumen de lo que quedó afuera (y lo
+        # que todavía no entró al resumen)
+        resumen_previo = estado["resumen"]["texto"]
+        ventana = historial_para_agente(chat_history, total_mensajes,
+                                        estado["resumen"]["mensajes"],
+                                        resumen_previo)
+
         messages = [{"role": "system", "content": SYSTEM_PROMPT}]
-        messages.extend(chat_history)
+        if resumen_previo:
+            messages.append({
+                "role":
+                "system",
+                "content":
+                f"[RESUMEN DE LA CONVERSACIÓN ANTERIOR]\n{resumen_previo}"
+            })
+        messages.extend(ventana)
         messages.append({"role": "user", "content": mensaje_con_datos})
 
+        logger.info(f"[CONTEXT] Historial {len(ventana)}/{len(chat_history)} "
+                    f"msgs, ~{sum(count_tokens(m['content']) for m in ventana)}"
+                    f" tokens, resumen: {'sí' if resumen_previo else 'no'}")
+
         # Contexto para ejecución de tools
         context = {
             "phone_whatsapp": phone_whatsapp,
@@ -428,52 +650,78 @@ UTC: {utc_offset}
             "emoji": emoji,
             "city": city_detected,
             "province": province_detected,
+            "lead": lead,
             "wait_message_sent": False
         }
+        aplicar_a_context(estado, context)
 
         # Loop de function calling
         max_iterations = 10
         iteration = 0
 
+        usar_streaming = bool(stream_to and async_client and AGENT_STREAMING
+                              and original_message_type == "text")
+
         while iteration < max_iterations:
             iteration += 1
 
-            try:
-                model_to_use = OPENAI_MODEL if OPENAI_MODEL else "gpt-4o-mini"
-                response = client.chat.completions.create(
-                    model=model_to_use,
-                    messages=messages,
-                    tools=TOOLS_DEFINITIONS,
-                    tool_choice="auto",
-                    temperature=0.7,
-                    max_tokens=2000)
-            except Exception as e:
-                logger.error(f"Error llamando a OpenAI: {e}", exc_info=True)
-                return "Hubo un error procesando tu mensaje. Por favor intentá de nuevo."
-
-            if response is None:
-                logger.error("Respuesta de OpenAI es None")
-                return "Hubo un error procesando tu mensaje. Por favor intentá de nuevo."
+            # Solo las tools válidas en la etapa actual (se recalcula por
+            # iteración: guardar_lead_mongodb cambia la etapa)
+            etapa = detectar_etapa(estado, lead)
+            tools = tools_para_etapa(etapa)
+            t0 = time.monotonic()
 
-            choices = getattr(response, 'choices', None)
-            if not choices or len(choices) == 0:
-                logger.error("Respuesta de OpenAI sin choices")
-                return "Hubo un error procesando tu mensaje. Por favor intentá de nuevo."
-
-            choice = choices[0]
-            message = choice.message
-
-            # Si no hay tool calls, retornar la respuesta
-            if not message.tool_calls:
+            if usar_streaming:
+                try:
+                    content, tool_calls, usage = await _completar_streaming(
+                        messages, stream_to, tools)
+                except Exception as e:
+                    logger.error(f"Error en streaming de OpenAI: {e}",
+                                 exc_info=True)
+                    return "Hubo un error procesando tu mensaje. Por favor intentá de nuevo."
+                _registrar_request(etapa, tools, usage, time.monotonic() - t0)
+            else:
+                try:
+                    model_to_use = OPENAI_MODEL if OPENAI_MODEL else "gpt-4o-mini"
+                    response = client.chat.completions.create(
+                        model=model_to_use,
+                        messages=messages,
+                        tools=tools,
+                        tool_choice="auto",
+                        temperature=0.7,
+                        max_tokens=2000)
+                except Exception as e:
+                    logger.error(f"Error llamando a OpenAI: {e}",
+                                 exc_info=True)
+                    return "Hubo un error procesando tu mensaje. Por favor intentá de nuevo."
+                _registrar_request(etapa, tools,
+                                   getattr(response, "usage", None),
+                                   time.monotonic() - t0)
+
+                if response is None:
+                    logger.error("Respuesta de OpenAI es None")
+                    return "Hubo un error procesando tu mensaje. Por favor intentá de nuevo."
+
+                choices = getattr(response, 'choices', None)
+                if not choices or len(choices) == 0:
+                    logger.error("Respuesta de OpenAI sin choices")
+                    return "Hubo un error procesando tu mensaje. Por favor intentá de nuevo."
+
+                message = choices[0].message
                 content = message.content or ""
+                tool_calls = message.tool_calls
 
+            # Si no hay tool calls, retornar la respuesta
+            if not tool_calls:
                 # Guardar respuesta en historial
-                if content:
-                    try:
-                        save_chat_message(phone_whatsapp, "ai", content)
-                    except Exception as e:
-                        logger.error(
-                            f"Error guardando respuesta en historial: {e}")
+                await _guardar_respuesta(phone_whatsapp, content,
+                                         guardado_usuario)
+                if turno is not None:
+                    turno.update(respuesta=content, uso_tools=iteration > 1)
+
+                # Con streaming ya se envió por párrafos
+                if usar_streaming:
+                    return ""
 
                 # Limpiar formato Markdown para WhatsApp
                 cleaned_response = clean_markdown_formatting(content)
@@ -490,31 +738,8 @@ UTC: {utc_offset}
 
                 return cleaned_response
 
-            # Procesar tool calls
-            messages.append(message)
-
-            for tool_call in message.tool_calls:
-                tool_name = tool_call.function.name
-
-                try:
-                    arguments = json.loads(tool_call.function.arguments)
-                except json.JSONDecodeError:
-                    arguments = {}
-
-                logger.info(f"[AGENT] Ejecutando tool: {tool_name}")
-
-                # Ejecutar la tool
-                tool_result = await execute_tool(tool_name, arguments, context)
-
-                # Agregar resultado al mensaje
-                messages.append({
-                    "role":
-                    "tool",
-                    "tool_call_id":
-                    tool_call.id,
-                    "content":
-                    json.dumps(tool_result, ensure_ascii=False)
-                })
+            await _ejecutar_ronda_tools(messages, content, tool_calls, context,
+                                        estado, phone_whatsapp)
 
         logger.warning(
             f"Límite de iteraciones alcanzado para {phone_whatsapp}")
@@ -525,6 +750,209 @@ UTC: {utc_offset}
         return "Disculpá, hubo un error. ¿Podés intentar de nuevo en unos segundos?"
 
 
+async def _guardar_respuesta(phone_whatsapp: str, content: str,
+                             guardado_usuario) -> None:
+    """Guarda la respuesta en historial (después del mensaje del usuario)."""
+    if guardado_usuario is not None:
+        try:
+            await guardado_usuario
+        except Exception as e:
+            logger.error(f"Error guardando mensaje en historial: {e}")
+    if content:
+        try:
+            session_cache.append_message(phone_whatsapp, "ai", content)
+        except Exception as e:
+            logger.error(f"Error guardando respuesta en historial: {e}")
+
+
+async def _ejecutar_ronda_tools(messages: list, content: str,
+                               tool_calls: list, context: dict,
+                               estado: dict, phone_whatsapp: str) -> None:
+    """
+    Una vuelta de tools (con o sin streaming): agrega el mensaje del
+    asistente, ejecuta las tools (en paralelo las independientes), agrega
+    los resultados en el orden de los tool_calls y persiste el estado si
+    cambió (sin bloquear).
+    """
+    messages.append({
+        "role":
+        "assistant",
+        "content":
+        content or None,
+        "tool_calls": [{
+            "id": tc.id,
+            "type": "function",
+            "function": {
+                "name": tc.function.name,
+                "arguments": tc.function.arguments
+            }
+        } for tc in tool_calls]
+    })
+
+    resultados, modificado = await ejecutar_tool_calls(
+        tool_calls, context, estado)
+    _agregar_resultados_tools(messages, tool_calls, resultados)
+
+    if modificado:
+        asyncio.create_task(
+            asyncio.to_thread(guardar_estado, phone_whatsapp,
+                              copy.deepcopy(estado)))
+
+
+def _agregar_resultados_tools(messages: list, tool_calls: list,
+                              resultados: list) -> None:
+    """Agrega los resultados como mensajes role=tool, en orden."""
+    for tool_call, tool_result in zip(tool_calls, resultados):
+        messages.append({
+            "role": "tool",
+            "tool_call_id": tool_call.id,
+            "content": json.dumps(tool_result, ensure_ascii=False)
+        })
+
+
+# ═════════════════════════════════════════════════════════════════
+# EJECUCIÓN CONCURRENTE DE TOOL CALLS
+# ═════════════════════════════════════════════════════════════════
+# Recursos que cada tool lee/escribe: claves del context y recursos
+# externos ("db:lead", "chat" = mensajes al usuario en orden).
+# Dos tools del mismo mensaje corren en paralelo si no hay conflicto
+# (escritura/escritura o escritura/lectura); si no, la segunda espera.
+# Tools sin política declarada corren solas ("*").
+TOOL_POLITICAS = {
+    "extraer_datos_web_cliente": {
+        "lee": {"city", "province", "country_detected"},
+        "escribe": {"website", "nombre_persona", "chat"}
+    },
+    "buscar_redes_personales": {
+        "lee": {
+            "linkedin_empresa", "facebook_empresa", "instagram_empresa",
+            "city_web", "province_web", "city", "province",
+            "country_detected", "email_principal"
+        },
+        "escribe": {
+            "linkedin_personal", "linkedin_empresa", "facebook_empresa",
+            "instagram_empresa"
+        }
+    },
+    "verificar_investigacion_completa": {
+        "lee": {"website"},
+        "escribe": {
+            "empresa", "business_activity", "business_model",
+            "linkedin_empresa", "facebook_empresa", "instagram_empresa",
+            "email_principal", "city_web", "province_web",
+            "linkedin_personal"
+        }
+    },
+    "investigar_desafios_empresa": {
+        "lee": {"business_activity", "country_detected"},
+        "escribe": {"challenges_detected"}
+    },
+    "buscar_web_tavily": {
+        "lee": set(),
+        "escribe": set()
+    },
+    "buscar_info_dania": {
+        "lee": set(),
+        "escribe": set()
+    },
+    "guardar_lead_mongodb": {
+        "lee": {"challenges_detected", "business_model", "country_detected"},
+        "escribe": {"db:lead"}
+    },
+    "gestionar_calcom": {
+        "lee": {"db:lead"},
+        "escribe": {"db:lead"}
+    },
+    "resumir_conversacion": {
+        "lee": set(),
+        "escribe": {"db:lead"}
+    },
+}
+
+_POLITICA_EXCLUSIVA = {"lee": set(), "escribe": {"*"}}
+
+
+def _en_conflicto(anterior: dict, posterior: dict) -> bool:
+    """True si posterior tiene que esperar a anterior."""
+    if "*" in anterior["escribe"] or "*" in posterior["escribe"]:
+        return True
+    return bool(anterior["escribe"] & (posterior["lee"] | posterior["escribe"])
+                or posterior["escribe"] & anterior["lee"])
+
+
+async def ejecutar_tool_calls(tool_calls: list, context: dict,
+                              estado: dict) -> tuple:
+    """
+    Ejecuta los tool_calls de una completion respetando TOOL_POLITICAS.
+    Las independientes corren en paralelo; los resultados vuelven en el
+    mismo orden que los tool_calls.
+
+    Returns:
+        (lista de resultados, True si el estado de sesión cambió)
+    """
+    inicio = time.monotonic()
+    timeline = []
+    modificado = False
+    tareas = []
+
+    async def _correr(i, tool_name, arguments, dependencias):
+        nonlocal modificado
+        if dependencias:
+            await asyncio.gather(*dependencias, return_exceptions=True)
+
+        t0 = time.monotonic() - inicio
+
+        # Reutilizar resultado de un turno anterior si los
+        # argumentos no cambiaron
+        previo = resultado_previo(estado, tool_name, arguments)
+        if previo is not None:
+            logger.info(f"[AGENT] Reutilizando resultado: {tool_name}")
+            tool_result = {**previo, "reutilizado": True}
+        else:
+            logger.info(f"[AGENT] Ejecutando tool: {tool_name}")
+            tool_result = await execute_tool(tool_name, arguments, context)
+            # Registrar enseguida: las dependientes leen el context
+            if registrar_tool(estado, tool_name, arguments, tool_result,
+                              context):
+                modificado = True
+
+        timeline.append((i, tool_name, t0, time.monotonic() - inicio))
+        return tool_result
+
+    politicas = []
+    for i, tool_call in enumerate(tool_calls):
+        tool_name = tool_call.function.name
+        try:
+            arguments = json.loads(tool_call.function.arguments)
+        except json.JSONDecodeError:
+            arguments = {}
+
+        politica = TOOL_POLITICAS.get(tool_name, _POLITICA_EXCLUSIVA)
+        dependencias = [
+            tareas[j] for j, anterior in enumerate(politicas)
+            if _en_conflicto(anterior, politica)
+        ]
+        politicas.append(politica)
+        tareas.append(
+            asyncio.create_task(_correr(i, tool_name, arguments,
+                                        dependencias)))
+
+    resultados = []
+    for tarea in await asyncio.gather(*tareas, return_exceptions=True):
+        if isinstance(tarea, Exception):
+            resultados.append({"error": str(tarea)})
+        else:
+            resultados.append(tarea)
+
+    if len(tool_calls) > 1:
+        logger.info(f"[TIMELINE] {len(tool_calls)} tools en "
+                    f"{time.monotonic() - inicio:.2f}s: " + ", ".join(
+                        f"#{i} {nombre} {t0:.2f}→{t1:.2f}s"
+                        for i, nombre, t0, t1 in sorted(timeline)))
+
+    return resultados, modificado
+
+
 async def execute_tool(tool_name: str, arguments: dict, context: dict) -> dict:
     """
     Ejecuta una tool y retorna el resultado.
@@ -541,12 +969,15 @@ async def execute_tool(tool_name: str, arguments: dict, context: dict) -> dict:
                 from services.whatsapp import send_whatsapp_message
                 phone = context.get("phone_whatsapp", "")
                 if phone:
+                    # Marcar antes del await: con tools en paralelo
+                    # solo una envía el mensaje
+                    context["wait_message_sent"] = True
                     try:
                         await send_whatsapp_message(
                             phone, "Dame un momento por favor 🔍")
-                        context["wait_message_sent"] = True
                         logger.info(f"✓ Mensaje de espera enviado a {phone}")
                     except Exception as e:
+                        context["wait_message_sent"] = False
                         logger.warning(
                             f"Error enviando mensaje de espera: {e}")
 
@@ -578,17 +1009,26 @@ async def execute_tool(tool_name: str, arguments: dict, context: dict) -> dict:
                 "country": context.get("country_detected", "Argentina")
             }
 
-            asyncio.create_task(
-                iniciar_investigacion_background(phone=phone,
-                                                 nombre=nombre_persona,
-                                                 web=website,
-                                                 ubicacion=ubicacion))
-            logger.info(
-                f"[TOOL] ✓ Background lanzado: {nombre_persona}, {website}")
-
-            # 3. ESPERAR 50 SEGUNDOS
-            logger.info(f"[TOOL] Esperando 50 segundos...")
-            await asyncio.sleep(50)
+            # Si el webhook ya la lanzó al ver la URL, adjuntarse a esa
+            especulativa = speculative_research.adjuntar(phone, website)
+            if especulativa is None:
+                asyncio.create_task(
+                    iniciar_investigacion_background(
+                        phone=phone,
+                        nombre=nombre_persona,
+                        web=website,
+                        ubicacion=ubicacion,
+                        empresa=context.get("empresa", ""),
+                        rubro=context.get("business_activity", "")))
+                logger.info(
+                    f"[TOOL] ✓ Background lanzado: {nombre_persona}, {website}")
+
+            # 3. ESPERAR 50 SEGUNDOS (menos el adelanto especulativo)
+            espera = 50
+            if especulativa:
+                espera = max(0, 50 - int(especulativa["ventaja"]))
+            logger.info(f"[TOOL] Esperando {espera} segundos...")
+            await asyncio.sleep(espera)
 
             # 4. ENVIAR MENSAJE DE TRANSICIÓN
             await send_whatsapp_message(
@@ -662,9 +1102,14 @@ async def execute_tool(tool_name: str, arguments: dict, context: dict) -> dict:
 
             phone = context.get("phone_whatsapp", "")
 
-            # Esperar a que termine el background (máx 3 min)
+            # Para los desafíos alcanza con web (rubro) + desafíos; el
+            # reporte completo espera también LinkedIn y noticias
+            etapas = None
+            if arguments.get("para", "desafios") == "desafios":
+                etapas = {"web", "desafios"}
+
             resultado = await esperar_investigacion_completa(
-                phone, max_wait_seconds=180)
+                phone, max_wait_seconds=180, etapas=etapas)
 
             logger.info(
                 f"[TOOL] Completada: {resultado['completada']}, Rubro: {resultado['rubro']}"
@@ -831,6 +1276,9 @@ async def execute_tool(tool_name: str, arguments: dict, context: dict) -> dict:
 
             email_result = {"success": False, "error": "No enviado"}
             if save_result and save_result.get("success"):
+                session_cache.update_lead(
+                    lead_data.get("phone_whatsapp")
+                    or context.get("phone_whatsapp", ""), lead_data)
                 try:
                     email_result = send_lead_notification(lead_data)
                 except Exception as e:
@@ -863,6 +1311,7 @@ async def execute_tool(tool_name: str, arguments: dict, context: dict) -> dict:
                     return {"error": "No se proporcionó email"}
 
                 result = update_lead_calcom_email(phone, email, name)
+                session_cache.invalidar_lead(phone)
                 logger.info(f"[TOOL] ══════ COMPLETADO: {tool_name} ══════")
                 return result
 
@@ -950,6 +1399,7 @@ async def execute_tool(tool_name: str, arguments: dict, context: dict) -> dict:
 
             if incluir_en_lead and phone:
                 update_lead_summary(phone, summary)
+                session_cache.invalidar_lead(phone)
 
             logger.info(f"[TOOL] ══════ COMPLETADO: {tool_name} ══════")
             return {"summary": summary}
@@ -41,6 +41,35 @@ def init_scheduler():
                       name='Verificador de recordatorios',
                       replace_existing=True)
 
+    # Prewarm del cache de desafíos por rubro (1 vez por día)
+    from services.challenges_research import precalentar_desafios_top_rubros
+    scheduler.add_job(precalentar_desafios_top_rubros,
+                      IntervalTrigger(hours=24),
+                      id='desafios_prewarm',
+                      name='Prewarm de desafíos por rubro',
+                      next_run_time=datetime.now(pytz.UTC) +
+                      timedelta(minutes=2),
+                      replace_existing=True)
+
+    # Refresco del índice local de DANIA
+    from services.dania_knowledge import (refrescar_indice_dania,
+                                          INDEX_TTL_SECONDS)
+    scheduler.add_job(refrescar_indice_dania,
+                      IntervalTrigger(seconds=INDEX_TTL_SECONDS),
+                      kwargs={"forzar": True},
+                      id='dania_index_refresh',
+                      name='Refresco de índice DANIA',
+                      replace_existing=True)
+
+    # Flush del buffer de estados de entrega (sent/delivered/read/failed)
+    from services.message_status import status_buffer, FLUSH_INTERVAL_SECONDS
+    scheduler.add_job(status_buffer.flush,
+                      IntervalTrigger(seconds=FLUSH_INTERVAL_SECONDS),
+                      id='message_status_flush',
+                      name='Flush de estados de mensajes',
+                      max_instances=1,
+                      replace_existing=True)
+
     scheduler.start()
     logger.info("✅ Scheduler de recordatorios iniciado")
 
@@ -149,6 +178,9 @@ async def process_lead_reminders(lead: dict, now: datetime, collection):
             "$set": {
                 "booking_status": "completed",
                 "reserva_estado": "completed"
+            },
+            "$inc": {
+                "version": 1
             }
         })
         return
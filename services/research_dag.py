@@ -0,0 +1,381 @@
+"""
+Ejecutor de la investigación en background como DAG de etapas
+iniciar_investigacion_background corría web → LinkedIn/noticias →
+desafíos en serie, aunque los desafíos solo necesitan el rubro,
+LinkedIn el nombre y la empresa, y las noticias solo la empresa.
+
+Cada etapa declara:
+- requiere: datos que tienen que existir para arrancar
+- opcional: datos que usa si ya están cuando arranca
+- produce: datos que agrega al terminar
+- timeout: máximo de segundos para la etapa
+- respaldo: valores por defecto para entradas que ninguna etapa
+  llegó a producir (ej. empresa = dominio si la web no dio el nombre)
+
+El ejecutor arranca cada etapa apenas tiene sus entradas, corre en
+paralelo las independientes y llama a on_completa(etapa, salida) en
+cuanto termina cada una (para persistirla sin esperar al resto).
+Todo el DAG tiene además un presupuesto total de tiempo.
+
+Cada etapa deja un marcador en leads_fortia.investigacion_etapas; con
+eso investigacion_parcial() separa lo que ya se sabe de lo pendiente.
+"""
+import time
+import asyncio
+import logging
+from typing import Callable, Optional
+
+from services.agent_state import VALORES_VACIOS
+from utils.text_cleaner import clean_url
+
+logger = logging.getLogger(__name__)
+
+INVESTIGACION_BUDGET_SECONDS = 240
+
+
+def _tiene(datos: dict, campo: str) -> bool:
+    valor = datos.get(campo)
+    if isinstance(valor, str):
+        return valor.strip() not in VALORES_VACIOS
+    return bool(valor)
+
+
+# ═══════════════════════════════════════════════════════════════════
+# ETAPAS DE LA INVESTIGACIÓN
+# ═══════════════════════════════════════════════════════════════════
+async def _etapa_web(datos: dict) -> dict:
+    from services.web_extractor import extract_web_data
+
+    datos_web = await extract_web_data(datos["web"])
+    if not datos_web:
+        return {}
+    return {
+        "datos_web": datos_web,
+        "empresa": datos_web.get("business_name", ""),
+        "rubro": datos_web.get("business_activity", ""),
+        "email_principal": datos_web.get("email_principal", ""),
+        "linkedin_empresa": datos_web.get("linkedin_empresa", ""),
+        "facebook_empresa": datos_web.get("facebook_empresa", ""),
+        "instagram_empresa": datos_web.get("instagram_empresa", ""),
+        "city_web": datos_web.get("city", ""),
+        "province_web": datos_web.get("province", "")
+    }
+
+
+async def _etapa_redes(datos: dict) -> dict:
+    from services.social_research import research_person_and_company
+
+    def _valor(campo):
+        return datos.get(campo, "") if _tiene(datos, campo) else ""
+
+    linkedin_data = await research_person_and_company(
+        nombre_persona=datos["nombre"],
+        empresa=datos["empresa"],
+        website=_valor("web"),
+        linkedin_empresa_input=_valor("linkedin_empresa"),
+        facebook_empresa_input=_valor("facebook_empresa"),
+        instagram_empresa_input=_valor("instagram_empresa"),
+        city=_valor("city") or _valor("city_web"),
+        province=_valor("province") or _valor("province_web"),
+        country=_valor("country") or "Argentina",
+        email_contacto=_valor("email_principal"),
+        phone=_valor("phone"),
+        incluir_noticias=False)
+    return {"linkedin_data": linkedin_data} if linkedin_data else {}
+
+
+async def _etapa_noticias(datos: dict) -> dict:
+    from services.social_research import (buscar_noticias_empresa,
+                                          formatear_noticias)
+
+    def _valor(campo):
+        return datos.get(campo, "") if _tiene(datos, campo) else ""
+
+    resultado = await buscar_noticias_empresa(
+        empresa=datos["empresa"],
+        empresa_busqueda=datos["empresa"],
+        ubicacion_query=(_valor("city") or _valor("city_web")
+                         or _valor("province") or _valor("province_web")
+                         or _valor("country")),
+        phone=_valor("phone"))
+    # Sin noticias también se guarda: las tardías de Apify lo pisan
+    return {
+        "noticias_data": {
+            "noticias_empresa":
+            formatear_noticias(resultado["noticias"])
+            or "No se encontraron noticias",
+            "noticias_source": resultado["source"]
+        }
+    }
+
+
+async def _etapa_desafios(datos: dict) -> dict:
+    from services.challenges_research import investigar_desafios_empresa
+
+    desafios_data = await investigar_desafios_empresa(
+        datos["rubro"], datos.get("country") or "Argentina")
+    return {"desafios_data": desafios_data} if desafios_data else {}
+
+
+ETAPAS_INVESTIGACION = [
+    {
+        "nombre": "web",
+        "requiere": {"web"},
+        "opcional": set(),
+        "produce": {
+            "datos_web", "empresa", "rubro", "email_principal",
+            "linkedin_empresa", "facebook_empresa", "instagram_empresa",
+            "city_web", "province_web"
+        },
+        "timeout": 120,
+        "fn": _etapa_web
+    },
+    {
+        "nombre": "redes",
+        "requiere": {"nombre", "empresa"},
+        "opcional": {
+            "web", "linkedin_empresa", "facebook_empresa",
+            "instagram_empresa", "email_principal", "city", "province",
+            "city_web", "province_web", "country", "phone"
+        },
+        "produce": {"linkedin_data"},
+        # Igual que research_person_and_company: sin nombre de empresa
+        # se busca por el dominio
+        "respaldo": {
+            "empresa": lambda datos: clean_url(datos.get("web", ""))
+        },
+        "timeout": 150,
+        "fn": _etapa_redes
+    },
+    {
+        # Separada de redes: la empresa alcanza aunque no haya nombre
+        "nombre": "noticias",
+        "requiere": {"empresa"},
+        "opcional": {
+            "city", "province", "city_web", "province_web", "country",
+            "phone"
+        },
+        "produce": {"noticias_data"},
+        "respaldo": {
+            "empresa": lambda datos: clean_url(datos.get("web", ""))
+        },
+        "timeout": 150,
+        "fn": _etapa_noticias
+    },
+    {
+        "nombre": "desafios",
+        "requiere": {"rubro"},
+        "opcional": {"country"},
+        "produce": {"desafios_data"},
+        "timeout": 90,
+        "fn": _etapa_desafios
+    },
+]
+
+
+# Campos de leads_fortia que cubre cada etapa (y su valor si no se halló)
+CAMPOS_POR_ETAPA = {
+    "web": {
+        "business_name": "No encontrado",
+        "business_activity": "No encontrado",
+        "business_model": "No encontrado",
+        "business_description": "No encontrado",
+        "services": "No encontrado",
+        "phone_empresa": "No encontrado",
+        "whatsapp_empresa": "No encontrado",
+        "email_principal": "No encontrado",
+        "address": "No encontrada",
+        "city": "No encontrado",
+        "province": "No encontrado",
+        "linkedin_empresa": "No encontrado",
+        "instagram_empresa": "No encontrado",
+        "facebook_empresa": "No encontrado",
+        "youtube": "No encontrado",
+        "twitter": "No encontrado",
+        "cargo_detectado": "No detectado",
+        "horarios": "No encontrado"
+    },
+    "redes": {
+        "linkedin_personal": "No encontrado",
+        "linkedin_personal_confianza": 0
+    },
+    "noticias": {
+        "noticias_empresa": "No encontrado"
+    },
+    "desafios": {
+        "desafios_rubro": []
+    }
+}
+
+ESTADOS_FINALES = {"completada", "fallida", "timeout", "omitida"}
+
+
+def investigacion_parcial(lead: dict) -> dict:
+    """
+    Lo que ya se sabe de la investigación de un lead y lo pendiente.
+
+    Returns:
+        {
+            "status": investigacion_status,
+            "etapas": {etapa: estado},
+            "listas": set de etapas terminadas,
+            "conocido": {campo: valor} de las etapas terminadas,
+            "pendiente": [campos de etapas sin terminar],
+            "rubro": str
+        }
+    """
+    lead = lead or {}
+    status = lead.get("investigacion_status", "")
+    marcadores = lead.get("investigacion_etapas") or {}
+    dwb = lead.get("datos_web_background") or {}
+
+    etapas = {}
+    for etapa in CAMPOS_POR_ETAPA:
+        estado = (marcadores.get(etapa) or {}).get("estado", "")
+        # Investigaciones anteriores a los marcadores
+        if not estado and status in ("completada", "fallida"):
+            estado = "completada"
+        etapas[etapa] = estado or "pendiente"
+
+    listas = {e for e, estado in etapas.items() if estado in ESTADOS_FINALES}
+    conocido = {}
+    pendiente = []
+    for etapa, campos in CAMPOS_POR_ETAPA.items():
+        for campo, defecto in campos.items():
+            if etapa not in listas:
+                pendiente.append(campo)
+            elif etapa == "web":
+                conocido[campo] = lead.get(campo) or dwb.get(campo, defecto)
+            else:
+                conocido[campo] = lead.get(campo, defecto)
+
+    rubro = ""
+    if "web" in listas:
+        rubro = conocido.get("business_activity", "")
+        if rubro in VALORES_VACIOS:
+            rubro = ""
+
+    return {
+        "status": status,
+        "etapas": etapas,
+        "listas": listas,
+        "conocido": conocido,
+        "pendiente": pendiente,
+        "rubro": rubro
+    }
+
+
+# ═══════════════════════════════════════════════════════════════════
+# EJECUTOR
+# ═══════════════════════════════════════════════════════════════════
+async def ejecutar_dag(etapas: list,
+                       datos_iniciales: dict,
+                       on_completa: Optional[Callable] = None,
+                       budget_seconds: int = INVESTIGACION_BUDGET_SECONDS,
+                       etiqueta: str = "") -> dict:
+    """
+    Ejecuta las etapas respetando dependencias.
+
+    Args:
+        on_completa: async (etapa, estado, salida) llamado al terminar
+            cada etapa (estado: completada / fallida / timeout / omitida)
+
+    Returns:
+        {"datos": dict acumulado, "etapas": {nombre: {"estado", "duracion"}}}
+    """
+    datos = {
+        campo: valor
+        for campo, valor in datos_iniciales.items()
+        if _tiene(datos_iniciales, campo)
+    }
+    pendientes = {e["nombre"]: e for e in etapas}
+    en_curso = {}
+    resultado = {}
+    limite = time.monotonic() + budget_seconds
+
+    async def _correr(etapa: dict, restante: float):
+        timeout = min(etapa["timeout"], restante)
+        entradas = {
+            campo: datos[campo]
+            for campo in etapa["requiere"] | etapa["opcional"]
+            if campo in datos
+        }
+        return await asyncio.wait_for(etapa["fn"](entradas), timeout)
+
+    async def _notificar(etapa: dict, estado: str, salida: dict, t0: float):
+        duracion = time.monotonic() - t0 if t0 else 0.0
+        resultado[etapa["nombre"]] = {
+            "estado": estado,
+            "duracion": round(duracion, 2)
+        }
+        logger.info(f"[DAG] {etiqueta} {etapa['nombre']}: {estado} "
+                    f"({duracion:.1f}s)")
+        if on_completa:
+            try:
+                await on_completa(etapa, estado, salida)
+            except Exception as e:
+                logger.error(
+                    f"[DAG] Error persistiendo {etapa['nombre']}: {e}")
+
+    def _aplicar_respaldos(forzar: bool) -> bool:
+        """Respaldo de campos que ninguna otra etapa puede producir."""
+        aplicados = False
+        for etapa in pendientes.values():
+            productores = [e for e, _ in en_curso.values()] + [
+                e for e in pendientes.values() if e is not etapa
+            ]
+            for campo, fn in etapa.get("respaldo", {}).items():
+                if _tiene(datos, campo):
+                    continue
+                if not forzar and any(campo in e["produce"]
+                                      for e in productores):
+                    continue
+                valor = fn(datos)
+                if valor:
+                    datos[campo] = valor
+                    aplicados = True
+        return aplicados
+
+    while pendientes or en_curso:
+        _aplicar_respaldos(forzar=False)
+
+        # Arrancar todo lo que ya tiene sus entradas
+        restante = limite - time.monotonic()
+        for nombre, etapa in list(pendientes.items()):
+            if restante <= 0:
+                break
+            if all(_tiene(datos, campo) for campo in etapa["requiere"]):
+                del pendientes[nombre]
+                tarea = asyncio.create_task(_correr(etapa, restante))
+                en_curso[tarea] = (etapa, time.monotonic())
+
+        if not en_curso:
+            # Nada corriendo: completar con respaldos lo que falte
+            if _aplicar_respaldos(forzar=True) and restante > 0:
+                continue
+
+            # Lo pendiente nunca va a tener sus entradas
+            for etapa in pendientes.values():
+                await _notificar(etapa, "omitida", {}, 0.0)
+            break
+
+        hechas, _ = await asyncio.wait(en_curso,
+                                       return_when=asyncio.FIRST_COMPLETED)
+        for tarea in hechas:
+            etapa, t0 = en_curso.pop(tarea)
+            salida = {}
+            try:
+                salida = tarea.result() or {}
+                estado = "completada"
+            except asyncio.TimeoutError:
+                estado = "timeout"
+            except Exception as e:
+                logger.error(f"[DAG] {etapa['nombre']} falló: {e}")
+                estado = "fallida"
+
+            for campo in etapa["produce"]:
+                if _tiene(salida, campo) and not _tiene(datos, campo):
+                    datos[campo] = salida[campo]
+            await _notificar(etapa, estado, salida, t0)
+
+    return {"datos": datos, "etapas": resultado}
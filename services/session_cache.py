@@ -0,0 +1,354 @@
+"""
+Cache de sesiones en memoria para DANIA/Fortia
+Por teléfono guarda el historial reciente y los campos "calientes" del
+lead, para que los turnos siguientes de una conversación no lean MongoDB.
+
+- LRU acotado (cantidad de sesiones y mensajes por sesión configurables)
+- Evicción por inactividad
+- Write-through: cada mensaje se escribe en chat_history al agregarse
+- Invalidación entre workers: chat_history.version se incrementa en cada
+  escritura; si el write condicional no matchea la versión cacheada,
+  otro worker escribió y la sesión se descarta.
+- Versión con TTL: en un hit se lee solo la versión (chat_history.version
+  y leads_fortia.version), como mucho una vez cada
+  SESSION_CACHE_VERSION_CHECK_SECONDS por sesión, y se recarga la parte
+  que cambió. Lo que escriben otros workers, la investigación en
+  background o el webhook de Cal.com puede verse hasta ese tiempo tarde.
+- Las escrituras de este proceso invalidan sin esperar: append_message
+  y update_lead actualizan la sesión, invalidar_lead la descarta.
+"""
+import time
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Optional
+
+from pymongo.errors import PyMongoError
+
+from config import (SESSION_CACHE_MAX_SESSIONS, SESSION_CACHE_MAX_MESSAGES,
+                    SESSION_CACHE_IDLE_SECONDS,
+                    SESSION_CACHE_VERSION_CHECK_SECONDS)
+from services.mongodb import (get_database, find_lead_by_phone,
+                              save_chat_message, formatear_historial,
+                              get_lead_field, CAMPO_ESPANOL)
+
+logger = logging.getLogger(__name__)
+
+# Campos del lead que se usan en cada turno (se guardan en español)
+HOT_LEAD_FIELDS = [
+    "name", "email", "role", "business_name", "business_activity",
+    "website", "country_detected", "city", "province", "linkedin_personal",
+    "linkedin_empresa", "qualification_tier", "email_calcom",
+    "booking_status"
+]
+
+
+class SessionCache:
+    """LRU de sesiones por teléfono con write-through a MongoDB."""
+
+    def __init__(self,
+                 max_sessions: int = SESSION_CACHE_MAX_SESSIONS,
+                 max_messages: int = SESSION_CACHE_MAX_MESSAGES,
+                 idle_seconds: int = SESSION_CACHE_IDLE_SECONDS,
+                 version_check_seconds: float = (
+                     SESSION_CACHE_VERSION_CHECK_SECONDS)):
+        self._sessions = OrderedDict()
+        self._max_sessions = max_sessions
+        self._max_messages = max_messages
+        self._idle_seconds = idle_seconds
+        self._version_check_seconds = version_check_seconds
+        # Se accede desde asyncio.to_thread
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "conflictos_version": 0,
+            "recargas": 0,
+            "evictados": 0
+        }
+
+    # ─────────────────────────────────────────────────────────────
+    # Internos
+    # ─────────────────────────────────────────────────────────────
+    def _evictar(self):
+        """Saca sesiones inactivas y las menos usadas si hay exceso."""
+        limite = time.time() - self._idle_seconds
+        while self._sessions:
+            phone, sesion = next(iter(self._sessions.items()))
+            if (sesion["ultimo_uso"] >= limite
+                    and len(self._sessions) <= self._max_sessions):
+                break
+            del self._sessions[phone]
+            self._stats["evictados"] += 1
+
+    def _cargar(self, phone: str) -> Optional[dict]:
+        """Lee historial + versión de MongoDB (solo en miss)."""
+        db = get_database()
+        if db is None:
+            return None
+        # total: el resumen cuenta mensajes desde el inicio de la charla,
+        # con el mismo criterio que formatear_historial (solo con texto)
+        todos = {"$ifNull": ["$mensajes", {"$ifNull": ["$messages", []]}]}
+        con_texto = {
+            "$filter": {
+                "input": todos,
+                "as": "m",
+                "cond": {
+                    "$or": [{
+                        "$ne": [{
+                            "$ifNull": ["$$m.texto", ""]
+                        }, ""]
+                    }, {
+                        "$ne": [{
+                            "$ifNull": ["$$m.text", ""]
+                        }, ""]
+                    }]
+                }
+            }
+        }
+        docs = list(db["chat_history"].aggregate([{
+            "$match": {
+                "sessionId": phone
+            }
+        }, {
+            "$project": {
+                "_id": 0,
+                "version": 1,
+                "mensajes": {
+                    "$slice": [todos, -self._max_messages]
+                },
+                "total": {
+                    "$size": con_texto
+                }
+            }
+        }]))
+        doc = docs[0] if docs else {}
+        return {
+            "history": formatear_historial(doc.get("mensajes") or []),
+            "total": doc.get("total", 0),
+            "version": doc.get("version", 0),
+            "lead": None,
+            "lead_version": 0,
+            # Última comparación de versión con MongoDB (monotonic)
+            "verificado": time.monotonic(),
+            "lead_verificado": 0.0,
+            "ultimo_uso": time.time()
+        }
+
+    def _version(self, coleccion: str, filtro: dict) -> Optional[int]:
+        """Versión actual de un documento (None si no se pudo leer)."""
+        try:
+            db = get_database()
+            if db is None:
+                return None
+            doc = db[coleccion].find_one(filtro, {"version": 1, "_id": 0})
+        except PyMongoError as e:
+            logger.error(f"[SESSION] Error leyendo versión: {e}")
+            return None
+        return (doc or {}).get("version", 0)
+
+    def _toca_verificar(self, sesion: dict, campo: str) -> bool:
+        """True si pasó el intervalo desde la última lectura de versión."""
+        ahora = time.monotonic()
+        with self._lock:
+            if ahora - sesion[campo] < self._version_check_seconds:
+                return False
+            sesion[campo] = ahora
+            return True
+
+    def _sesion(self, phone: str) -> tuple:
+        """(sesion, hit); sesion es None si MongoDB no está disponible."""
+        with self._lock:
+            self._evictar()
+            sesion = self._sessions.get(phone)
+            if sesion is not None:
+                sesion["ultimo_uso"] = time.time()
+                self._sessions.move_to_end(phone)
+                self._stats["hits"] += 1
+                return sesion, True
+
+        self._stats["misses"] += 1
+        try:
+            sesion = self._cargar(phone)
+        except PyMongoError as e:
+            logger.error(f"[SESSION] Error cargando sesión: {e}")
+            return None, False
+        if sesion is None:
+            return None, False
+
+        with self._lock:
+            # Lead e historial se piden en paralelo: quedarse con la
+            # primera sesión cargada para no perder datos de la otra
+            sesion = self._sessions.setdefault(phone, sesion)
+            self._sessions.move_to_end(phone)
+            self._evictar()
+        return sesion, False
+
+    # ─────────────────────────────────────────────────────────────
+    # API
+    # ─────────────────────────────────────────────────────────────
+    def get_history(self, phone: str, limit: int = 20) -> list:
+        """Historial reciente en formato OpenAI (copia)."""
+        sesion, hit = self._sesion(phone)
+        if sesion is None:
+            return []
+
+        if hit and self._toca_verificar(sesion, "verificado"):
+            version = self._version("chat_history", {"sessionId": phone})
+            if version is not None and version != sesion["version"]:
+                # Otro worker escribió: recargar el historial
+                try:
+                    nueva = self._cargar(phone)
+                except PyMongoError as e:
+                    logger.error(f"[SESSION] Error recargando historial: {e}")
+                    nueva = None
+                if nueva is not None:
+                    self._stats["recargas"] += 1
+                    with self._lock:
+                        sesion["history"] = nueva["history"]
+                        sesion["total"] = nueva["total"]
+                        sesion["version"] = nueva["version"]
+        return list(sesion["history"][-limit:])
+
+    def total_mensajes(self, phone: str) -> Optional[int]:
+        """Mensajes de la conversación completa (None si no está en cache)."""
+        with self._lock:
+            sesion = self._sessions.get(phone)
+            return sesion["total"] if sesion else None
+
+    def get_lead(self, phone: str) -> Optional[dict]:
+        """Campos calientes del lead (None si no existe)."""
+        sesion, _ = self._sesion(phone)
+        if sesion is None:
+            return find_lead_by_phone(phone)
+
+        if (sesion["lead"] is not None
+                and self._toca_verificar(sesion, "lead_verificado")):
+            version = self._version("leads_fortia", {
+                "$or": [{
+                    "telefono_whatsapp": phone
+                }, {
+                    "phone_whatsapp": phone
+                }]
+            })
+            if version is not None and version != sesion["lead_version"]:
+                # Lo escribió alguien que no pasa por el cache
+                self._stats["recargas"] += 1
+                sesion["lead"] = None
+
+        if sesion["lead"] is None:
+            lead = find_lead_by_phone(phone)
+            if not lead:
+                return None
+            sesion["lead"] = {
+                CAMPO_ESPANOL.get(campo, campo): get_lead_field(lead, campo)
+                for campo in HOT_LEAD_FIELDS
+            }
+            sesion["lead_version"] = lead.get("version", 0)
+            sesion["lead_verificado"] = time.monotonic()
+        return dict(sesion["lead"])
+
+    def update_lead(self, phone: str, datos: dict):
+        """
+        Actualiza los campos calientes tras un save_lead exitoso.
+        save_lead incrementa la versión del lead, así que la próxima
+        verificación de versión igual lo relee de MongoDB.
+        """
+        with self._lock:
+            sesion = self._sessions.get(phone)
+            if sesion is None or sesion["lead"] is None:
+                return
+            for campo in HOT_LEAD_FIELDS:
+                campo_es = CAMPO_ESPANOL.get(campo, campo)
+                valor = datos.get(campo) or datos.get(campo_es)
+                if valor:
+                    sesion["lead"][campo_es] = valor
+
+    def append_message(self, phone: str, msg_type: str, text: str) -> bool:
+        """
+        Write-through de un mensaje (msg_type: "human" | "ai").
+        Escribe condicionado a la versión cacheada; si no matchea,
+        invalida la sesión y escribe sin condición.
+        """
+        with self._lock:
+            sesion = self._sessions.get(phone)
+            version = sesion["version"] if sesion else None
+
+        if sesion is None:
+            return save_chat_message(phone, msg_type, text)
+
+        try:
+            db = get_database()
+            if db is None:
+                return False
+            now = datetime.now(timezone.utc)
+            result = db["chat_history"].update_one(
+                {
+                    "sessionId": phone,
+                    # Documentos viejos no tienen version
+                    "version": version if version else None
+                }, {
+                    "$push": {
+                        "mensajes": {
+                            "tipo": msg_type,
+                            "texto": text,
+                            "timestamp": now
+                        }
+                    },
+                    "$inc": {
+                        "version": 1
+                    },
+                    "$set": {
+                        "actualizado_en": now
+                    }
+                })
+        except PyMongoError as e:
+            logger.error(f"[SESSION] Error guardando mensaje: {e}")
+            self.invalidate(phone)
+            return False
+
+        if result.matched_count == 0:
+            # Otro worker escribió (o la sesión todavía no existe)
+            if version:
+                self._stats["conflictos_version"] += 1
+                logger.info(f"[SESSION] Versión desactualizada para {phone}, "
+                            f"invalidando")
+            self.invalidate(phone)
+            return save_chat_message(phone, msg_type, text)
+
+        with self._lock:
+            sesion["version"] = version + 1
+            sesion["verificado"] = time.monotonic()
+            if text:
+                sesion["total"] += 1
+                role = "user" if msg_type == "human" else "assistant"
+                sesion["history"].append({"role": role, "content": text})
+                del sesion["history"][:-self._max_messages]
+        return True
+
+    def invalidar_lead(self, phone: str):
+        """
+        Descarta el lead cacheado tras escribirlo por fuera de update_lead
+        (email de Cal.com, reserva, resumen): el próximo get_lead lo relee.
+        """
+        with self._lock:
+            sesion = self._sessions.get(phone)
+            if sesion is not None:
+                sesion["lead"] = None
+
+    def invalidate(self, phone: str):
+        with self._lock:
+            self._sessions.pop(phone, None)
+
+    def stats(self) -> dict:
+        total = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats, "sesiones":
+            len(self._sessions),
+            "hit_rate":
+            round(self._stats["hits"] / total, 3) if total else 0.0
+        }
+
+
+session_cache = SessionCache()
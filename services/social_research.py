@@ -23,11 +23,32 @@ from urllib.parse import quote
 
 from config import (TAVILY_API_KEY, GOOGLE_API_KEY, GOOGLE_SEARCH_CX,
                     APIFY_API_TOKEN)
+from services.hedged_search import primer_resultado_bueno
+from services.tavily_search import tavily
+from services.google_search import google_cse
+from services.apify_runs import apify_runs
+from services import news_dedup
 
 logger = logging.getLogger(__name__)
 
 HTTP_TIMEOUT = 30.0
-APIFY_TIMEOUT = 45.0
+APIFY_ACTOR = "apify~website-content-crawler"
+# Espera de la investigación; la corrida de Apify puede seguir después
+APIFY_ESPERA_SECONDS = 30.0
+APIFY_TARDIAS_INTENTOS = 12
+APIFY_TARDIAS_ESPERA_SECONDS = 10
+# noticias_empresa sin noticias reales (se puede pisar con tardías)
+SIN_NOTICIAS = [None, "", "No encontrado", "No se encontraron noticias"]
+# Guardados de noticias tardías en curso (referencia fuerte: el event
+# loop solo guarda referencias débiles a las tareas)
+_tareas_tardias = set()
+# Caracteres del texto de la página que hacen de snippet (dedup)
+APIFY_SNIPPET_CHARS = 300
+
+# Hedging: cortar la búsqueda paralela apenas un proveedor devuelve
+# algo con esta calidad (peso LinkedIn / cantidad de noticias)
+LINKEDIN_HEDGE_PESO_MIN = 90
+NOTICIAS_HEDGE_MIN = 3
 
 # ═══════════════════════════════════════════════════════════════════
 # DOMINIOS A EXCLUIR DE RESULTADOS DE NOTICIAS
@@ -1451,6 +1472,310 @@ def es_registro_legal(url: str, texto: str) -> bool:
     return False
 
 
+# Subdominios de LinkedIn → país (cubre todos los países donde LinkedIn
+# tiene subdominio local)
+SUBDOMINIO_A_PAIS = {
+    # América Latina
+    'ar': 'argentina',
+    'bo': 'bolivia',
+    'br': 'brasil',
+    'cl': 'chile',
+    'co': 'colombia',
+    'cr': 'costa rica',
+    'cu': 'cuba',
+    'do': 'dominicana',
+    'ec': 'ecuador',
+    'sv': 'el salvador',
+    'gt': 'guatemala',
+    'hn': 'honduras',
+    'mx': 'mexico',
+    'ni': 'nicaragua',
+    'pa': 'panama',
+    'py': 'paraguay',
+    'pe': 'peru',
+    'pr': 'puerto rico',
+    'uy': 'uruguay',
+    've': 'venezuela',
+    # América del Norte
+    'us': 'estados unidos',
+    'ca': 'canada',
+    # Europa Occidental
+    'es': 'españa',
+    'pt': 'portugal',
+    'fr': 'francia',
+    'it': 'italia',
+    'de': 'alemania',
+    'at': 'austria',
+    'ch': 'suiza',
+    'be': 'belgica',
+    'nl': 'holanda',
+    'lu': 'luxemburgo',
+    'uk': 'reino unido',
+    'ie': 'irlanda',
+    'dk': 'dinamarca',
+    'se': 'suecia',
+    'no': 'noruega',
+    'fi': 'finlandia',
+    'is': 'islandia',
+    # Europa del Sur
+    'gr': 'grecia',
+    'mt': 'malta',
+    'cy': 'chipre',
+    # Europa del Este
+    'pl': 'polonia',
+    'cz': 'republica checa',
+    'sk': 'eslovaquia',
+    'hu': 'hungria',
+    'ro': 'rumania',
+    'bg': 'bulgaria',
+    'hr': 'croacia',
+    'si': 'eslovenia',
+    'rs': 'serbia',
+    'ba': 'bosnia',
+    'me': 'montenegro',
+    'mk': 'macedonia',
+    'al': 'albania',
+    'xk': 'kosovo',
+    'ua': 'ucrania',
+    'by': 'bielorrusia',
+    'md': 'moldavia',
+    'ee': 'estonia',
+    'lv': 'letonia',
+    'lt': 'lituania',
+    'ru': 'rusia',
+    # Asia
+    'cn': 'china',
+    'jp': 'japon',
+    'kr': 'corea del sur',
+    'kp': 'corea del norte',
+    'tw': 'taiwan',
+    'hk': 'hong kong',
+    'mo': 'macao',
+    'mn': 'mongolia',
+    'in': 'india',
+    'pk': 'pakistan',
+    'bd': 'bangladesh',
+    'lk': 'sri lanka',
+    'np': 'nepal',
+    'bt': 'butan',
+    'mm': 'myanmar',
+    'th': 'tailandia',
+    'vn': 'vietnam',
+    'kh': 'camboya',
+    'la': 'laos',
+    'my': 'malasia',
+    'sg': 'singapur',
+    'id': 'indonesia',
+    'ph': 'filipinas',
+    'bn': 'brunei',
+    'tl': 'timor oriental',
+    # Asia Central y Medio Oriente
+    'kz': 'kazajstan',
+    'uz': 'uzbekistan',
+    'tm': 'turkmenistan',
+    'kg': 'kirguistan',
+    'tj': 'tayikistan',
+    'af': 'afganistan',
+    'ir': 'iran',
+    'iq': 'irak',
+    'sa': 'arabia saudita',
+    'ae': 'emiratos arabes',
+    'qa': 'qatar',
+    'kw': 'kuwait',
+    'bh': 'bahrein',
+    'om': 'oman',
+    'ye': 'yemen',
+    'jo': 'jordania',
+    'lb': 'libano',
+    'sy': 'siria',
+    'il': 'israel',
+    'ps': 'palestina',
+    'tr': 'turquia',
+    'ge': 'georgia',
+    'am': 'armenia',
+    'az': 'azerbaiyan',
+    # África
+    'za': 'sudafrica',
+    'eg': 'egipto',
+    'ma': 'marruecos',
+    'dz': 'argelia',
+    'tn': 'tunez',
+    'ly': 'libia',
+    'ng': 'nigeria',
+    'gh': 'ghana',
+    'ke': 'kenia',
+    'tz': 'tanzania',
+    'ug': 'uganda',
+    'rw': 'ruanda',
+    'et': 'etiopia',
+    'sd': 'sudan',
+    'ao': 'angola',
+    'mz': 'mozambique',
+    'zw': 'zimbabwe',
+    'bw': 'botsuana',
+    'na': 'namibia',
+    'zm': 'zambia',
+    'mw': 'malawi',
+    'mg': 'madagascar',
+    'mu': 'mauricio',
+    'sn': 'senegal',
+    'ci': 'costa de marfil',
+    'cm': 'camerun',
+    'cd': 'congo',
+    'cg': 'congo brazzaville',
+    'ga': 'gabon',
+    # Oceanía
+    'au': 'australia',
+    'nz': 'nueva zelanda',
+    'fj': 'fiyi',
+    'pg': 'papua nueva guinea',
+    # Caribe
+    'jm': 'jamaica',
+    'tt': 'trinidad y tobago',
+    'bb': 'barbados',
+    'bs': 'bahamas',
+    'ht': 'haiti',
+    'gy': 'guyana',
+    'sr': 'surinam',
+    'bz': 'belice',
+}
+
+RE_SUBDOMINIO_LINKEDIN = re.compile(r'https?://([a-z]{2})\.linkedin\.com')
+
+
+def _matcher_ubicacion(ubicacion: str):
+    """
+    Regex con todas las variantes de la ubicación (equivale a
+    ubicacion_en_texto, que busca cada variante como substring).
+    """
+    if not ubicacion:
+        return None
+    variantes = obtener_variantes_ubicacion(ubicacion)
+    return re.compile("|".join(re.escape(v) for v in variantes))
+
+
+class EvaluadorLinkedin:
+    """
+    Peso de perfiles de LinkedIn para una persona/empresa/ubicación.
+
+    Se arma una vez por búsqueda: nombre, apellido y empresa en
+    minúsculas, variantes de ubicación ya compiladas y variantes del
+    país para la penalización por subdominio. peso() da exactamente lo
+    mismo que calcular_peso_linkedin con los mismos datos.
+    """
+
+    def __init__(self,
+                 primer_nombre: str,
+                 apellido: str,
+                 empresa: str = "",
+                 provincia: str = "",
+                 ciudad: str = "",
+                 pais: str = ""):
+        self.primer = primer_nombre.lower().strip()
+        self.apellido = apellido.lower().strip()
+        self.empresa = empresa.lower().strip() if empresa else ""
+        self.palabras_empresa = [
+            p for p in self.empresa.split() if len(p) > 2
+        ]
+        self.re_provincia = _matcher_ubicacion(provincia)
+        self.re_ciudad = _matcher_ubicacion(ciudad)
+        self.re_pais = _matcher_ubicacion(pais)
+
+        # Como antes: un país dado (aunque quede vacío al limpiarlo)
+        # habilita la penalización por subdominio
+        self.tiene_pais = bool(pais)
+        self.pais = pais.lower().strip() if pais else ""
+        self.variantes_pais = [self.pais]
+        if self.pais == 'argentina':
+            self.variantes_pais.extend(['ar', 'arg'])
+        elif self.pais == 'brasil' or self.pais == 'brazil':
+            self.variantes_pais.extend(['br', 'bra', 'brasil', 'brazil'])
+        elif self.pais == 'mexico' or self.pais == 'méxico':
+            self.variantes_pais.extend(['mx', 'mex', 'mexico', 'méxico'])
+        elif self.pais == 'españa' or self.pais == 'espana':
+            self.variantes_pais.extend(['es', 'esp', 'españa', 'espana'])
+
+    def peso(self, url: str, texto: str) -> int:
+        return self._peso(url.lower(), texto.lower())
+
+    def pesos(self, candidatos: list) -> list:
+        """
+        Peso de cada (url, texto), en el mismo orden. Cada texto
+        distinto se pasa a minúsculas una sola vez (en la web del
+        cliente todos los slugs comparten el HTML de varias páginas).
+        """
+        textos = {}
+        resultado = []
+        for url, texto in candidatos:
+            if texto not in textos:
+                textos[texto] = texto.lower()
+            resultado.append(self._peso(url.lower(), textos[texto]))
+        return resultado
+
+    def _peso(self, url_lower: str, texto_lower: str) -> int:
+
+        # ═══════════════════════════════════════════════════════════════
+        # Nombre (40) y apellido (40) SOLO en el slug de la URL
+        # ═══════════════════════════════════════════════════════════════
+        slug = ""
+        if "/in/" in url_lower:
+            slug = url_lower.split("/in/")[1].split("/")[0].split("?")[0]
+        slug_clean = slug.replace("-", " ").replace("_", " ")
+
+        tiene_nombre = len(self.primer) > 1 and self.primer in slug_clean
+        tiene_apellido = (len(self.apellido) > 1
+                          and self.apellido in slug_clean)
+
+        # Sin AMBOS en el slug, descartar (evita jose-filippini o
+        # samuel-rodriguez cuando buscamos rafael-driuzzi)
+        if not (tiene_nombre and tiene_apellido):
+            return 0
+        peso = 80
+
+        # ═══════════════════════════════════════════════════════════════
+        # BONUS: Empresa en TEXTO (no slug) - 10 puntos máximo
+        # ═══════════════════════════════════════════════════════════════
+        if len(self.empresa) > 2:
+            if self.empresa in texto_lower:
+                peso += 10
+            elif any(p in texto_lower for p in self.palabras_empresa):
+                peso += 5
+
+        # ═══════════════════════════════════════════════════════════════
+        # BONUS: Ubicación en TEXTO (no slug) - 10 puntos máximo
+        # ═══════════════════════════════════════════════════════════════
+        puntos_ubicacion = 0
+        if texto_lower:
+            if self.re_provincia and self.re_provincia.search(texto_lower):
+                puntos_ubicacion += 5
+            if self.re_ciudad and self.re_ciudad.search(texto_lower):
+                puntos_ubicacion += 5
+            if (self.re_pais and puntos_ubicacion == 0
+                    and self.re_pais.search(texto_lower)):
+                puntos_ubicacion += 3
+        peso += min(puntos_ubicacion, 10)
+
+        # ═══════════════════════════════════════════════════════════════
+        # PENALIZACIÓN: LinkedIn de país diferente al del lead
+        # Subdominios como py.linkedin.com, pe.linkedin.com indican que
+        # el perfil está registrado en otro país
+        # ═══════════════════════════════════════════════════════════════
+        match_subdominio = RE_SUBDOMINIO_LINKEDIN.match(url_lower)
+        if match_subdominio and self.tiene_pais:
+            subdominio = match_subdominio.group(1)
+            pais_del_subdominio = SUBDOMINIO_A_PAIS.get(subdominio, '')
+            if (pais_del_subdominio
+                    and pais_del_subdominio not in self.variantes_pais):
+                # Penalización fuerte: -30 puntos
+                peso -= 30
+                logger.debug(
+                    f"[LINKEDIN] Penalización -30 por país diferente: "
+                    f"subdominio={subdominio} "
+                    f"({pais_del_subdominio}), lead={self.pais}")
+
+        return peso
+
+
 def calcular_peso_linkedin(url: str,
                            texto: str,
                            primer_nombre: str,
@@ -1473,293 +1798,75 @@ def calcular_peso_linkedin(url: str,
     - Empresa en texto: 10 puntos
     - Ubicación en texto: 10 puntos
     """
-    url_lower = url.lower()
-    texto_lower = texto.lower()
-
-    # ═══════════════════════════════════════════════════════════════════
-    # EXTRAER SLUG DE LA URL - ESTO ES LO ÚNICO QUE IMPORTA
-    # ═══════════════════════════════════════════════════════════════════
-    slug = ""
-    if "/in/" in url_lower:
-        slug = url_lower.split("/in/")[1].split("/")[0].split("?")[0]
-    slug_clean = slug.replace("-", " ").replace("_", " ")
+    return EvaluadorLinkedin(primer_nombre, apellido, empresa, provincia,
+                             ciudad, pais).peso(url, texto)
 
-    # ═══════════════════════════════════════════════════════════════════
-    # CRÍTICO: Validar nombre y apellido SOLO en el SLUG
-    # NO usar texto del snippet - solo la URL
-    # ═══════════════════════════════════════════════════════════════════
-    primer_lower = primer_nombre.lower().strip()
-    apellido_lower = apellido.lower().strip()
-    empresa_lower = empresa.lower().strip() if empresa else ""
 
-    peso = 0
-    tiene_nombre = False
-    tiene_apellido = False
-
-    # ═══════════════════════════════════════════════════════════════════
-    # VERIFICACIÓN DE NOMBRE EN SLUG (40 puntos)
-    # ═══════════════════════════════════════════════════════════════════
-    if primer_lower and len(primer_lower) > 1:
-        if primer_lower in slug_clean:
-            peso += 40
-            tiene_nombre = True
-
-    # ═══════════════════════════════════════════════════════════════════
-    # VERIFICACIÓN DE APELLIDO EN SLUG (40 puntos)
-    # ═══════════════════════════════════════════════════════════════════
-    if apellido_lower and len(apellido_lower) > 1:
-        if apellido_lower in slug_clean:
-            peso += 40
-            tiene_apellido = True
-
-    # ═══════════════════════════════════════════════════════════════════
-    # CRÍTICO: Si no tiene AMBOS en el SLUG, DESCARTAR
-    # Esto evita falsos positivos como jose-filippini o samuel-rodriguez
-    # cuando buscamos rafael-driuzzi
-    # ═══════════════════════════════════════════════════════════════════
-    if not (tiene_nombre and tiene_apellido):
-        return 0
+async def buscar_noticias_empresa(empresa: str,
+                                  empresa_busqueda: str,
+                                  ubicacion_query: str,
+                                  phone: str = "") -> dict:
+    """
+    Noticias de la empresa: Google + Apify en paralelo (corta en el
+    primer resultado bueno) más el historial de la empresa.
+    phone: lead al que se guardan las noticias que lleguen tarde.
 
-    # ═══════════════════════════════════════════════════════════════════
-    # BONUS: Empresa en TEXTO (no slug) - 10 puntos máximo
-    # ═══════════════════════════════════════════════════════════════════
-    if empresa_lower and len(empresa_lower) > 2:
-        palabras_empresa = [p for p in empresa_lower.split() if len(p) > 2]
-        if empresa_lower in texto_lower:
-            peso += 10
-        elif any(p in texto_lower for p in palabras_empresa):
-            peso += 5
+    Returns:
+        {"noticias": [...], "source": str}
+    """
+    noticias = []
+    fuentes = {}
 
-    # ═══════════════════════════════════════════════════════════════════
-    # BONUS: Ubicación en TEXTO (no slug) - 10 puntos máximo
-    # ═══════════════════════════════════════════════════════════════════
-    puntos_ubicacion = 0
+    # Empresa ya buscada: solo lo publicado desde entonces
+    previas = await news_dedup.historial(empresa_busqueda, ubicacion_query)
+    desde_dias = previas["desde_dias"]
 
-    if provincia and ubicacion_en_texto(provincia, texto_lower):
-        puntos_ubicacion += 5
+    # Con la cuota de Google baja, Apify cubre solo
+    if (GOOGLE_API_KEY and GOOGLE_SEARCH_CX
+            and (google_cse.disponible() or not APIFY_API_TOKEN)):
+        fuentes["google"] = google_buscar_noticias(empresa,
+                                                   empresa_busqueda,
+                                                   ubicacion_query,
+                                                   desde_dias=desde_dias)
 
-    if ciudad and ubicacion_en_texto(ciudad, texto_lower):
-        puntos_ubicacion += 5
+    if APIFY_API_TOKEN:
+        # Si vence, la corrida sigue y guarda tarde en el lead
+        fuentes["apify"] = apify_buscar_noticias(
+            empresa_busqueda,
+            ubicacion_query,
+            timeout=APIFY_ESPERA_SECONDS,
+            phone=phone,
+            desde_dias=desde_dias)
 
-    if pais and puntos_ubicacion == 0:
-        if ubicacion_en_texto(pais, texto_lower):
-            puntos_ubicacion += 3
+    source_used = "ninguno"
 
-    peso += min(puntos_ubicacion, 10)
+    if fuentes:
+        logger.info(
+            "[NOTICIAS] Ejecutando búsquedas en paralelo: "
+            "Google + Apify (corta en el primer resultado bueno)")
+        hedge = await primer_resultado_bueno(
+            fuentes,
+            lambda source, result: len(result or []) >= NOTICIAS_HEDGE_MIN,
+            call_site="noticias")
+
+        # El ganador, o el primero con algo en orden de preferencia
+        orden = [hedge["ganador"]] if hedge["ganador"] else list(fuentes)
+        for source in orden:
+            result = hedge["resultados"].get(source)
+            if result and not noticias:
+                noticias = result
+                source_used = source
+                logger.info(f"[NOTICIAS-{source.upper()}] "
+                            f"✓ {len(noticias)} noticias")
 
-    # ═══════════════════════════════════════════════════════════════════
-    # PENALIZACIÓN: LinkedIn de país diferente al del lead
-    # Subdominios como py.linkedin.com, pe.linkedin.com, mx.linkedin.com
-    # indican que el perfil está registrado en otro país
-    # ═══════════════════════════════════════════════════════════════════
-    # Diccionario COMPLETO de subdominios LinkedIn → país
-    # Cubre todos los países donde LinkedIn tiene subdominio local
-    SUBDOMINIO_A_PAIS = {
-        # América Latina
-        'ar': 'argentina',
-        'bo': 'bolivia',
-        'br': 'brasil',
-        'cl': 'chile',
-        'co': 'colombia',
-        'cr': 'costa rica',
-        'cu': 'cuba',
-        'do': 'dominicana',
-        'ec': 'ecuador',
-        'sv': 'el salvador',
-        'gt': 'guatemala',
-        'hn': 'honduras',
-        'mx': 'mexico',
-        'ni': 'nicaragua',
-        'pa': 'panama',
-        'py': 'paraguay',
-        'pe': 'peru',
-        'pr': 'puerto rico',
-        'uy': 'uruguay',
-        've': 'venezuela',
-        # América del Norte
-        'us': 'estados unidos',
-        'ca': 'canada',
-        # Europa Occidental
-        'es': 'españa',
-        'pt': 'portugal',
-        'fr': 'francia',
-        'it': 'italia',
-        'de': 'alemania',
-        'at': 'austria',
-        'ch': 'suiza',
-        'be': 'belgica',
-        'nl': 'holanda',
-        'lu': 'luxemburgo',
-        'uk': 'reino unido',
-        'ie': 'irlanda',
-        'dk': 'dinamarca',
-        'se': 'suecia',
-        'no': 'noruega',
-        'fi': 'finlandia',
-        'is': 'islandia',
-        # Europa del Sur
-        'gr': 'grecia',
-        'mt': 'malta',
-        'cy': 'chipre',
-        # Europa del Este
-        'pl': 'polonia',
-        'cz': 'republica checa',
-        'sk': 'eslovaquia',
-        'hu': 'hungria',
-        'ro': 'rumania',
-        'bg': 'bulgaria',
-        'hr': 'croacia',
-        'si': 'eslovenia',
-        'rs': 'serbia',
-        'ba': 'bosnia',
-        'me': 'montenegro',
-        'mk': 'macedonia',
-        'al': 'albania',
-        'xk': 'kosovo',
-        'ua': 'ucrania',
-        'by': 'bielorrusia',
-        'md': 'moldavia',
-        'ee': 'estonia',
-        'lv': 'letonia',
-        'lt': 'lituania',
-        'ru': 'rusia',
-        # Asia
-        'cn': 'china',
-        'jp': 'japon',
-        'kr': 'corea del sur',
-        'kp': 'corea del norte',
-        'tw': 'taiwan',
-        'hk': 'hong kong',
-        'mo': 'macao',
-        'mn': 'mongolia',
-        'in': 'india',
-        'pk': 'pakistan',
-        'bd': 'bangladesh',
-        'lk': 'sri lanka',
-        'np': 'nepal',
-        'bt': 'butan',
-        'mm': 'myanmar',
-        'th': 'tailandia',
-        'vn': 'vietnam',
-        'kh': 'camboya',
-        'la': 'laos',
-        'my': 'malasia',
-        'sg': 'singapur',
-        'id': 'indonesia',
-        'ph': 'filipinas',
-        'bn': 'brunei',
-        'tl': 'timor oriental',
-        # Asia Central y Medio Oriente
-        'kz': 'kazajstan',
-        'uz': 'uzbekistan',
-        'tm': 'turkmenistan',
-        'kg': 'kirguistan',
-        'tj': 'tayikistan',
-        'af': 'afganistan',
-        'ir': 'iran',
-        'iq': 'irak',
-        'sa': 'arabia saudita',
-        'ae': 'emiratos arabes',
-        'qa': 'qatar',
-        'kw': 'kuwait',
-        'bh': 'bahrein',
-        'om': 'oman',
-        'ye': 'yemen',
-        'jo': 'jordania',
-        'lb': 'libano',
-        'sy': 'siria',
-        'il': 'israel',
-        'ps': 'palestina',
-        'tr': 'turquia',
-        'ge': 'georgia',
-        'am': 'armenia',
-        'az': 'azerbaiyan',
-        # África
-        'za': 'sudafrica',
-        'eg': 'egipto',
-        'ma': 'marruecos',
-        'dz': 'argelia',
-        'tn': 'tunez',
-        'ly': 'libia',
-        'ng': 'nigeria',
-        'gh': 'ghana',
-        'ke': 'kenia',
-        'tz': 'tanzania',
-        'ug': 'uganda',
-        'rw': 'ruanda',
-        'et': 'etiopia',
-        'sd': 'sudan',
-        'ao': 'angola',
-        'mz': 'mozambique',
-        'zw': 'zimbabwe',
-        'bw': 'botsuana',
-        'na': 'namibia',
-        'zm': 'zambia',
-        'mw': 'malawi',
-        'mg': 'madagascar',
-        'mu': 'mauricio',
-        'sn': 'senegal',
-        'ci': 'costa de marfil',
-        'cm': 'camerun',
-        'cd': 'congo',
-        'cg': 'congo brazzaville',
-        'ga': 'gabon',
-        # Oceanía
-        'au': 'australia',
-        'nz': 'nueva zelanda',
-        'fj': 'fiyi',
-        'pg': 'papua nueva guinea',
-        # Caribe
-        'jm': 'jamaica',
-        'tt': 'trinidad y tobago',
-        'bb': 'barbados',
-        'bs': 'bahamas',
-        'ht': 'haiti',
-        'gy': 'guyana',
-        'sr': 'surinam',
-        'bz': 'belice',
-    }
-    
-    # Detectar subdominio del LinkedIn
-    subdominio_linkedin = None
-    url_lower = url.lower()
-    match_subdominio = re.match(
-        r'https?://([a-z]{2})\.linkedin\.com', 
-        url_lower
-    )
-    if match_subdominio:
-        subdominio_linkedin = match_subdominio.group(1)
-    
-    # Si el perfil tiene subdominio de otro país, penalizar
-    if subdominio_linkedin and pais:
-        pais_lower = pais.lower().strip()
-        pais_del_subdominio = SUBDOMINIO_A_PAIS.get(
-            subdominio_linkedin, ''
-        )
-        
-        # Verificar si el país del subdominio NO coincide con el país del lead
-        if pais_del_subdominio and pais_del_subdominio != pais_lower:
-            # Verificar también variantes del país
-            variantes_pais = [pais_lower]
-            if pais_lower == 'argentina':
-                variantes_pais.extend(['ar', 'arg'])
-            elif pais_lower == 'brasil' or pais_lower == 'brazil':
-                variantes_pais.extend(['br', 'bra', 'brasil', 'brazil'])
-            elif pais_lower == 'mexico' or pais_lower == 'méxico':
-                variantes_pais.extend(['mx', 'mex', 'mexico', 'méxico'])
-            elif pais_lower == 'españa' or pais_lower == 'espana':
-                variantes_pais.extend(['es', 'esp', 'españa', 'espana'])
-            
-            if pais_del_subdominio not in variantes_pais:
-                # Penalización fuerte: -30 puntos
-                peso -= 30
-                logger.debug(
-                    f"[LINKEDIN] Penalización -30 por país diferente: "
-                    f"subdominio={subdominio_linkedin} "
-                    f"({pais_del_subdominio}), lead={pais_lower}"
-                )
+    # Nuevas + ya vistas (sin casi-duplicados entre fuentes)
+    if noticias or previas["noticias"]:
+        if not noticias:
+            source_used = "historial"
+        noticias = await news_dedup.combinar_y_guardar(
+            empresa_busqueda, ubicacion_query, noticias, previas["noticias"])
 
-    return peso
+    return {"noticias": noticias, "source": source_used}
 
 
 async def research_person_and_company(nombre_persona: str,
@@ -1771,9 +1878,14 @@ async def research_person_and_company(nombre_persona: str,
                                       city: str = "",
                                       province: str = "",
                                       country: str = "",
-                                      email_contacto: str = "") -> dict:
+                                      email_contacto: str = "",
+                                      phone: str = "",
+                                      incluir_noticias: bool = True) -> dict:
     """
     Función principal que replica el workflow completo de n8n.
+    phone: lead al que se guardan las noticias que lleguen tarde.
+    incluir_noticias: False si las noticias se buscan por separado
+    (buscar_noticias_empresa, etapa "noticias" de la investigación).
     LinkedIn empresa: SOLO desde web del cliente.
     LinkedIn personal: 2 fases de búsqueda.
     """
@@ -1889,6 +2001,8 @@ async def research_person_and_company(nombre_persona: str,
             candidatos = []
             primer_nombre_b = results["primer_nombre"]
             apellido_b = results["apellido"]
+            evaluador = EvaluadorLinkedin(primer_nombre_b, apellido_b,
+                                          empresa_busqueda, province, city)
             
             # 3A: BUSCAR EN WEB DEL CLIENTE
             if tiene_website:
@@ -1918,18 +2032,14 @@ async def research_person_and_company(nombre_persona: str,
                                    r'linkedin\.com/in/([a-zA-Z0-9_~-]+)')
                         matches = re.findall(
                             pattern, contenido_web, re.IGNORECASE)
-                        for slug in matches:
-                            if slug.lower() in ['company', 'jobs', 'pulse']:
-                                continue
-                            url = f"https://linkedin.com/in/{slug}"
-                            peso = calcular_peso_linkedin(
-                                url=url,
-                                texto=contenido_web,
-                                primer_nombre=primer_nombre_b,
-                                apellido=apellido_b,
-                                empresa=empresa_busqueda,
-                                provincia=province,
-                                ciudad=city)
+                        urls = [
+                            f"https://linkedin.com/in/{slug}"
+                            for slug in matches if slug.lower() not in
+                            ['company', 'jobs', 'pulse']
+                        ]
+                        pesos = evaluador.pesos(
+                            [(url, contenido_web) for url in urls])
+                        for url, peso in zip(urls, pesos):
                             if peso >= 60:
                                 ya_existe = any(
                                     c["url"] == url for c in candidatos)
@@ -1951,14 +2061,7 @@ async def research_person_and_company(nombre_persona: str,
                 linkedin_email = await buscar_linkedin_por_email(
                     email_contacto)
                 if linkedin_email:
-                    peso = calcular_peso_linkedin(
-                        url=linkedin_email,
-                        texto=email_contacto,
-                        primer_nombre=primer_nombre_b,
-                        apellido=apellido_b,
-                        empresa=empresa_busqueda,
-                        provincia=province,
-                        ciudad=city)
+                    peso = evaluador.peso(linkedin_email, email_contacto)
                     if peso >= 60:
                         ya_existe = any(
                             c["url"] == linkedin_email for c in candidatos)
@@ -1975,38 +2078,48 @@ async def research_person_and_company(nombre_persona: str,
             # 3C-3D: BUSCAR CON TAVILY + GOOGLE (ya paralelizado)
             linkedin_tavily_result = None
             linkedin_google_result = None
-            tasks = []
             
+            fuentes = {}
             if TAVILY_API_KEY:
-                tasks.append(("tavily", tavily_buscar_linkedin_personal(
+                fuentes["tavily"] = tavily_buscar_linkedin_personal(
                     results["nombre"], empresa_busqueda, primer_nombre_b,
                     apellido_b, ubicacion_completa, city, province, 
-                    country)))
+                    country)
             
-            if GOOGLE_API_KEY and GOOGLE_SEARCH_CX:
-                tasks.append(("google", google_buscar_linkedin_personal(
+            # Con la cuota de Google baja, Tavily cubre solo
+            if (GOOGLE_API_KEY and GOOGLE_SEARCH_CX
+                    and (google_cse.disponible() or not TAVILY_API_KEY)):
+                fuentes["google"] = google_buscar_linkedin_personal(
                     results["nombre"], empresa_busqueda, primer_nombre_b,
                     apellido_b, 0, ubicacion_completa, city, province,
-                    country)))
+                    country)
+
+            def _peso_url(url):
+                return evaluador.peso(
+                    url, f"{results['nombre']} {empresa_busqueda}")
+
+            def _linkedin_bueno(source, result):
+                """Algún candidato ya alcanza LINKEDIN_HEDGE_PESO_MIN."""
+                if not result:
+                    return False
+                urls = [
+                    u.strip() for u in result.get("url", "").split(" | ")
+                    if u.strip() and u.strip() != "No encontrado"
+                ]
+                if source == "google" and result.get("confianza", 0):
+                    return (bool(urls) and result["confianza"] >=
+                            LINKEDIN_HEDGE_PESO_MIN)
+                return any(
+                    _peso_url(u) >= LINKEDIN_HEDGE_PESO_MIN for u in urls)
             
-            if tasks:
+            if fuentes:
                 logger.info(
                     "[LINKEDIN] Ejecutando búsquedas en paralelo: "
-                    "Tavily + Google")
-                coroutines = [task[1] for task in tasks]
-                results_parallel = await asyncio.gather(
-                    *coroutines, return_exceptions=True)
-                
-                for i, (source, _) in enumerate(tasks):
-                    result = results_parallel[i]
-                    if isinstance(result, Exception):
-                        logger.error(
-                            f"[LINKEDIN-{source.upper()}] Error: {result}")
-                        continue
-                    if source == "tavily":
-                        linkedin_tavily_result = result
-                    elif source == "google":
-                        linkedin_google_result = result
+                    "Tavily + Google (corta en el primer resultado bueno)")
+                hedge = await primer_resultado_bueno(
+                    fuentes, _linkedin_bueno, call_site="linkedin")
+                linkedin_tavily_result = hedge["resultados"].get("tavily")
+                linkedin_google_result = hedge["resultados"].get("google")
                 
                 logger.info(
                     f"[LINKEDIN] Paralelización completada: "
@@ -2020,14 +2133,7 @@ async def research_person_and_company(nombre_persona: str,
                     url = url.strip()
                     if not url or url == "No encontrado":
                         continue
-                    peso = calcular_peso_linkedin(
-                        url=url,
-                        texto=f"{results['nombre']} {empresa_busqueda}",
-                        primer_nombre=primer_nombre_b,
-                        apellido=apellido_b,
-                        empresa=empresa_busqueda,
-                        provincia=province,
-                        ciudad=city)
+                    peso = _peso_url(url)
                     if peso >= 60:
                         ya_existe = any(c["url"] == url for c in candidatos)
                         if not ya_existe:
@@ -2051,14 +2157,7 @@ async def research_person_and_company(nombre_persona: str,
                         peso = linkedin_google_result.get("confianza", 0)
                         # Si no tiene confianza, calcular peso
                         if peso == 0:
-                            peso = calcular_peso_linkedin(
-                                url=url,
-                                texto=f"{results['nombre']} {empresa_busqueda}",
-                                primer_nombre=primer_nombre_b,
-                                apellido=apellido_b,
-                                empresa=empresa_busqueda,
-                                provincia=province,
-                                ciudad=city)
+                            peso = _peso_url(url)
                         ya_existe = any(c["url"] == url for c in candidatos)
                         if not ya_existe and peso >= 60:
                             candidatos.append({
@@ -2074,15 +2173,11 @@ async def research_person_and_company(nombre_persona: str,
                 logger.info(f"[LINKEDIN] PASO 3E: Buscando por cargo...")
                 por_cargo = await buscar_linkedin_por_cargo(
                     empresa=empresa_busqueda, ubicacion=ubicacion_completa)
-                for url in por_cargo:
-                    peso = calcular_peso_linkedin(
-                        url=url,
-                        texto=f"{empresa_busqueda} {ubicacion_completa}",
-                        primer_nombre=primer_nombre_b,
-                        apellido=apellido_b,
-                        empresa=empresa_busqueda,
-                        provincia=province,
-                        ciudad=city)
+                pesos = evaluador.pesos([
+                    (url, f"{empresa_busqueda} {ubicacion_completa}")
+                    for url in por_cargo
+                ])
+                for url, peso in zip(por_cargo, pesos):
                     if peso >= 60:
                         ya_existe = any(c["url"] == url for c in candidatos)
                         if not ya_existe:
@@ -2096,58 +2191,6 @@ async def research_person_and_company(nombre_persona: str,
             
             return candidatos
         
-        # ═══════════════════════════════════════════════════════════════
-        # FUNCIÓN AUXILIAR: Búsqueda de Noticias
-        # ═══════════════════════════════════════════════════════════════
-        async def _buscar_noticias():
-            """Encapsula toda la búsqueda de noticias."""
-            noticias = []
-            noticias_tasks = []
-            task_sources = []
-            
-            if GOOGLE_API_KEY and GOOGLE_SEARCH_CX:
-                noticias_tasks.append(google_buscar_noticias(
-                    empresa, empresa_busqueda, ubicacion_query))
-                task_sources.append("google")
-            
-            if APIFY_API_TOKEN:
-                async def apify_with_timeout():
-                    try:
-                        return await asyncio.wait_for(
-                            apify_buscar_noticias(
-                                empresa_busqueda, ubicacion_query),
-                            timeout=30.0)
-                    except asyncio.TimeoutError:
-                        logger.warning("[NOTICIAS-APIFY] Timeout")
-                        return []
-                
-                noticias_tasks.append(apify_with_timeout())
-                task_sources.append("apify")
-            
-            source_used = "ninguno"
-            
-            if noticias_tasks:
-                logger.info(
-                    "[NOTICIAS] Ejecutando búsquedas en paralelo: "
-                    "Google + Apify")
-                noticias_results = await asyncio.gather(
-                    *noticias_tasks, return_exceptions=True)
-                
-                for i, source in enumerate(task_sources):
-                    result = noticias_results[i]
-                    if isinstance(result, Exception):
-                        logger.error(
-                            f"[NOTICIAS-{source.upper()}] Error: {result}")
-                        continue
-                    if result and not noticias:
-                        noticias = result
-                        source_used = source
-                        logger.info(
-                            f"[NOTICIAS-{source.upper()}] "
-                            f"✓ {len(noticias)} noticias")
-            
-            return {"noticias": noticias, "source": source_used}
-
         # ═══════════════════════════════════════════════════════════════
         # PASO 3+5: LINKEDIN Y NOTICIAS EN PARALELO
         # ═══════════════════════════════════════════════════════════════
@@ -2155,14 +2198,15 @@ async def research_person_and_company(nombre_persona: str,
             "[RESEARCH] Ejecutando LinkedIn + Noticias en PARALELO...")
         
         # Ejecutar ambas búsquedas simultáneamente
-        linkedin_task = _buscar_linkedin_personal()
-        noticias_task = _buscar_noticias()
+        tareas = [_buscar_linkedin_personal()]
+        if incluir_noticias:
+            tareas.append(
+                buscar_noticias_empresa(empresa, empresa_busqueda,
+                                        ubicacion_query, phone=phone))
         
-        linkedin_result, noticias_result = await asyncio.gather(
-            linkedin_task,
-            noticias_task,
-            return_exceptions=True
-        )
+        resultados = await asyncio.gather(*tareas, return_exceptions=True)
+        linkedin_result = resultados[0]
+        noticias_result = resultados[1] if incluir_noticias else None
         
         # Procesar resultado de LinkedIn
         if isinstance(linkedin_result, Exception):
@@ -2209,22 +2253,7 @@ async def research_person_and_company(nombre_persona: str,
                 results["noticias_lista"] = noticias
                 results["noticias_count"] = len(noticias)
                 
-                noticias_texto = []
-                for n in noticias[:10]:
-                    titulo = n.get("titulo", "Sin título")
-                    url = n.get("url", "")
-                    try:
-                        dominio = url.split('/')[2].replace('www.', '')
-                        source_label = dominio.split('.')[0].upper()
-                    except:
-                        source_label = 'WEB'
-                    linea = f"• {titulo} [{source_label}]"
-                    if url:
-                        linea += f"\n  {url}"
-                    noticias_texto.append(linea)
-                
-                if noticias_texto:
-                    results["noticias_empresa"] = "\n\n".join(noticias_texto)
+                results["noticias_empresa"] = formatear_noticias(noticias)
         
         logger.info(
             f"[RESEARCH] Paralelización completada: "
@@ -2257,68 +2286,60 @@ async def tavily_verificar_nombre(website: str, primer_nombre: str,
         query = (f'site:{website} "{primer_nombre}" OR "{apellido}" '
                  f'equipo nosotros about contacto')
 
-        async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-            response = await client.post("https://api.tavily.com/search",
-                                         json={
-                                             "api_key": TAVILY_API_KEY,
-                                             "query": query,
-                                             "search_depth": "advanced",
-                                             "include_raw_content": True,
-                                             "max_results": 5
-                                         })
-
-            if response.status_code != 200:
-                return None
-
-            data = response.json()
-            results = data.get("results", [])
-
-            primer_lower = primer_nombre.lower()
-            apellido_lower = apellido.lower()
-
-            patrones = [
-                re.compile(
-                    rf'{primer_lower}\s+[a-záéíóúñ]+\s+{apellido_lower}',
-                    re.IGNORECASE),
-                re.compile(
-                    rf'(?:ing\.?|dr\.?|lic\.?|arq\.?|sr\.?|sra\.?|cpa\.?|mba\.?)'
-                    rf'\s*{primer_lower}\s+(?:[a-záéíóúñ]+\s+)?{apellido_lower}',
-                    re.IGNORECASE),
-                re.compile(rf'{primer_lower}\s+{apellido_lower}',
-                           re.IGNORECASE),
-                re.compile(rf'{apellido_lower},?\s+{primer_lower}',
-                           re.IGNORECASE),
-                re.compile(
-                    rf'{primer_lower}\s+(?:de\s+|del\s+)?'
-                    rf'[a-záéíóúñ]+\s+{apellido_lower}', re.IGNORECASE)
-            ]
-
-            mejor_match = None
-            mejor_longitud = 0
-
-            for result in results:
-                contenido = ((result.get("content") or "") + " " +
-                             (result.get("raw_content") or "")).lower()
-
-                for patron in patrones:
-                    matches = patron.findall(contenido)
-                    for match in matches:
-                        nombre_limpio = re.sub(
-                            r'^(ing\.?|dr\.?|lic\.?|arq\.?|'
-                            r'sr\.?|sra\.?|cpa\.?|mba\.?)\s*',
-                            '',
-                            match,
-                            flags=re.IGNORECASE)
-                        nombre_limpio = nombre_limpio.strip()
-                        nombre_limpio = " ".join(
-                            p.capitalize() for p in nombre_limpio.split())
-
-                        if (len(nombre_limpio) > mejor_longitud
-                                and len(nombre_limpio.split()) >= 2):
-                            mejor_match = nombre_limpio
-                            mejor_longitud = len(nombre_limpio)
-
-            return mejor_match
+        data = await tavily.buscar(query,
+                                   "advanced",
+                                   call_site="verificar_nombre",
+                                   include_answer=False)
+        if not data:
+            return None
+        results = data.get("results", [])
+
+        primer_lower = primer_nombre.lower()
+        apellido_lower = apellido.lower()
+
+        patrones = [
+            re.compile(
+                rf'{primer_lower}\s+[a-záéíóúñ]+\s+{apellido_lower}',
+                re.IGNORECASE),
+            re.compile(
+                rf'(?:ing\.?|dr\.?|lic\.?|arq\.?|sr\.?|sra\.?|cpa\.?|mba\.?)'
+                rf'\s*{primer_lower}\s+(?:[a-záéíóúñ]+\s+)?{apellido_lower}',
+                re.IGNORECASE),
+            re.compile(rf'{primer_lower}\s+{apellido_lower}',
+                       re.IGNORECASE),
+            re.compile(rf'{apellido_lower},?\s+{primer_lower}',
+                       re.IGNORECASE),
+            re.compile(
+                rf'{primer_lower}\s+(?:de\s+|del\s+)?'
+                rf'[a-záéíóúñ]+\s+{apellido_lower}', re.IGNORECASE)
+        ]
+
+        mejor_match = None
+        mejor_longitud = 0
+
+        for result in results:
+            contenido = ((result.get("content") or "") + " " +
+                         (result.get("raw_content") or "")).lower()
+
+            for patron in patrones:
+                matches = patron.findall(contenido)
+                for match in matches:
+                    nombre_limpio = re.sub(
+                        r'^(ing\.?|dr\.?|lic\.?|arq\.?|'
+                        r'sr\.?|sra\.?|cpa\.?|mba\.?)\s*',
+                        '',
+                        match,
+                        flags=re.IGNORECASE)
+                    nombre_limpio = nombre_limpio.strip()
+                    nombre_limpio = " ".join(
+                        p.capitalize() for p in nombre_limpio.split())
+
+                    if (len(nombre_limpio) > mejor_longitud
+                            and len(nombre_limpio.split()) >= 2):
+                        mejor_match = nombre_limpio
+                        mejor_longitud = len(nombre_limpio)
+
+        return mejor_match
 
     except Exception as e:
         logger.error(f"[TAVILY] Error verificando nombre: {e}")
@@ -2349,32 +2370,21 @@ async def buscar_linkedin_por_cargo(empresa: str,
             query = f'{cargo} "{empresa}" {ubicacion} site:linkedin.com/in'
 
         try:
-            async with httpx.AsyncClient(timeout=20.0) as client:
-                response = await client.post("https://api.tavily.com/search",
-                                             json={
-                                                 "api_key":
-                                                 TAVILY_API_KEY,
-                                                 "query":
-                                                 query,
-                                                 "search_depth":
-                                                 "basic",
-                                                 "include_domains":
-                                                 ["linkedin.com"],
-                                                 "max_results":
-                                                 5
-                                             })
-
-                if response.status_code == 200:
-                    data = response.json()
-                    for r in data.get("results", []):
-                        url = r.get("url", "")
-                        if "linkedin.com/in/" in url and \
-                           "/company/" not in url:
-                            url_clean = url.split("?")[0]
-                            if url_clean not in resultados:
-                                resultados.append(url_clean)
-                                logger.info(f"[CARGO] LinkedIn por {cargo}: "
-                                            f"{url_clean}")
+            data = await tavily.buscar(query,
+                                       "basic",
+                                       call_site="linkedin_por_cargo",
+                                       include_domains=["linkedin.com"])
+            if not data:
+                continue
+            for r in data.get("results", []):
+                url = r.get("url", "")
+                if "linkedin.com/in/" in url and \
+                   "/company/" not in url:
+                    url_clean = url.split("?")[0]
+                    if url_clean not in resultados:
+                        resultados.append(url_clean)
+                        logger.info(f"[CARGO] LinkedIn por {cargo}: "
+                                    f"{url_clean}")
         except Exception as e:
             logger.error(f"[CARGO] Error buscando {cargo}: {e}")
 
@@ -2441,25 +2451,19 @@ async def buscar_linkedin_por_email(email: str) -> Optional[str]:
     query = f'"{email}" site:linkedin.com/in'
 
     try:
-        async with httpx.AsyncClient(timeout=20.0) as client:
-            response = await client.post("https://api.tavily.com/search",
-                                         json={
-                                             "api_key": TAVILY_API_KEY,
-                                             "query": query,
-                                             "search_depth": "basic",
-                                             "include_domains":
-                                             ["linkedin.com"],
-                                             "max_results": 3
-                                         })
-
-            if response.status_code == 200:
-                data = response.json()
-                for r in data.get("results", []):
-                    url = r.get("url", "")
-                    if "linkedin.com/in/" in url:
-                        url_clean = url.split("?")[0]
-                        logger.info(f"[EMAIL] LinkedIn por email: {url_clean}")
-                        return url_clean
+        data = await tavily.buscar(query,
+                                   "basic",
+                                   call_site="linkedin_por_email",
+                                   include_domains=["linkedin.com"],
+                                   max_results=3)
+        if not data:
+            return None
+        for r in data.get("results", []):
+            url = r.get("url", "")
+            if "linkedin.com/in/" in url:
+                url_clean = url.split("?")[0]
+                logger.info(f"[EMAIL] LinkedIn por email: {url_clean}")
+                return url_clean
     except Exception as e:
         logger.error(f"[EMAIL] Error: {e}")
 
@@ -2565,175 +2569,162 @@ async def _tavily_buscar_linkedin_interno(
 
         logger.info(f"[TAVILY] Query: {query}")
 
-        async with httpx.AsyncClient(timeout=25.0) as client:
-            response = await client.post("https://api.tavily.com/search",
-                                         json={
-                                             "api_key": TAVILY_API_KEY,
-                                             "query": query,
-                                             "search_depth": "advanced",
-                                             "include_domains":
-                                             ["linkedin.com"],
-                                             "max_results": 15,
-                                             "include_raw_content": False
-                                         })
-
-            if response.status_code != 200:
-                return None
-
-            data = response.json()
-            results = data.get("results", [])
-
-            nombre_lower = nombre.lower()
-            primer_lower = primer_nombre.lower()
-            apellido_lower = apellido.lower()
-            empresa_lower = empresa_busqueda.lower(
-            ) if empresa_busqueda else ""
-            city_lower = city.lower() if city else ""
-            province_lower = province.lower() if province else ""
-            country_lower = country.lower() if country else ""
-
-            rubros_incompatibles = [
-                'pinturas', 'pintura', 'inmobiliaria', 'real estate',
-                'abogado', 'lawyer', 'médico', 'doctor', 'dentist'
-            ]
-
-            candidatos = []
-
-            for result in results:
-                url = result.get("url", "")
-                titulo = (result.get("title", "") or "").lower()
-                snippet = (result.get("content", "") or "").lower()
-                texto = f"{titulo} {snippet}"
+        data = await tavily.buscar(query,
+                                   "advanced",
+                                   call_site="linkedin_personal",
+                                   include_domains=["linkedin.com"],
+                                   include_answer=False,
+                                   include_raw_content=False,
+                                   max_results=15)
+        if not data:
+            return None
+        results = data.get("results", [])
+
+        nombre_lower = nombre.lower()
+        primer_lower = primer_nombre.lower()
+        apellido_lower = apellido.lower()
+        empresa_lower = empresa_busqueda.lower(
+        ) if empresa_busqueda else ""
+        city_lower = city.lower() if city else ""
+        province_lower = province.lower() if province else ""
+        country_lower = country.lower() if country else ""
+        evaluador = EvaluadorLinkedin(primer_lower, apellido_lower,
+                                      empresa_lower, province, city, country)
+
+        rubros_incompatibles = [
+            'pinturas', 'pintura', 'inmobiliaria', 'real estate',
+            'abogado', 'lawyer', 'médico', 'doctor', 'dentist'
+        ]
 
-                if "linkedin.com/in/" not in url:
-                    continue
-                if "/company/" in url:
-                    continue
+        candidatos = []
 
-                score = 0
+        for result in results:
+            url = result.get("url", "")
+            titulo = (result.get("title", "") or "").lower()
+            snippet = (result.get("content", "") or "").lower()
+            texto = f"{titulo} {snippet}"
 
-                # Scoring por nombre en texto
-                if nombre_lower in texto:
-                    score += 50
-                elif primer_lower in texto and apellido_lower in texto:
-                    score += 45
+            if "linkedin.com/in/" not in url:
+                continue
+            if "/company/" in url:
+                continue
 
-                # Scoring por URL slug
-                url_slug = ""
-                if "/in/" in url:
-                    url_slug = (
-                        url.split("/in/")[1].split("/")[0].split("?")[0])
-                url_slug_clean = url_slug.lower().replace("-", " ")
+            score = 0
+
+            # Scoring por nombre en texto
+            if nombre_lower in texto:
+                score += 50
+            elif primer_lower in texto and apellido_lower in texto:
+                score += 45
+
+            # Scoring por URL slug
+            url_slug = ""
+            if "/in/" in url:
+                url_slug = (
+                    url.split("/in/")[1].split("/")[0].split("?")[0])
+            url_slug_clean = url_slug.lower().replace("-", " ")
+
+            if primer_lower in url_slug_clean and apellido_lower in url_slug_clean:
+                score += 40
+            elif apellido_lower in url_slug_clean:
+                score += 25
+
+            # ═══════════════════════════════════════════════════════
+            # VALIDACIÓN ESTRICTA: debe tener nombre Y apellido
+            # en texto O en URL
+            # ═══════════════════════════════════════════════════════
+            tiene_primer_nombre = (primer_lower in texto
+                                   or primer_lower in url_slug_clean)
+            tiene_apellido = (apellido_lower in texto
+                              or apellido_lower in url_slug_clean)
+            tiene_match_nombre = tiene_primer_nombre and tiene_apellido
+
+            # Scoring por empresa (solo si ya tiene match de nombre)
+            tiene_match_empresa = False
+            if empresa_lower and empresa_lower in texto:
+                tiene_match_empresa = True
+                score += 30
+
+            # ═══════════════════════════════════════════════════════
+            # SCORING POR UBICACIÓN (NUEVO)
+            # ═══════════════════════════════════════════════════════
+            if city_lower and city_lower in texto:
+                score += 15
+                logger.debug(f"[TAVILY] +15 por ciudad: {city}")
+            if province_lower and province_lower in texto:
+                score += 10
+                logger.debug(f"[TAVILY] +10 por provincia: {province}")
+            if country_lower and country_lower in texto:
+                score += 5
+                logger.debug(f"[TAVILY] +5 por país: {country}")
+
+            # Detectar rubros incompatibles
+            tiene_rubro_incompatible = False
+            for rubro in rubros_incompatibles:
+                if rubro in texto and not tiene_match_empresa:
+                    tiene_rubro_incompatible = True
+                    break
 
-                if primer_lower in url_slug_clean and apellido_lower in url_slug_clean:
-                    score += 40
-                elif apellido_lower in url_slug_clean:
-                    score += 25
+            if tiene_rubro_incompatible:
+                logger.info(
+                    f"[TAVILY] Descartado (rubro incompatible): {url}")
+                continue
 
+            # Aceptar si tiene match de nombre y supera umbral
+            if tiene_match_nombre and score >= umbral_score:
                 # ═══════════════════════════════════════════════════════
-                # VALIDACIÓN ESTRICTA: debe tener nombre Y apellido
-                # en texto O en URL
+                # VALIDACIÓN ADICIONAL CON calcular_peso_linkedin
+                # Esto descarta perfiles donde nombre/apellido aparecen
+                # en el snippet pero NO corresponden a ESE perfil
+                # Ejemplo: descarta "Samuel Rodriguez" cuando buscamos
+                # "Rafael Driuzzi"
                 # ═══════════════════════════════════════════════════════
-                tiene_primer_nombre = (primer_lower in texto
-                                       or primer_lower in url_slug_clean)
-                tiene_apellido = (apellido_lower in texto
-                                  or apellido_lower in url_slug_clean)
-                tiene_match_nombre = tiene_primer_nombre and tiene_apellido
-
-                # Scoring por empresa (solo si ya tiene match de nombre)
-                tiene_match_empresa = False
-                if empresa_lower and empresa_lower in texto:
-                    tiene_match_empresa = True
-                    score += 30
+                peso_verificacion = evaluador.peso(url, texto)
 
-                # ═══════════════════════════════════════════════════════
-                # SCORING POR UBICACIÓN (NUEVO)
-                # ═══════════════════════════════════════════════════════
-                if city_lower and city_lower in texto:
-                    score += 15
-                    logger.debug(f"[TAVILY] +15 por ciudad: {city}")
-                if province_lower and province_lower in texto:
-                    score += 10
-                    logger.debug(f"[TAVILY] +10 por provincia: {province}")
-                if country_lower and country_lower in texto:
-                    score += 5
-                    logger.debug(f"[TAVILY] +5 por país: {country}")
-
-                # Detectar rubros incompatibles
-                tiene_rubro_incompatible = False
-                for rubro in rubros_incompatibles:
-                    if rubro in texto and not tiene_match_empresa:
-                        tiene_rubro_incompatible = True
-                        break
-
-                if tiene_rubro_incompatible:
-                    logger.info(
-                        f"[TAVILY] Descartado (rubro incompatible): {url}")
+                # Si peso < 60, significa que NO tiene nombre+apellido
+                # en la URL/texto de ESE perfil específico
+                if peso_verificacion < 60:
+                    logger.info(f"[TAVILY] Descartado por peso: {url} "
+                                f"(peso: {peso_verificacion} < 60)")
                     continue
 
-                # Aceptar si tiene match de nombre y supera umbral
-                if tiene_match_nombre and score >= umbral_score:
-                    # ═══════════════════════════════════════════════════════
-                    # VALIDACIÓN ADICIONAL CON calcular_peso_linkedin
-                    # Esto descarta perfiles donde nombre/apellido aparecen
-                    # en el snippet pero NO corresponden a ESE perfil
-                    # Ejemplo: descarta "Samuel Rodriguez" cuando buscamos
-                    # "Rafael Driuzzi"
-                    # ═══════════════════════════════════════════════════════
-                    peso_verificacion = calcular_peso_linkedin(
-                        url=url,
-                        texto=texto,
-                        primer_nombre=primer_lower,
-                        apellido=apellido_lower,
-                        empresa=empresa_lower,
-                        provincia=province,
-                        ciudad=city,
-                        pais=country)
-
-                    # Si peso < 60, significa que NO tiene nombre+apellido
-                    # en la URL/texto de ESE perfil específico
-                    if peso_verificacion < 60:
-                        logger.info(f"[TAVILY] Descartado por peso: {url} "
-                                    f"(peso: {peso_verificacion} < 60)")
-                        continue
+                logger.info(f"[TAVILY] ✓ Candidato: {url} "
+                            f"(score: {score}, peso: {peso_verificacion})")
+                candidatos.append({
+                    "url": url.split("?")[0],
+                    "confianza": min(score, 100),
+                    "score": score,
+                    "peso_slug": peso_verificacion,
+                    "tiene_empresa": tiene_match_empresa
+                })
 
-                    logger.info(f"[TAVILY] ✓ Candidato: {url} "
-                                f"(score: {score}, peso: {peso_verificacion})")
-                    candidatos.append({
-                        "url": url.split("?")[0],
-                        "confianza": min(score, 100),
-                        "score": score,
-                        "peso_slug": peso_verificacion,
-                        "tiene_empresa": tiene_match_empresa
-                    })
-
-            candidatos.sort(key=lambda x: x["confianza"], reverse=True)
-
-            if candidatos:
-                # Devolver cada URL con su peso real (del slug)
-                resultados = []
-                for c in candidatos[:3]:
-                    resultados.append({
-                        "url": c["url"],
-                        "confianza": c.get("peso_slug", c["confianza"])
-                    })
+        candidatos.sort(key=lambda x: x["confianza"], reverse=True)
 
-                if len(resultados) == 1:
-                    logger.info(f"[TAVILY] ✓ LinkedIn: {resultados[0]['url']}")
-                    return resultados[0]
-                else:
-                    # Devolver URLs separadas, cada una con su confianza
-                    urls_str = " | ".join([r["url"] for r in resultados])
-                    # Guardar lista completa para re-validación
-                    logger.info(
-                        f"[TAVILY] ✓ LinkedIn múltiples: {len(resultados)}")
-                    return {
-                        "url": urls_str,
-                        "confianza": resultados[0]["confianza"],
-                        "urls_detalle": resultados
-                    }
+        if candidatos:
+            # Devolver cada URL con su peso real (del slug)
+            resultados = []
+            for c in candidatos[:3]:
+                resultados.append({
+                    "url": c["url"],
+                    "confianza": c.get("peso_slug", c["confianza"])
+                })
 
-            return None
+            if len(resultados) == 1:
+                logger.info(f"[TAVILY] ✓ LinkedIn: {resultados[0]['url']}")
+                return resultados[0]
+            else:
+                # Devolver URLs separadas, cada una con su confianza
+                urls_str = " | ".join([r["url"] for r in resultados])
+                # Guardar lista completa para re-validación
+                logger.info(
+                    f"[TAVILY] ✓ LinkedIn múltiples: {len(resultados)}")
+                return {
+                    "url": urls_str,
+                    "confianza": resultados[0]["confianza"],
+                    "urls_detalle": resultados
+                }
+
+        return None
 
     except Exception as e:
         logger.error(f"[TAVILY] Error buscando LinkedIn personal: {e}")
@@ -2780,6 +2771,8 @@ async def google_buscar_linkedin_personal(nombre: str,
     # FASE 2: Fallback solo nombre + ubicación (sin empresa)
     # ═══════════════════════════════════════════════════════════════════
     logger.info(f"[GOOGLE] FASE 2: nombre + ubicación (sin empresa)")
+    # Opcional: no gasta la reserva de la cuota (misma query que la
+    # FASE 1 si no hay empresa → sale del cache)
     resultado_fallback = await _google_buscar_linkedin_interno(
         nombre=nombre,
         empresa_busqueda="",
@@ -2792,7 +2785,8 @@ async def google_buscar_linkedin_personal(nombre: str,
         confianza_actual=confianza_actual,
         incluir_empresa=False,
         umbral_score=40,
-        confianza_base=50)
+        confianza_base=50,
+        opcional=True)
 
     if resultado and resultado_fallback:
         if resultado["confianza"] >= resultado_fallback["confianza"]:
@@ -2802,205 +2796,332 @@ async def google_buscar_linkedin_personal(nombre: str,
     return resultado or resultado_fallback
 
 
+def _google_query_linkedin(nombre: str, empresa_busqueda: str, province: str,
+                           country: str, incluir_empresa: bool) -> str:
+    """Query de Google para LinkedIn personal (con o sin empresa)."""
+    # Construir ubicación simplificada (solo provincia + país)
+    ubicacion_simple = ""
+    if province and province != "No encontrado":
+        ubicacion_simple = province
+        if country and country != "No encontrado":
+            ubicacion_simple += f" {country}"
+    elif country and country != "No encontrado":
+        ubicacion_simple = country
+
+    # Construir query con ubicación simplificada
+    if incluir_empresa and empresa_busqueda:
+        if ubicacion_simple:
+            return (f"site:linkedin.com/in {nombre} "
+                    f"{empresa_busqueda} {ubicacion_simple}")
+        return f"site:linkedin.com/in {nombre} {empresa_busqueda}"
+    if ubicacion_simple:
+        return f"site:linkedin.com/in {nombre} {ubicacion_simple}"
+    return f"site:linkedin.com/in {nombre}"
+
+
 async def _google_buscar_linkedin_interno(
         nombre: str, empresa_busqueda: str, primer_nombre: str, apellido: str,
         ubicacion: str, city: str, province: str, country: str,
         confianza_actual: int, incluir_empresa: bool, umbral_score: int,
-        confianza_base: int) -> Optional[dict]:
+        confianza_base: int,
+        opcional: bool = False) -> Optional[dict]:
     """
     Función interna de búsqueda LinkedIn con Google.
+    opcional: la búsqueda no gasta la reserva de la cuota diaria.
     """
     try:
-        # Construir ubicación simplificada (solo provincia + país)
-        ubicacion_simple = ""
-        if province and province != "No encontrado":
-            ubicacion_simple = province
-            if country and country != "No encontrado":
-                ubicacion_simple += f" {country}"
-        elif country and country != "No encontrado":
-            ubicacion_simple = country
+        query = _google_query_linkedin(nombre, empresa_busqueda, province,
+                                       country, incluir_empresa)
+        logger.info(f"[GOOGLE] Query: {query}")
 
-        # Construir query con ubicación simplificada
-        if incluir_empresa and empresa_busqueda:
-            if ubicacion_simple:
-                query = (f"site:linkedin.com/in {nombre} "
-                         f"{empresa_busqueda} {ubicacion_simple}")
-            else:
-                query = f"site:linkedin.com/in {nombre} {empresa_busqueda}"
-        else:
-            if ubicacion_simple:
-                query = f"site:linkedin.com/in {nombre} {ubicacion_simple}"
-            else:
-                query = f"site:linkedin.com/in {nombre}"
+        data = await google_cse.buscar(query,
+                                       call_site="linkedin_personal",
+                                       opcional=opcional)
+        if not data:
+            return None
 
-        url = (f"https://www.googleapis.com/customsearch/v1"
-               f"?cx={GOOGLE_SEARCH_CX}"
-               f"&q={quote(query)}&num=10&key={GOOGLE_API_KEY}")
+        items = data.get("items", [])
+
+        nombre_lower = nombre.lower()
+        primer_lower = primer_nombre.lower()
+        apellido_lower = apellido.lower()
+        empresa_lower = empresa_busqueda.lower(
+        ) if empresa_busqueda else ""
+        city_lower = city.lower() if city else ""
+        province_lower = province.lower() if province else ""
+        country_lower = country.lower() if country else ""
+        evaluador = EvaluadorLinkedin(primer_lower, apellido_lower,
+                                      empresa_lower, province, city, country)
+
+        rubros_incompatibles = [
+            'pinturas', 'pintura', 'inmobiliaria', 'real estate',
+            'abogado', 'lawyer', 'médico', 'doctor', 'dentist'
+        ]
 
-        logger.info(f"[GOOGLE] Query: {query}")
+        candidatos = []
 
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            response = await client.get(url)
+        for item in items:
+            link = item.get("link", "")
+            titulo = (item.get("title", "") or "").lower()
+            snippet = (item.get("snippet", "") or "").lower()
+            texto = f"{titulo} {snippet}"
 
-            if response.status_code != 200:
-                logger.warning(f"[GOOGLE] Error {response.status_code} "
-                               f"buscando LinkedIn personal")
-                return None
+            if "linkedin.com/in/" not in link:
+                continue
 
-            data = response.json()
-            items = data.get("items", [])
+            score = 0
+
+            # Scoring por nombre en texto
+            if nombre_lower in texto:
+                score += 40
+            elif primer_lower in texto and apellido_lower in texto:
+                score += 35
+
+            # Scoring por URL slug
+            url_slug = ""
+            if "/in/" in link:
+                url_slug = (
+                    link.split("/in/")[1].split("/")[0].split("?")[0])
+            url_slug_lower = url_slug.lower().replace("-", "")
+            url_slug_clean = url_slug.lower().replace("-", " ")
+
+            if (primer_lower in url_slug_lower
+                    and apellido_lower in url_slug_lower):
+                score += 30
+            elif apellido_lower in url_slug_lower:
+                score += 15
+
+            # ═══════════════════════════════════════════════════════
+            # VALIDACIÓN ESTRICTA: debe tener nombre Y apellido
+            # en texto O en URL
+            # ═══════════════════════════════════════════════════════
+            tiene_primer_nombre = (primer_lower in texto
+                                   or primer_lower in url_slug_clean)
+            tiene_apellido = (apellido_lower in texto
+                              or apellido_lower in url_slug_clean)
+            tiene_match_nombre = tiene_primer_nombre and tiene_apellido
+
+            # Scoring por empresa (solo si ya tiene match de nombre)
+            tiene_match_empresa = False
+            if empresa_lower and empresa_lower in texto:
+                tiene_match_empresa = True
+                score += 30
+
+            # ═══════════════════════════════════════════════════════
+            # SCORING POR UBICACIÓN (NUEVO)
+            # ═══════════════════════════════════════════════════════
+            if city_lower and city_lower in texto:
+                score += 15
+            if province_lower and province_lower in texto:
+                score += 10
+            if country_lower and country_lower in texto:
+                score += 5
+
+            # Detectar rubros incompatibles
+            tiene_rubro_incompatible = False
+            for rubro in rubros_incompatibles:
+                if rubro in texto and not tiene_match_empresa:
+                    tiene_rubro_incompatible = True
+                    break
 
-            nombre_lower = nombre.lower()
-            primer_lower = primer_nombre.lower()
-            apellido_lower = apellido.lower()
-            empresa_lower = empresa_busqueda.lower(
-            ) if empresa_busqueda else ""
-            city_lower = city.lower() if city else ""
-            province_lower = province.lower() if province else ""
-            country_lower = country.lower() if country else ""
+            if tiene_rubro_incompatible:
+                logger.info(
+                    f"[GOOGLE] Descartado (rubro incompatible): {link}")
+                continue
 
-            rubros_incompatibles = [
-                'pinturas', 'pintura', 'inmobiliaria', 'real estate',
-                'abogado', 'lawyer', 'médico', 'doctor', 'dentist'
-            ]
+            if tiene_match_nombre and score >= umbral_score:
+                # ═══════════════════════════════════════════════════════
+                # VALIDACIÓN ADICIONAL CON calcular_peso_linkedin
+                # ═══════════════════════════════════════════════════════
+                peso_verificacion = evaluador.peso(link, texto)
 
-            candidatos = []
+                if peso_verificacion < 60:
+                    logger.info(f"[GOOGLE] Descartado por peso: {link} "
+                                f"(peso: {peso_verificacion} < 60)")
+                    continue
 
-            for item in items:
-                link = item.get("link", "")
-                titulo = (item.get("title", "") or "").lower()
-                snippet = (item.get("snippet", "") or "").lower()
-                texto = f"{titulo} {snippet}"
+                logger.info(f"[GOOGLE] ✓ Candidato: {link} "
+                            f"(score: {score}, peso: {peso_verificacion})")
+                candidatos.append({
+                    "url": link,
+                    "score": score,
+                    "peso_slug": peso_verificacion,
+                    "tiene_empresa": tiene_match_empresa
+                })
 
-                if "linkedin.com/in/" not in link:
-                    continue
+        candidatos.sort(key=lambda x: x["score"], reverse=True)
 
-                score = 0
+        if candidatos:
+            # Devolver cada URL con su peso real
+            resultados = []
+            for c in candidatos[:3]:
+                resultados.append({
+                    "url": c["url"],
+                    "confianza": c.get("peso_slug", c["score"])
+                })
 
-                # Scoring por nombre en texto
-                if nombre_lower in texto:
-                    score += 40
-                elif primer_lower in texto and apellido_lower in texto:
-                    score += 35
+            mejor = resultados[0]
+            if mejor["confianza"] > confianza_actual:
+                if len(resultados) == 1:
+                    logger.info(f"[GOOGLE] ✓ LinkedIn: {mejor['url']}")
+                    return mejor
+                else:
+                    # Devolver URLs separadas, cada una con su confianza
+                    urls_str = " | ".join([r["url"] for r in resultados])
+                    logger.info(
+                        f"[GOOGLE] ✓ LinkedIn múltiples: {len(resultados)}")
+                    return {
+                        "url": urls_str,
+                        "confianza": mejor["confianza"],
+                        "urls_detalle": resultados
+                    }
 
-                # Scoring por URL slug
-                url_slug = ""
-                if "/in/" in link:
-                    url_slug = (
-                        link.split("/in/")[1].split("/")[0].split("?")[0])
-                url_slug_lower = url_slug.lower().replace("-", "")
-                url_slug_clean = url_slug.lower().replace("-", " ")
+        return None
 
-                if (primer_lower in url_slug_lower
-                        and apellido_lower in url_slug_lower):
-                    score += 30
-                elif apellido_lower in url_slug_lower:
-                    score += 15
+    except Exception as e:
+        logger.error(f"[GOOGLE] Error buscando LinkedIn personal: {e}")
+        return None
 
-                # ═══════════════════════════════════════════════════════
-                # VALIDACIÓN ESTRICTA: debe tener nombre Y apellido
-                # en texto O en URL
-                # ═══════════════════════════════════════════════════════
-                tiene_primer_nombre = (primer_lower in texto
-                                       or primer_lower in url_slug_clean)
-                tiene_apellido = (apellido_lower in texto
-                                  or apellido_lower in url_slug_clean)
-                tiene_match_nombre = tiene_primer_nombre and tiene_apellido
-
-                # Scoring por empresa (solo si ya tiene match de nombre)
-                tiene_match_empresa = False
-                if empresa_lower and empresa_lower in texto:
-                    tiene_match_empresa = True
-                    score += 30
 
-                # ═══════════════════════════════════════════════════════
-                # SCORING POR UBICACIÓN (NUEVO)
-                # ═══════════════════════════════════════════════════════
-                if city_lower and city_lower in texto:
-                    score += 15
-                if province_lower and province_lower in texto:
-                    score += 10
-                if country_lower and country_lower in texto:
-                    score += 5
-
-                # Detectar rubros incompatibles
-                tiene_rubro_incompatible = False
-                for rubro in rubros_incompatibles:
-                    if rubro in texto and not tiene_match_empresa:
-                        tiene_rubro_incompatible = True
-                        break
-
-                if tiene_rubro_incompatible:
-                    logger.info(
-                        f"[GOOGLE] Descartado (rubro incompatible): {link}")
-                    continue
+def formatear_noticias(noticias: List[dict]) -> str:
+    """Texto de noticias_empresa: título [FUENTE] + URL por noticia."""
+    noticias_texto = []
+    for n in noticias[:10]:
+        titulo = n.get("titulo", "Sin título")
+        url = n.get("url", "")
+        try:
+            dominio = url.split('/')[2].replace('www.', '')
+            source_label = dominio.split('.')[0].upper()
+        except:
+            source_label = 'WEB'
+        linea = f"• {titulo} [{source_label}]"
+        if url:
+            linea += f"\n  {url}"
+        noticias_texto.append(linea)
+    return "\n\n".join(noticias_texto)
+
+
+def _procesar_items_apify(items: list, empresa_busqueda: str) -> List[dict]:
+    """Filtra el dataset del crawler y arma las noticias relevantes."""
+    empresa_lower = empresa_busqueda.lower()
+    noticias = []
+
+    # La misma nota sindicada en varios medios se valida una sola vez
+    items = news_dedup.colapsar(
+        items, lambda it: news_dedup.texto_para_huella(
+            it.get("title"), (it.get("text") or "")[:APIFY_SNIPPET_CHARS]))
+
+    for item in items:
+        url = item.get("url", "")
+        titulo = item.get("title", "") or ""
+        texto = item.get("text", "") or ""
+        texto_lower = texto.lower()
+
+        # Las redes sociales ya se filtran en es_url_valida_noticia
+        # No las procesamos como noticias
+
+        # Saltar buscadores y registros legales
+        if es_buscador(url):
+            continue
+        if es_registro_legal(url, f"{titulo} {texto}"):
+            continue
 
-                if tiene_match_nombre and score >= umbral_score:
-                    # ═══════════════════════════════════════════════════════
-                    # VALIDACIÓN ADICIONAL CON calcular_peso_linkedin
-                    # ═══════════════════════════════════════════════════════
-                    peso_verificacion = calcular_peso_linkedin(
-                        url=link,
-                        texto=texto,
-                        primer_nombre=primer_lower,
-                        apellido=apellido_lower,
-                        empresa=empresa_lower,
-                        provincia=province,
-                        ciudad=city,
-                        pais=country)
-
-                    if peso_verificacion < 60:
-                        logger.info(f"[GOOGLE] Descartado por peso: {link} "
-                                    f"(peso: {peso_verificacion} < 60)")
-                        continue
+        if not es_url_valida_noticia(url, f"{titulo} {texto}",
+                                     empresa_busqueda):
+            logger.debug(f"[NOTICIAS] Descartado: {url[:50]}...")
+            continue
+        
+        # Filtrar noticias basura (Softonic, Play Store, APK, etc.)
+        if not es_noticia_valida(url, titulo):
+            logger.debug(f"[NOTICIAS] Descartado (basura): {url[:50]}...")
+            continue
 
-                    logger.info(f"[GOOGLE] ✓ Candidato: {link} "
-                                f"(score: {score}, peso: {peso_verificacion})")
-                    candidatos.append({
-                        "url": link,
-                        "score": score,
-                        "peso_slug": peso_verificacion,
-                        "tiene_empresa": tiene_match_empresa
-                    })
-
-            candidatos.sort(key=lambda x: x["score"], reverse=True)
-
-            if candidatos:
-                # Devolver cada URL con su peso real
-                resultados = []
-                for c in candidatos[:3]:
-                    resultados.append({
-                        "url": c["url"],
-                        "confianza": c.get("peso_slug", c["score"])
-                    })
-
-                mejor = resultados[0]
-                if mejor["confianza"] > confianza_actual:
-                    if len(resultados) == 1:
-                        logger.info(f"[GOOGLE] ✓ LinkedIn: {mejor['url']}")
-                        return mejor
-                    else:
-                        # Devolver URLs separadas, cada una con su confianza
-                        urls_str = " | ".join([r["url"] for r in resultados])
-                        logger.info(
-                            f"[GOOGLE] ✓ LinkedIn múltiples: {len(resultados)}")
-                        return {
-                            "url": urls_str,
-                            "confianza": mejor["confianza"],
-                            "urls_detalle": resultados
-                        }
+        # Verificar relevancia
+        palabras_empresa = [
+            p for p in empresa_lower.split() if len(p) > 3
+        ]
+        if (empresa_lower in texto_lower
+                or any(p in texto_lower for p in palabras_empresa)):
+            noticia = {
+                "titulo": titulo[:200] if titulo else "Sin título",
+                "url": url,
+                "resumen": texto[:300] if texto else "",
+                "source": "apify"
+            }
 
-            return None
+            noticias.append(noticia)
 
-    except Exception as e:
-        logger.error(f"[GOOGLE] Error buscando LinkedIn personal: {e}")
-        return None
+    logger.info(f"[APIFY] ✓ {len(noticias)} noticias procesadas")
+    return noticias[:10]
+
+
+async def _guardar_noticias_tardias(phone: str, noticias: List[dict],
+                                    empresa_busqueda: str,
+                                    ubicacion_query: str):
+    """
+    Noticias de una corrida de Apify que terminó después del timeout:
+    pasan por el historial de la empresa (news_dedup, misma clave
+    empresa + ubicación que buscar_noticias_empresa) y se guardan en el
+    lead si la etapa de noticias ya cerró sin noticias.
+    """
+    from services.mongodb import get_database
+
+    previas = await news_dedup.historial(empresa_busqueda, ubicacion_query)
+    noticias = await news_dedup.combinar_y_guardar(empresa_busqueda,
+                                                   ubicacion_query, noticias,
+                                                   previas["noticias"])
+
+    db = get_database()
+    if db is None:
+        return
+    collection = db["leads_fortia"]
+
+    for _ in range(APIFY_TARDIAS_INTENTOS):
+        lead = await asyncio.to_thread(collection.find_one,
+                                       {"phone_whatsapp": phone}, {
+                                           "investigacion_etapas": 1,
+                                           "noticias_empresa": 1
+                                       })
+        if not lead:
+            return
+        # Si la etapa de noticias todavía no guardó, pisaría estas
+        if "noticias" not in (lead.get("investigacion_etapas") or {}):
+            await asyncio.sleep(APIFY_TARDIAS_ESPERA_SECONDS)
+            continue
+
+        result = await asyncio.to_thread(
+            collection.update_one, {
+                "phone_whatsapp": phone,
+                "noticias_empresa": {
+                    "$in": SIN_NOTICIAS
+                }
+            }, {
+                "$set": {
+                    "noticias_empresa": formatear_noticias(noticias),
+                    "noticias_source": "apify_tardio"
+                },
+                "$inc": {
+                    "version": 1
+                }
+            })
+        if result.modified_count:
+            logger.info(f"[APIFY] ✓ {len(noticias)} noticias tardías "
+                        f"guardadas para {phone}")
+        return
 
 
 async def apify_buscar_noticias(empresa_busqueda: str,
-                                ubicacion_query: str = "") -> List[dict]:
+                                ubicacion_query: str = "",
+                                timeout: Optional[float] = None,
+                                phone: str = "",
+                                desde_dias: int = 0) -> List[dict]:
     """
-    Busca noticias usando Apify website-content-crawler.
+    Busca noticias usando Apify website-content-crawler (corrida
+    asíncrona, ver services/apify_runs).
+    desde_dias: solo lo publicado en los últimos N días (0 = todo).
+
+    Si vence timeout la corrida sigue: el resultado queda cacheado por
+    empresa + ubicación y, con phone, se guarda tarde en el lead.
     """
     if not APIFY_API_TOKEN:
         return []
@@ -3009,110 +3130,64 @@ async def apify_buscar_noticias(empresa_busqueda: str,
         # Usar query optimizada para noticias reales
         query = construir_query_noticias(empresa_busqueda, ubicacion_query)
 
-        # URLs de noticias
+        # URLs de noticias (when:Nd solo lo entiende Google News)
+        query_google = f"{query} when:{desde_dias}d" if desde_dias else query
         news_urls = [
-            f"https://news.google.com/search?q={quote(query)}&hl=es-419",
+            f"https://news.google.com/search?q={quote(query_google)}"
+            f"&hl=es-419",
             f"https://www.bing.com/news/search?q={quote(query)}"
         ]
 
         start_urls = [{"url": u} for u in news_urls]
 
-        async with httpx.AsyncClient(timeout=APIFY_TIMEOUT) as client:
-            # Iniciar el crawler
-            response = await client.post(
-                f"https://api.apify.com/v2/acts/apify~website-content-crawler"
-                f"/runs?token={APIFY_API_TOKEN}&waitForFinish=30",
-                json={
-                    "startUrls": start_urls,
-                    "maxCrawlPages": 20,
-                    "maxCrawlDepth": 1,
-                    "proxyConfiguration": {
-                        "useApifyProxy": True
-                    }
-                })
-
-            if response.status_code != 201:
-                logger.warning(
-                    f"[APIFY] Error iniciando crawler: {response.status_code}")
-                return []
-
-            run_data = response.json()
-            dataset_id = run_data.get("data", {}).get("defaultDatasetId")
-
-            if not dataset_id:
-                return []
-
-            # Obtener resultados
-            results_response = await client.get(
-                f"https://api.apify.com/v2/datasets/{dataset_id}/items"
-                f"?token={APIFY_API_TOKEN}")
-
-            if results_response.status_code != 200:
-                return []
-
-            items = results_response.json()
-
-            empresa_lower = empresa_busqueda.lower()
-            noticias = []
-
-            for item in items:
-                url = item.get("url", "")
-                titulo = item.get("title", "") or ""
-                texto = item.get("text", "") or ""
-                texto_lower = texto.lower()
-
-                # Las redes sociales ya se filtran en es_url_valida_noticia
-                # No las procesamos como noticias
-
-                # Saltar buscadores y registros legales
-                if es_buscador(url):
-                    continue
-                if es_registro_legal(url, f"{titulo} {texto}"):
-                    continue
-
-                if not es_url_valida_noticia(url, f"{titulo} {texto}",
-                                             empresa_busqueda):
-                    logger.debug(f"[NOTICIAS] Descartado: {url[:50]}...")
-                    continue
-                
-                # Filtrar noticias basura (Softonic, Play Store, APK, etc.)
-                if not es_noticia_valida(url, titulo):
-                    logger.debug(f"[NOTICIAS] Descartado (basura): {url[:50]}...")
-                    continue
-
-                # Verificar relevancia
-                palabras_empresa = [
-                    p for p in empresa_lower.split() if len(p) > 3
-                ]
-                if (empresa_lower in texto_lower
-                        or any(p in texto_lower for p in palabras_empresa)):
-                    noticia = {
-                        "titulo": titulo[:200] if titulo else "Sin título",
-                        "url": url,
-                        "resumen": texto[:300] if texto else "",
-                        "source": "apify"
-                    }
-
-                    noticias.append(noticia)
+        tarea = await apify_runs.obtener(
+            clave=(f"{empresa_busqueda.lower()}|{ubicacion_query.lower()}"
+                   f"|{desde_dias}"),
+            actor=APIFY_ACTOR,
+            entrada={
+                "startUrls": start_urls,
+                "maxCrawlPages": 20,
+                "maxCrawlDepth": 1,
+                "proxyConfiguration": {
+                    "useApifyProxy": True
+                }
+            },
+            procesar=lambda items: _procesar_items_apify(
+                items, empresa_busqueda),
+            call_site="noticias")
 
-            noticias_finales = noticias
-
-            logger.info(
-                f"[APIFY] ✓ {len(noticias_finales)} noticias procesadas")
-            return noticias_finales[:10]
+        try:
+            # shield: el timeout (o un hedge que cancela) no corta la corrida
+            return await asyncio.wait_for(asyncio.shield(tarea), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("[APIFY] Timeout esperando crawler, la corrida "
+                           "sigue en background")
+            if phone:
+
+                def _al_terminar(t):
+                    if not t.cancelled() and not t.exception() and t.result():
+                        guardado = asyncio.create_task(
+                            _guardar_noticias_tardias(phone, t.result(),
+                                                      empresa_busqueda,
+                                                      ubicacion_query))
+                        _tareas_tardias.add(guardado)
+                        guardado.add_done_callback(_tareas_tardias.discard)
+
+                tarea.add_done_callback(_al_terminar)
+            return []
 
-    except asyncio.TimeoutError:
-        logger.warning("[APIFY] Timeout esperando crawler")
-        return []
     except Exception as e:
         logger.error(f"[APIFY] Error: {e}")
         return []
 
 
-async def google_buscar_noticias(empresa: str, empresa_busqueda: str,
-                                 ubicacion_query: str) -> List[dict]:
+async def google_buscar_noticias(empresa: str,
+                                 empresa_busqueda: str,
+                                 ubicacion_query: str,
+                                 desde_dias: int = 0) -> List[dict]:
     """
     Busca noticias relevantes de la empresa con Google.
+    desde_dias: solo lo publicado en los últimos N días (0 = todo).
     """
     if not GOOGLE_API_KEY or not GOOGLE_SEARCH_CX:
         return []
@@ -3135,69 +3210,68 @@ async def google_buscar_noticias(empresa: str, empresa_busqueda: str,
 
         # Usar query optimizada para noticias reales
         query = construir_query_noticias(empresa or empresa_busqueda, ubicacion_query)
-        url = (f"https://www.googleapis.com/customsearch/v1"
-               f"?cx={GOOGLE_SEARCH_CX}&q={quote(query)}"
-               f"&num=10&key={GOOGLE_API_KEY}")
-
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            response = await client.get(url)
-
-            if response.status_code != 200:
-                logger.warning(
-                    f"[GOOGLE] Error {response.status_code} buscando noticias")
-                return []
-
-            data = response.json()
-            items = data.get("items", [])
-
-            empresa_lower = empresa.lower()
-            palabras_clave = [p for p in empresa_lower.split() if len(p) > 2]
-
-            noticias = []
-
-            for item in items:
-                url = item.get("link", "")
-                titulo = item.get("title", "") or ""
-                snippet = item.get("snippet", "") or ""
-                texto = f"{titulo} {snippet}"
-                texto_lower = texto.lower()
-
-                # Las redes sociales ya se filtran en es_url_valida_noticia
-                # No las procesamos como noticias
-
-                if es_buscador(url):
-                    continue
-                if es_registro_legal(url, texto):
-                    continue
+        # Con Apify como respaldo la búsqueda es opcional (no gasta reserva)
+        data = await google_cse.buscar(
+            query,
+            call_site="noticias",
+            opcional=bool(APIFY_API_TOKEN),
+            date_restrict=f"d{desde_dias}" if desde_dias else "")
+        if not data:
+            return []
+        # La misma nota sindicada en varios medios se valida una sola vez
+        items = news_dedup.colapsar(
+            data.get("items", []),
+            lambda it: news_dedup.texto_para_huella(it.get("title"),
+                                                    it.get("snippet")))
+
+        empresa_lower = empresa.lower()
+        palabras_clave = [p for p in empresa_lower.split() if len(p) > 2]
+
+        noticias = []
+
+        for item in items:
+            url = item.get("link", "")
+            titulo = item.get("title", "") or ""
+            snippet = item.get("snippet", "") or ""
+            texto = f"{titulo} {snippet}"
+            texto_lower = texto.lower()
+
+            # Las redes sociales ya se filtran en es_url_valida_noticia
+            # No las procesamos como noticias
+
+            if es_buscador(url):
+                continue
+            if es_registro_legal(url, texto):
+                continue
 
-                if not es_url_valida_noticia(url, texto, empresa_busqueda):
-                    continue
-                
-                # Filtrar noticias basura (Softonic, Play Store, APK, etc.)
-                # Validar que la empresa esté en el título
-                if not es_noticia_valida(url, titulo, empresa or empresa_busqueda):
-                    logger.debug(
-                        f"[NOTICIAS] Descartado (no relevante): {titulo[:50]}..."
-                    )
-                    continue
+            if not es_url_valida_noticia(url, texto, empresa_busqueda):
+                continue
+            
+            # Filtrar noticias basura (Softonic, Play Store, APK, etc.)
+            # Validar que la empresa esté en el título
+            if not es_noticia_valida(url, titulo, empresa or empresa_busqueda):
+                logger.debug(
+                    f"[NOTICIAS] Descartado (no relevante): {titulo[:50]}..."
+                )
+                continue
 
-                # Verificar relevancia
-                matches = sum(1 for p in palabras_clave if p in texto_lower)
-                if matches >= 1 or empresa_lower in texto_lower:
-                    noticia = {
-                        "titulo": titulo[:200] if titulo else "Sin título",
-                        "url": url,
-                        "resumen": snippet[:300] if snippet else "",
-                        "source": "google"
-                    }
+            # Verificar relevancia
+            matches = sum(1 for p in palabras_clave if p in texto_lower)
+            if matches >= 1 or empresa_lower in texto_lower:
+                noticia = {
+                    "titulo": titulo[:200] if titulo else "Sin título",
+                    "url": url,
+                    "resumen": snippet[:300] if snippet else "",
+                    "source": "google"
+                }
 
-                    noticias.append(noticia)
+                noticias.append(noticia)
 
-            noticias_finales = noticias
+        noticias_finales = noticias
 
-            logger.info(
-                f"[GOOGLE] ✓ {len(noticias_finales)} noticias encontradas")
-            return noticias_finales[:10]
+        logger.info(
+            f"[GOOGLE] ✓ {len(noticias_finales)} noticias encontradas")
+        return noticias_finales[:10]
 
     except Exception as e:
         logger.error(f"[GOOGLE] Error buscando noticias: {e}")
@@ -3214,7 +3288,8 @@ async def search_news(business_name: str,
                       location: str = "") -> List[dict]:
     """Wrapper para búsqueda de noticias."""
     if APIFY_API_TOKEN:
-        noticias = await apify_buscar_noticias(business_name, location)
+        noticias = await apify_buscar_noticias(
+            business_name, location, timeout=APIFY_ESPERA_SECONDS)
         if noticias:
             return noticias
     return await google_buscar_noticias(business_name, business_name, location)
\ No newline at end of file
@@ -0,0 +1,185 @@
+"""
+Investigación especulativa cuando el lead manda su web
+La investigación arrancaba recién cuando el LLM llamaba a
+extraer_datos_web_cliente (un round trip de GPT más las esperas fijas
+de la tool). Si el mensaje entrante ya trae una URL o dominio:
+
+1. DNS: se resuelve el dominio (si no existe, no se gasta nada más)
+2. Homepage: se descarga por adelantado (web_extractor.prefetch_homepage)
+3. Con SPECULATIVE_RESEARCH activo y el nombre del lead conocido, se
+   lanza iniciar_investigacion_background completo
+
+Cada corrida queda registrada por (teléfono, dominio); cuando la tool
+se ejecuta con ese dominio se "adjunta" a la corrida en vuelo en vez de
+lanzar otra. Las corridas que vencen sin adjuntarse cuentan como
+trabajo desperdiciado.
+"""
+import re
+import time
+import socket
+import asyncio
+import logging
+from typing import Optional
+
+from config import SPECULATIVE_PREFETCH, SPECULATIVE_RESEARCH
+from services.agent_state import VALORES_VACIOS
+from utils.text_cleaner import clean_url
+
+logger = logging.getLogger(__name__)
+
+# Tiempo que una corrida espera a que la tool la adopte
+ESPECULACION_TTL_SECONDS = 900
+DNS_TIMEOUT_SECONDS = 3.0
+
+TLDS = (r'com\.ar|com\.mx|com\.co|com\.uy|com\.py|com\.pe|com\.bo|com\.ec|'
+        r'com\.ve|com\.br|com\.es|co\.uk|com|net|org|ar|mx|co|cl|uy|py|pe|'
+        r'bo|ec|ve|br|es|io|ai|app|dev|info|biz|online|site|store|tech|'
+        r'agency|studio|digital|us|it|de')
+
+# URL con esquema, con www. o dominio suelto con TLD conocido.
+# El lookbehind descarta emails (usuario@dominio.com)
+RE_DOMINIO = re.compile(
+    r'(?<![@\w.-])(?:https?://)?(?:www\.)?'
+    r'((?:[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.)+(?:' + TLDS + r'))'
+    r'(?![\w-])(?:/[^\s]*)?', re.IGNORECASE)
+
+
+def detectar_website(texto: str) -> str:
+    """Primer dominio del texto (sin esquema ni www), o ""."""
+    match = RE_DOMINIO.search(texto or "")
+    if not match:
+        return ""
+    return match.group(1).lower()
+
+
+class SpeculativeResearch:
+    """Registro de corridas especulativas por (teléfono, dominio)."""
+
+    def __init__(self):
+        self._corridas = {}
+        self._stats = {
+            "lanzadas": 0,
+            "dns_fallidos": 0,
+            "investigaciones_lanzadas": 0,
+            "adjuntadas": 0,
+            "desperdiciadas": 0,
+            "segundos_ahorrados": 0.0,
+            "segundos_desperdiciados": 0.0
+        }
+
+    def _vencer(self):
+        ahora = time.time()
+        for clave, corrida in list(self._corridas.items()):
+            if ahora - corrida["inicio"] <= ESPECULACION_TTL_SECONDS:
+                continue
+            del self._corridas[clave]
+            if not corrida["adjuntada"]:
+                self._stats["desperdiciadas"] += 1
+                self._stats["segundos_desperdiciados"] += corrida["duracion"]
+                logger.info(f"[SPECULATIVE] Desperdiciada: {clave[1]} "
+                            f"({corrida['duracion']:.1f}s de trabajo)")
+
+    def lanzar(self, phone: str, texto: str, nombre: str = "",
+               ubicacion: Optional[dict] = None) -> bool:
+        """
+        Lanza el trabajo especulativo si el texto trae un dominio.
+        No bloquea: todo corre en una tarea aparte.
+        """
+        if not SPECULATIVE_PREFETCH:
+            return False
+
+        dominio = detectar_website(texto)
+        if not dominio:
+            return False
+
+        self._vencer()
+        clave = (phone, dominio)
+        if clave in self._corridas:
+            return False
+
+        corrida = {
+            "inicio": time.time(),
+            "duracion": 0.0,
+            "adjuntada": False,
+            "investigacion": None
+        }
+        self._corridas[clave] = corrida
+        self._stats["lanzadas"] += 1
+        corrida["tarea"] = asyncio.create_task(
+            self._correr(phone, dominio, nombre, ubicacion or {}, corrida))
+        logger.info(f"[SPECULATIVE] Dominio detectado: {dominio}")
+        return True
+
+    async def _correr(self, phone: str, dominio: str, nombre: str,
+                      ubicacion: dict, corrida: dict):
+        from services.web_extractor import prefetch_homepage
+
+        t0 = time.monotonic()
+        try:
+            loop = asyncio.get_running_loop()
+            await asyncio.wait_for(loop.getaddrinfo(dominio, 443),
+                                   timeout=DNS_TIMEOUT_SECONDS)
+        except (socket.gaierror, asyncio.TimeoutError, OSError):
+            self._stats["dns_fallidos"] += 1
+            logger.info(f"[SPECULATIVE] {dominio} no resuelve, descartado")
+            self._corridas.pop((phone, dominio), None)
+            return
+
+        prefetch_homepage(f"https://{dominio}")
+
+        # La investigación completa necesita el nombre para LinkedIn:
+        # sin nombre solo queda el prefetch
+        # Si la tool ya se adjuntó (DNS lento), ella lanzó la investigación
+        if (SPECULATIVE_RESEARCH and not corrida["adjuntada"]
+                and nombre not in VALORES_VACIOS | {None}):
+            from services.openai_agent import iniciar_investigacion_background
+            self._stats["investigaciones_lanzadas"] += 1
+            corrida["investigacion"] = asyncio.create_task(
+                iniciar_investigacion_background(phone=phone,
+                                                 nombre=nombre,
+                                                 web=dominio,
+                                                 ubicacion=ubicacion))
+            logger.info(f"[SPECULATIVE] Investigación lanzada: {nombre}, "
+                        f"{dominio}")
+            try:
+                await corrida["investigacion"]
+            except Exception as e:
+                logger.error(f"[SPECULATIVE] Error en investigación: {e}")
+
+        corrida["duracion"] = time.monotonic() - t0
+
+    def adjuntar(self, phone: str, website: str) -> Optional[dict]:
+        """
+        Para extraer_datos_web_cliente: si hay una investigación
+        especulativa del mismo dominio, la marca como usada.
+
+        Returns:
+            None si hay que lanzar la investigación, o
+            {"ventaja": segundos de adelanto, "tarea": asyncio.Task}
+        """
+        dominio = clean_url(website).split("/")[0].lower()
+        corrida = self._corridas.get((phone, dominio))
+        if not corrida:
+            return None
+
+        # Aunque solo haya prefetch (homepage), la corrida se aprovechó
+        corrida["adjuntada"] = True
+        if corrida["investigacion"] is None:
+            return None
+
+        ventaja = time.time() - corrida["inicio"]
+        self._stats["adjuntadas"] += 1
+        self._stats["segundos_ahorrados"] += ventaja
+        logger.info(f"[SPECULATIVE] Tool adjuntada a {dominio} "
+                    f"(ventaja {ventaja:.1f}s)")
+        return {"ventaja": ventaja, "tarea": corrida["investigacion"]}
+
+    def stats(self) -> dict:
+        return {
+            **self._stats, "en_vuelo":
+            sum(1 for c in self._corridas.values()
+                if not c["tarea"].done())
+        }
+
+
+speculative_research = SpeculativeResearch()
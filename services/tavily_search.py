@@ -0,0 +1,204 @@
+"""
+Cliente único de Tavily para DANIA/Fortia
+Cada módulo (web_extractor, social_research, challenges_research,
+dania_knowledge) armaba su payload y su cliente HTTP, y las mismas
+queries se repetían entre leads (desafíos del rubro, dominio, nombre).
+
+- Perfiles de profundidad: "advanced" (raw content + answer) y "basic"
+- Cache por query normalizada + parámetros: LRU en memoria + MongoDB
+  con TTL (colección tavily_cache, mismo esquema que gpt_cache)
+- Coalescing: búsquedas idénticas concurrentes comparten un solo request
+- Cuota por minuto: ventana deslizante; si se llena, se espera al slot
+- Un solo httpx.AsyncClient con pool de conexiones para todo el proceso
+- buscar() nunca lanza: ante cualquier error retorna {}
+"""
+import re
+import time
+import json
+import asyncio
+import logging
+from collections import deque
+from typing import Optional
+
+import httpx
+
+from config import TAVILY_API_KEY, TAVILY_REQUESTS_PER_MINUTE
+from services.gpt_cache import GPTResultCache
+
+logger = logging.getLogger(__name__)
+
+TAVILY_URL = "https://api.tavily.com/search"
+CACHE_TTL_SECONDS = 3 * 24 * 3600  # 3 días
+# Máximo que se espera por un slot de cuota antes de rendirse
+QUOTA_MAX_WAIT_SECONDS = 30
+
+PERFILES = {
+    "advanced": {
+        "search_depth": "advanced",
+        "include_raw_content": True,
+        "include_answer": True,
+        "max_results": 5
+    },
+    "basic": {
+        "search_depth": "basic",
+        "include_raw_content": False,
+        "include_answer": False,
+        "max_results": 5
+    },
+}
+
+TIMEOUTS = {"advanced": 30.0, "basic": 20.0}
+
+
+def normalizar_query(query: str) -> str:
+    """Minúsculas y espacios colapsados (las comillas se respetan)."""
+    return re.sub(r'\s+', ' ', (query or "").strip().lower())
+
+
+class TavilyClient:
+    """Búsquedas Tavily con cache, coalescing y cuota por minuto."""
+
+    def __init__(self, requests_per_minute: int = TAVILY_REQUESTS_PER_MINUTE):
+        self._cache = GPTResultCache(collection_name="tavily_cache",
+                                     log_tag="TAVILY-CACHE")
+        self._en_vuelo = {}
+        self._ventana = deque()
+        self._rpm = requests_per_minute
+        self._client: Optional[httpx.AsyncClient] = None
+        self._stats = {
+            "requests": 0,
+            "coalescidos": 0,
+            "errores": 0,
+            "esperas_cuota": 0,
+            "sin_cuota": 0
+        }
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=30.0,
+                limits=httpx.Limits(max_connections=10,
+                                    max_keepalive_connections=5))
+        return self._client
+
+    async def close(self):
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+
+    def _payload(self, query: str, perfil: str, extra: dict) -> dict:
+        payload = {**PERFILES[perfil], **extra, "query": query}
+        if payload.get("include_domains"):
+            payload["include_domains"] = sorted(payload["include_domains"])
+        return payload
+
+    async def _esperar_cuota(self) -> bool:
+        """Reserva un slot en la ventana de 60s; False si no hay."""
+        limite = time.monotonic() + QUOTA_MAX_WAIT_SECONDS
+        espero = False
+        while True:
+            ahora = time.monotonic()
+            while self._ventana and ahora - self._ventana[0] >= 60:
+                self._ventana.popleft()
+            if len(self._ventana) < self._rpm:
+                self._ventana.append(ahora)
+                return True
+            espera = 60 - (ahora - self._ventana[0])
+            if ahora + espera > limite:
+                self._stats["sin_cuota"] += 1
+                logger.warning("[TAVILY] Cuota por minuto agotada")
+                return False
+            if not espero:
+                self._stats["esperas_cuota"] += 1
+                espero = True
+            await asyncio.sleep(espera)
+
+    async def _request(self, payload: dict, timeout: float) -> dict:
+        if not await self._esperar_cuota():
+            return {}
+        self._stats["requests"] += 1
+        try:
+            response = await self._get_client().post(TAVILY_URL,
+                                                     json={
+                                                         "api_key":
+                                                         TAVILY_API_KEY,
+                                                         **payload
+                                                     },
+                                                     timeout=timeout)
+            if response.status_code == 200:
+                return response.json()
+            logger.warning(f"[TAVILY] HTTP {response.status_code}")
+        except Exception as e:
+            logger.error(f"[TAVILY] Error: {e}")
+        self._stats["errores"] += 1
+        return {}
+
+    async def buscar(self,
+                     query: str,
+                     perfil: str = "advanced",
+                     call_site: str = "tavily",
+                     **extra) -> dict:
+        """
+        Búsqueda Tavily. extra pisa parámetros del perfil
+        (max_results, include_domains, include_raw_content...).
+
+        Returns:
+            JSON de Tavily ({"answer", "results": [...]}) o {} si falla
+        """
+        if not TAVILY_API_KEY or not query:
+            return {}
+        try:
+            return await self._buscar(query, perfil, call_site, extra)
+        except Exception as e:
+            self._stats["errores"] += 1
+            logger.error(f"[TAVILY] Error en búsqueda ({call_site}): {e}")
+            return {}
+
+    async def _buscar(self, query: str, perfil: str, call_site: str,
+                      extra: dict) -> dict:
+        payload = self._payload(query, perfil, extra)
+        clave_payload = {**payload, "query": normalizar_query(query)}
+        key = GPTResultCache.make_key(
+            "tavily", "v1", json.dumps(clave_payload, sort_keys=True))
+
+        cached = await asyncio.to_thread(self._cache.get, call_site, key)
+        if cached is not None:
+            return cached
+
+        # Coalescing: si la misma búsqueda ya está en vuelo, esperarla
+        tarea = self._en_vuelo.get(key)
+        if tarea is not None:
+            self._stats["coalescidos"] += 1
+            return await asyncio.shield(tarea)
+
+        tarea = asyncio.create_task(
+            self._request(payload, TIMEOUTS.get(perfil, 30.0)))
+        self._en_vuelo[key] = tarea
+        try:
+            data = await asyncio.shield(tarea)
+        finally:
+            if tarea.done():
+                self._en_vuelo.pop(key, None)
+            else:
+                # El que la lanzó fue cancelado: limpiar al terminar
+                tarea.add_done_callback(
+                    lambda _: self._en_vuelo.pop(key, None))
+
+        if data:
+            await asyncio.to_thread(self._cache.set, call_site, key, data,
+                                    CACHE_TTL_SECONDS)
+        return data
+
+    def stats(self) -> dict:
+        return {
+            **self._stats, "rpm_limite": self._rpm,
+            "en_ventana": len(self._ventana),
+            "cache": self._cache.stats()
+        }
+
+
+tavily = TavilyClient()
+
+
+async def search_tavily(query: str) -> dict:
+    """Búsqueda general (tool buscar_web_tavily)."""
+    return await tavily.buscar(query, "advanced", call_site="tool_buscar_web")
@@ -62,16 +62,15 @@ async def send_audio_whatsapp(phone: str, media_id: str) -> bool:
         return False
     phone_clean = phone.replace("+", "").replace(" ", "").replace("-", "")
     try:
-        url = f"https://graph.facebook.com/v18.0/{WHATSAPP_PHONE_ID}/messages"
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                url,
-                headers={"Authorization": f"Bearer {WHATSAPP_TOKEN}", "Content-Type": "application/json"},
-                json={"messaging_product": "whatsapp", "recipient_type": "individual", "to": phone_clean, "type": "audio", "audio": {"id": media_id}}
-            )
-            if response.status_code == 200:
-                logger.info(f"[TTS] ✓ Audio enviado a {phone_clean}")
-                return True
+        # Misma cola que los textos: respeta orden y rate limit
+        from services.whatsapp import dispatcher
+        result = await dispatcher.submit(
+            phone_clean,
+            {"messaging_product": "whatsapp", "recipient_type": "individual", "to": phone_clean, "type": "audio", "audio": {"id": media_id}}
+        )
+        if result.get("success"):
+            logger.info(f"[TTS] ✓ Audio enviado a {phone_clean}")
+            return True
         return False
     except Exception as e:
         logger.error(f"[TTS] Error send: {e}")
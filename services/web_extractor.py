@@ -4,6 +4,8 @@ Pipeline: Firecrawl (primero) → Jina AI (backup) → Tavily → Regex → GPT-
 """
 import os
 import re
+import time
+import asyncio
 import httpx
 import json
 import logging
@@ -13,10 +15,20 @@ from urllib.parse import urlparse
 from config import TAVILY_API_KEY, OPENAI_API_KEY, JINA_API_KEY, FIRECRAWL_API_KEY
 from services.social_research import (buscar_linkedin_en_web,
                                       buscar_linkedin_por_email)
+from services.gpt_cache import gpt_cache
+from services.tavily_search import tavily
+from utils.token_budget import pack_content
 
 logger = logging.getLogger(__name__)
 
 HTTP_TIMEOUT = 30.0
+GPT_CONTENT_TOKENS = 6000
+# Subir cuando cambie el prompt de extract_with_gpt (invalida el cache)
+GPT_PROMPT_VERSION = "extraccion-v1"
+# Homepages descargadas por adelantado (ver speculative_research)
+PREFETCH_TTL_SECONDS = 600
+
+_prefetch_html = {}
 
 
 def clean_url(url: str) -> str:
@@ -130,10 +142,34 @@ async def fetch_with_jina(website: str) -> str:
         return ""
 
 
+def prefetch_homepage(url: str) -> asyncio.Task:
+    """
+    Lanza la descarga de la homepage por adelantado; fetch_html_direct
+    reutiliza la tarea si se pide la misma URL dentro del TTL.
+    """
+    ahora = time.time()
+    for clave in [k for k, (ts, _) in _prefetch_html.items()
+                  if ahora - ts > PREFETCH_TTL_SECONDS]:
+        del _prefetch_html[clave]
+
+    if url not in _prefetch_html:
+        _prefetch_html[url] = (ahora,
+                               asyncio.create_task(_descargar_html(url)))
+    return _prefetch_html[url][1]
+
+
 async def fetch_html_direct(url: str) -> str:
     """
     Fetch HTML directo como último recurso.
     """
+    prefetch = _prefetch_html.pop(url, None)
+    if prefetch and time.time() - prefetch[0] <= PREFETCH_TTL_SECONDS:
+        logger.info(f"[HTTP] Usando homepage pre-descargada: {url}")
+        return await prefetch[1]
+    return await _descargar_html(url)
+
+
+async def _descargar_html(url: str) -> str:
     try:
         headers = {
             "User-Agent":
@@ -154,60 +190,27 @@ async def fetch_html_direct(url: str) -> str:
 
 async def fetch_with_tavily(website: str) -> str:
     """Fallback usando Tavily cuando otros métodos fallan por DNS."""
-    if not TAVILY_API_KEY:
-        return ""
-    try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                "https://api.tavily.com/search",
-                json={
-                    "api_key": TAVILY_API_KEY,
-                    "query":
-                    f"site:{website} empresa servicios contacto nosotros",
-                    "search_depth": "advanced",
-                    "include_raw_content": True,
-                    "max_results": 5
-                })
-            if response.status_code == 200:
-                data = response.json()
-                results = data.get("results", [])
-                content_parts = []
-                for r in results:
-                    if r.get("raw_content"):
-                        content_parts.append(r["raw_content"])
-                    elif r.get("content"):
-                        content_parts.append(r["content"])
-                return "\n\n".join(content_parts)
-    except Exception as e:
-        logger.error(f"[TAVILY] Error: {e}")
-    return ""
+    data = await tavily.buscar(
+        f"site:{website} empresa servicios contacto nosotros",
+        "advanced",
+        call_site="fetch_with_tavily",
+        include_answer=False)
+    content_parts = []
+    for r in data.get("results", []):
+        if r.get("raw_content"):
+            content_parts.append(r["raw_content"])
+        elif r.get("content"):
+            content_parts.append(r["content"])
+    return "\n\n".join(content_parts)
 
 
 async def search_with_tavily(query: str) -> dict:
     """
     Búsqueda web con Tavily para datos complementarios.
     """
-    if not TAVILY_API_KEY:
-        return {}
-
-    try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post("https://api.tavily.com/search",
-                                         json={
-                                             "api_key": TAVILY_API_KEY,
-                                             "query": query,
-                                             "search_depth": "advanced",
-                                             "max_results": 5,
-                                             "include_answer": True,
-                                             "include_raw_content": True
-                                         })
-
-            if response.status_code == 200:
-                return response.json()
-            return {}
-    except Exception as e:
-        logger.error(f"[TAVILY] Error: {e}")
-        return {}
+    return await tavily.buscar(query,
+                               "advanced",
+                               call_site="search_with_tavily")
 
 
 def extract_schema_org(html_content: str) -> dict:
@@ -1705,6 +1708,9 @@ Si no encuentras ciudad en el contenido, buscar en el título.
     if ciudad_del_titulo:
         instruccion_city = f'- city: Ciudad (revisar también el TÍTULO de la página. Si el título tiene "{ciudad_del_titulo}", usar ese valor)'
 
+    # Chunks con más datos de contacto/dirección/equipo/servicios
+    contenido_gpt = pack_content(all_content, GPT_CONTENT_TOKENS)
+
     prompt = f"""Extraé los siguientes datos del contenido de este sitio web ({website}).
 Respondé SOLO con JSON válido, sin explicaciones.
 Si no encontrás un dato, usá "No encontrado".
@@ -1732,10 +1738,17 @@ DATOS A EXTRAER:
 - facebook_empresa: URL Facebook de la empresa
 
 CONTENIDO DEL SITIO:
-{all_content[:30000]}
+{contenido_gpt}
 
 JSON:"""
 
+    cache_key = gpt_cache.make_key("extract_with_gpt", GPT_PROMPT_VERSION,
+                                   website, titulo_pagina, contenido_gpt)
+    cached = gpt_cache.get("extract_with_gpt", cache_key)
+    if cached is not None:
+        logger.info(f"[GPT] ✓ Datos desde cache (sitio sin cambios)")
+        return dict(cached)
+
     try:
         async with httpx.AsyncClient(timeout=60.0) as client:
             response = await client.post(
@@ -1768,7 +1781,10 @@ JSON:"""
                     content = content[:-3]
 
                 logger.info(f"[GPT] ✓ Datos extraídos correctamente")
-                return json.loads(content.strip())
+                gpt_data = json.loads(content.strip())
+                if isinstance(gpt_data, dict):
+                    gpt_cache.set("extract_with_gpt", cache_key, gpt_data)
+                return gpt_data
             else:
                 logger.error(f"[GPT] Error {response.status_code}")
                 return {}
@@ -2377,68 +2393,61 @@ async def buscar_whatsapp_externo(website: str, empresa: str = "") -> str:
         logger.info(f"[WA-EXTERNO] Buscando: {query}")
 
         try:
-            async with httpx.AsyncClient(timeout=20.0) as client:
-                response = await client.post("https://api.tavily.com/search",
-                                             json={
-                                                 "api_key": TAVILY_API_KEY,
-                                                 "query": query,
-                                                 "search_depth": "basic",
-                                                 "max_results": 10,
-                                                 "include_answer": False
-                                             })
-
-                if response.status_code != 200:
-                    continue
+            data = await tavily.buscar(query,
+                                       "basic",
+                                       call_site="whatsapp_externo",
+                                       max_results=10)
+            if not data:
+                continue
 
-                data = response.json()
-                results = data.get("results", [])
-
-                wa_patterns = [
-                    r'wa\.me/(\d{10,15})',
-                    r'whatsapp\.com/send\?phone=(\d{10,15})',
-                    r'phone\s+(?:number\s+)?(?:is\s+)?\+?(\d[\d\s\-]{9,14})',
-                    r'teléfono[:\s]+\+?(\d[\d\s\-]{9,14})',
-                    r'celular[:\s]+\+?(\d[\d\s\-]{9,14})',
-                    r'whatsapp[:\s]+\+?(\d[\d\s\-]{9,14})',
-                    r'\+(\d{2,4}\s?\d{6,12})',
-                ]
-
-                for r in results:
-                    texto = f"{r.get('title', '')} {r.get('content', '')}"
-                    url = r.get('url', '')
-
-                    for pattern in wa_patterns:
-                        matches = re.findall(pattern, texto, re.IGNORECASE)
-                        for match in matches:
-                            num = re.sub(r'[^\d]', '', match)
-
-                            if len(num) < 10 or len(num) > 15:
+            results = data.get("results", [])
+
+            wa_patterns = [
+                r'wa\.me/(\d{10,15})',
+                r'whatsapp\.com/send\?phone=(\d{10,15})',
+                r'phone\s+(?:number\s+)?(?:is\s+)?\+?(\d[\d\s\-]{9,14})',
+                r'teléfono[:\s]+\+?(\d[\d\s\-]{9,14})',
+                r'celular[:\s]+\+?(\d[\d\s\-]{9,14})',
+                r'whatsapp[:\s]+\+?(\d[\d\s\-]{9,14})',
+                r'\+(\d{2,4}\s?\d{6,12})',
+            ]
+
+            for r in results:
+                texto = f"{r.get('title', '')} {r.get('content', '')}"
+                url = r.get('url', '')
+
+                for pattern in wa_patterns:
+                    matches = re.findall(pattern, texto, re.IGNORECASE)
+                    for match in matches:
+                        num = re.sub(r'[^\d]', '', match)
+
+                        if len(num) < 10 or len(num) > 15:
+                            continue
+
+                        # Filtrar fijos argentinos
+                        if num.startswith('54') and len(num) >= 12:
+                            if not num.startswith('549'):
                                 continue
 
-                            # Filtrar fijos argentinos
-                            if num.startswith('54') and len(num) >= 12:
-                                if not num.startswith('549'):
-                                    continue
-
-                            # Validar código de país (LATAM + España + USA)
-                            codigos_validos = [
-                                '54', '52', '57', '56', '51', '55',
-                                '598', '595', '593', '58', '591',
-                                '506', '507', '34', '1',
-                            ]
-                            es_valido = any(
-                                num.startswith(c) for c in codigos_validos
+                        # Validar código de país (LATAM + España + USA)
+                        codigos_validos = [
+                            '54', '52', '57', '56', '51', '55',
+                            '598', '595', '593', '58', '591',
+                            '506', '507', '34', '1',
+                        ]
+                        es_valido = any(
+                            num.startswith(c) for c in codigos_validos
+                        )
+                        if not es_valido:
+                            logger.debug(
+                                f"[WA-EXTERNO] Descartado (país): +{num}"
                             )
-                            if not es_valido:
-                                logger.debug(
-                                    f"[WA-EXTERNO] Descartado (país): +{num}"
-                                )
-                                continue
+                            continue
 
-                            resultado = '+' + num
-                            logger.info(
-                                f"[WA-EXTERNO] ✓ Encontrado: {resultado}")
-                            return resultado
+                        resultado = '+' + num
+                        logger.info(
+                            f"[WA-EXTERNO] ✓ Encontrado: {resultado}")
+                        return resultado
 
         except Exception as e:
             logger.error(f"[WA-EXTERNO] Error: {e}")
@@ -2532,9 +2541,10 @@ async def extract_web_data(website: str, nombre_contacto: str = "") -> dict:
     regex_data = extract_with_regex(all_content)
 
     # 10. Extracción GPT (con título para detectar ciudad)
+    # Recibe el contenido sin recortar: el packer elige los mejores chunks
     logger.info(f"[GPT] Extrayendo datos estructurados...")
-    gpt_data = await extract_with_gpt(all_content, website_clean,
-                                      titulo_pagina)
+    gpt_data = await extract_with_gpt(main_content or all_content,
+                                      website_clean, titulo_pagina)
 
     # 10. Merge de resultados (pasar all_content para extracción por contexto)
     resultado = merge_results(gpt_data, regex_data, "",
@@ -3,14 +3,246 @@ Servicio WhatsApp Business API para DANIA/Fortia
 Incluye: envío de mensajes, descarga de media, transcripción de audio
 """
 import os
+import time
+import random
+import asyncio
 import logging
+from collections import deque
+from typing import Optional
+
 import httpx
 
+from config import WHATSAPP_MESSAGES_PER_SECOND, WHATSAPP_MAX_RETRIES
+from services.message_status import status_buffer
+
 logger = logging.getLogger(__name__)
 
 WHATSAPP_API_URL = "https://graph.facebook.com/v18.0"
 MAX_MESSAGE_LENGTH = 4000
 
+# Solo se reintenta lo que seguro no llegó a Meta: 429 y errores de
+# conexión antes de enviar el request. Un timeout de lectura o un 5xx
+# pueden haber entregado el mensaje y reintentarlos lo duplica.
+RETRY_STATUS_CODES = {429}
+RETRY_EXCEPTIONS = (httpx.ConnectError, httpx.ConnectTimeout,
+                    httpx.PoolTimeout)
+RETRY_BASE_SECONDS = 0.5
+RETRY_MAX_SECONDS = 8.0
+
+
+# ═══════════════════════════════════════════════════════════════════
+# DISPATCHER DE SALIDA (cola por destinatario + rate limit global)
+# ═══════════════════════════════════════════════════════════════════
+class _RateLimiter:
+    """Espaciado global de envíos: 1 mensaje cada 1/rate segundos."""
+
+    def __init__(self, rate: float):
+        self._interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._next = max(now, self._next) + self._interval
+
+
+class OutboundDispatcher:
+    """
+    Cola de salida de WhatsApp.
+    - Orden garantizado por destinatario (un worker por número)
+    - Presupuesto global de mensajes/segundo (tier de Meta)
+    - Reintentos con backoff exponencial + jitter en 429 y errores de
+      conexión (sin reintentar lo que pudo haberse entregado)
+    - Una sola conexión HTTP reutilizada (pool de httpx)
+    - Lotes: si falla una parte, el worker descarta las siguientes
+    Cada envío retorna un Future con el resultado de la entrega.
+    """
+
+    def __init__(self,
+                 messages_per_second: float = WHATSAPP_MESSAGES_PER_SECOND,
+                 max_retries: int = WHATSAPP_MAX_RETRIES):
+        self._limiter = _RateLimiter(messages_per_second)
+        self._max_retries = max_retries
+        self._queues = {}
+        self._workers = {}
+        self._client: Optional[httpx.AsyncClient] = None
+        self._latencias = deque(maxlen=500)
+        self._stats = {
+            "enviados": 0,
+            "fallidos": 0,
+            "reintentos": 0,
+            "descartados": 0
+        }
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=30.0,
+                limits=httpx.Limits(max_connections=20,
+                                    max_keepalive_connections=10))
+        return self._client
+
+    async def close(self):
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+    def submit(self,
+               to: str,
+               payload: dict,
+               lote: Optional[dict] = None) -> asyncio.Future:
+        """
+        Encola un payload para `to`. Retorna Future con el resultado.
+        lote: dict compartido por las partes de un mismo mensaje; si una
+        falla, el worker marca lote["fallido"] y no envía las siguientes.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        queue = self._queues.get(to)
+        if queue is None:
+            queue = asyncio.Queue()
+            self._queues[to] = queue
+        queue.put_nowait((payload, future, time.monotonic(), lote))
+
+        if to not in self._workers:
+            self._workers[to] = asyncio.create_task(self._worker(to, queue))
+
+        return future
+
+    async def _worker(self, to: str, queue: asyncio.Queue):
+        """Envía en orden los mensajes de un destinatario y termina al vaciar."""
+        while True:
+            try:
+                payload, future, encolado, lote = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                self._workers.pop(to, None)
+                self._queues.pop(to, None)
+                return
+
+            if future.cancelled():
+                continue
+
+            if lote is not None and lote.get("fallido"):
+                self._stats["descartados"] += 1
+                if not future.done():
+                    future.set_result({"success": False,
+                                       "error": "Parte anterior fallida"})
+                continue
+
+            try:
+                result = await self._send_with_retries(payload)
+            except Exception as e:
+                result = {"success": False, "error": str(e)}
+
+            self._latencias.append(time.monotonic() - encolado)
+            if result.get("success"):
+                self._stats["enviados"] += 1
+                status_buffer.record_sent(result.get("message_id", ""), to)
+            else:
+                self._stats["fallidos"] += 1
+                if lote is not None:
+                    lote["fallido"] = True
+
+            if not future.done():
+                future.set_result(result)
+
+    async def _send_with_retries(self, payload: dict) -> dict:
+        token = os.environ.get("WHATSAPP_TOKEN", "")
+        phone_id = os.environ.get("WHATSAPP_PHONE_NUMBER_ID", "")
+        if not token or not phone_id:
+            return {"success": False,
+                    "error": "Credenciales WhatsApp no configuradas"}
+
+        url = f"{WHATSAPP_API_URL}/{phone_id}/messages"
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json"
+        }
+
+        result = {"success": False, "error": "Sin intentos"}
+        for intento in range(self._max_retries + 1):
+            await self._limiter.acquire()
+            retry_after = None
+
+            try:
+                response = await self._get_client().post(url,
+                                                         json=payload,
+                                                         headers=headers)
+                if response.status_code == 200:
+                    messages = response.json().get("messages", [])
+                    return {
+                        "success": True,
+                        "message_id":
+                        messages[0].get("id", "") if messages else ""
+                    }
+
+                result = {
+                    "success": False,
+                    "error": f"Error API: {response.status_code}",
+                    "details": response.text
+                }
+                if response.status_code not in RETRY_STATUS_CODES:
+                    logger.error(f"Error WhatsApp API: {response.status_code}"
+                                 f" - {response.text}")
+                    return result
+                retry_after = response.headers.get("Retry-After")
+
+            except RETRY_EXCEPTIONS as e:
+                result = {"success": False, "error": f"Conexión: {e}"}
+            except (httpx.TimeoutException, httpx.TransportError) as e:
+                # Pudo haber llegado: no reintentar para no duplicar
+                logger.error(f"[WA-QUEUE] ✗ Envío incierto, sin reintento: "
+                             f"{type(e).__name__} {e}")
+                return {"success": False,
+                        "error": "Timeout" if isinstance(
+                            e, httpx.TimeoutException) else str(e)}
+
+            if intento >= self._max_retries:
+                break
+
+            espera = min(RETRY_BASE_SECONDS * (2**intento), RETRY_MAX_SECONDS)
+            espera *= random.uniform(0.5, 1.5)
+            if retry_after:
+                try:
+                    espera = max(espera, float(retry_after))
+                except ValueError:
+                    pass
+
+            self._stats["reintentos"] += 1
+            logger.warning(f"[WA-QUEUE] {result.get('error')} → reintento "
+                           f"{intento + 1}/{self._max_retries} en {espera:.1f}s")
+            await asyncio.sleep(espera)
+
+        logger.error(f"[WA-QUEUE] ✗ Envío fallido tras reintentos: "
+                     f"{result.get('error')}")
+        return result
+
+    def stats(self) -> dict:
+        """Profundidad de cola y latencia de envío (encolado → resultado)."""
+        latencias = sorted(self._latencias)
+
+        def percentil(p):
+            if not latencias:
+                return 0.0
+            return round(latencias[min(int(len(latencias) * p),
+                                       len(latencias) - 1)], 3)
+
+        return {
+            "queue_depth": sum(q.qsize() for q in self._queues.values()),
+            "destinatarios_activos": len(self._workers),
+            **self._stats,
+            "latencia_p50_s": percentil(0.5),
+            "latencia_p95_s": percentil(0.95)
+        }
+
+
+dispatcher = OutboundDispatcher()
+
 
 def split_long_message(message: str, max_length: int = MAX_MESSAGE_LENGTH) -> list:
     """Divide mensajes largos en partes."""
@@ -48,6 +280,7 @@ async def send_whatsapp_message(to: str, message: str) -> dict:
     """
     Envía un mensaje de texto por WhatsApp.
     Si el mensaje es largo, lo divide en partes.
+    Las partes pasan por el dispatcher (orden, rate limit y reintentos).
     """
     try:
         token = os.environ.get("WHATSAPP_TOKEN", "")
@@ -60,45 +293,35 @@ async def send_whatsapp_message(to: str, message: str) -> dict:
         to_clean = to.lstrip('+')
         message_parts = split_long_message(message)
         
-        url = f"{WHATSAPP_API_URL}/{phone_id}/messages"
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json"
-        }
+        # Encolar todas las partes: el worker del destinatario las envía en
+        # orden y, si una falla, descarta el resto del lote
+        lote = {"fallido": False}
+        futures = []
+        for part in message_parts:
+            payload = {
+                "messaging_product": "whatsapp",
+                "recipient_type": "individual",
+                "to": to_clean,
+                "type": "text",
+                "text": {
+                    "preview_url": True,
+                    "body": part
+                }
+            }
+            futures.append(dispatcher.submit(to_clean, payload, lote))
         
         sent_ids = []
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            for i, part in enumerate(message_parts):
-                payload = {
-                    "messaging_product": "whatsapp",
-                    "recipient_type": "individual",
-                    "to": to_clean,
-                    "type": "text",
-                    "text": {
-                        "preview_url": True,
-                        "body": part
-                    }
+        for future in futures:
+            result = await future
+            if result.get("success"):
+                sent_ids.append(result.get("message_id", ""))
+            else:
+                return {
+                    "success": False,
+                    "error": result.get("error", ""),
+                    "details": result.get("details", "")
                 }
-                
-                response = await client.post(url, json=payload, headers=headers)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    messages = data.get("messages", [])
-                    if messages:
-                        sent_ids.append(messages[0].get("id", ""))
-                    
-                    if i < len(message_parts) - 1:
-                        import asyncio
-                        await asyncio.sleep(0.5)
-                else:
-                    logger.error(f"Error WhatsApp API: {response.status_code} - {response.text}")
-                    return {
-                        "success": False,
-                        "error": f"Error API: {response.status_code}",
-                        "details": response.text
-                    }
         
         logger.info(f"✓ Mensaje enviado a {to_clean} ({len(message_parts)} parte(s))")
         return {
@@ -108,9 +331,6 @@ async def send_whatsapp_message(to: str, message: str) -> dict:
             "parts_sent": len(message_parts)
         }
     
-    except httpx.TimeoutException:
-        logger.error("Timeout enviando mensaje WhatsApp")
-        return {"success": False, "error": "Timeout"}
     except Exception as e:
         logger.error(f"Error enviando WhatsApp: {e}")
         return {"success": False, "error": str(e)}
@@ -269,13 +489,6 @@ async def send_template_reminder_24h(
     
     phone_clean = phone.lstrip('+')
     
-    url = f"{WHATSAPP_API_URL}/{phone_id}/messages"
-    
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json"
-    }
-    
     payload = {
         "messaging_product": "whatsapp",
         "to": phone_clean,
@@ -300,20 +513,19 @@ async def send_template_reminder_24h(
     }
     
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(url, headers=headers, json=payload)
-            
-            if response.status_code == 200:
-                logger.info(
-                    f"[TEMPLATE] ✓ reminder_24h_ enviado a {phone}"
-                )
-                return True
-            else:
-                logger.error(
-                    f"[TEMPLATE] ✗ Error {response.status_code}: "
-                    f"{response.text}"
-                )
-                return False
+        result = await dispatcher.submit(phone_clean, payload)
+        
+        if result.get("success"):
+            logger.info(
+                f"[TEMPLATE] ✓ reminder_24h_ enviado a {phone}"
+            )
+            return True
+        else:
+            logger.error(
+                f"[TEMPLATE] ✗ Error {result.get('error')}: "
+                f"{result.get('details', '')}"
+            )
+            return False
     except Exception as e:
         logger.error(f"[TEMPLATE] Error enviando plantilla: {e}")
         return False
@@ -0,0 +1,80 @@
+"""Ventana de historial y resumen (services/conversation_summary.py)"""
+from services import conversation_summary as modulo
+from services.conversation_summary import (historial_para_agente,
+                                           ventana_historial,
+                                           _mensajes_fuera_de_ventana,
+                                           HISTORY_MAX_MESSAGES,
+                                           RESUMEN_MIN_MENSAJES)
+from utils.token_budget import count_tokens
+
+
+def _historial(n: int) -> list:
+    return [{
+        "role": "user" if i % 2 == 0 else "assistant",
+        "content": f"mensaje {i}"
+    } for i in range(n)]
+
+
+def test_cola_sin_resumir_entra_al_prompt():
+    # 24 mensajes, resumen de los primeros 0: faltan 4 por plegar
+    historial = _historial(HISTORY_MAX_MESSAGES + 4)
+    assert _mensajes_fuera_de_ventana(historial) == 4
+
+    mensajes = historial_para_agente(historial, len(historial), 0)
+    assert mensajes == historial
+
+
+def test_lo_resumido_no_se_repite():
+    historial = _historial(40)
+    resumidos = _mensajes_fuera_de_ventana(historial)
+
+    mensajes = historial_para_agente(historial, len(historial), resumidos)
+    assert mensajes == ventana_historial(historial)
+    assert len(mensajes) == HISTORY_MAX_MESSAGES
+
+
+def test_historial_parcial_usa_el_total():
+    # El agente tiene los últimos 26 de una charla de 60; resumen hasta 35
+    completo = _historial(60)
+    parcial = completo[-(HISTORY_MAX_MESSAGES + RESUMEN_MIN_MENSAJES):]
+
+    mensajes = historial_para_agente(parcial, 60, 35)
+    assert mensajes == completo[35:]
+
+
+def test_sin_total_solo_ventana():
+    historial = _historial(30)
+    assert historial_para_agente(historial, None, 0) == \
+        ventana_historial(historial)
+
+
+def test_sin_historial():
+    assert historial_para_agente([], 0, 0) == []
+
+
+def test_cola_atrasada_respeta_el_presupuesto(monkeypatch):
+    monkeypatch.setattr(modulo, "HISTORY_TOKEN_BUDGET", 40)
+    historial = _historial(HISTORY_MAX_MESSAGES + RESUMEN_MIN_MENSAJES)
+
+    mensajes = historial_para_agente(historial, len(historial), 0)
+    assert mensajes == historial[-len(mensajes):]
+    assert sum(count_tokens(m["content"]) + 4 for m in mensajes) <= 40
+
+
+def test_el_resumen_descuenta_del_presupuesto(monkeypatch):
+    monkeypatch.setattr(modulo, "HISTORY_TOKEN_BUDGET", 60)
+    historial = _historial(10)
+    resumen = "lead de retail en Rosario " * 4
+
+    sin_resumen = historial_para_agente(historial, 10, 0)
+    con_resumen = historial_para_agente(historial, 10, 0, resumen)
+    assert len(con_resumen) < len(sin_resumen)
+
+
+def test_resumen_mas_largo_que_el_historial():
+    # Historial de 26 de una charla de 60, resumen hasta 50: solo la cola
+    completo = _historial(60)
+    parcial = completo[-(HISTORY_MAX_MESSAGES + RESUMEN_MIN_MENSAJES):]
+
+    assert historial_para_agente(parcial, 60, 50) == \
+        ventana_historial(parcial)
@@ -0,0 +1,55 @@
+"""Índice local de DANIA (services/dania_knowledge.py)"""
+import asyncio
+
+from services import dania_knowledge as modulo
+
+
+def _sin_indice(monkeypatch):
+    monkeypatch.setattr(modulo, "_indice", None)
+    monkeypatch.setattr(modulo, "_indice_actualizado", 0.0)
+    monkeypatch.setattr(modulo, "_indice_fallo", 0.0)
+    monkeypatch.setattr(modulo, "_guardar_paginas_mongo", lambda pages: None)
+
+
+def test_fetch_fallido_no_se_reintenta_enseguida(monkeypatch):
+    _sin_indice(monkeypatch)
+    monkeypatch.setattr(modulo, "_cargar_paginas_mongo", lambda: None)
+    pedidas = []
+
+    async def fetch_caido(url):
+        pedidas.append(url)
+        return None
+
+    monkeypatch.setattr(modulo, "fetch_dania_page_jina", fetch_caido)
+
+    async def correr():
+        await modulo.refrescar_indice_dania()
+        return await modulo.buscar_chunks_dania("precios")
+
+    assert asyncio.run(correr()) == []
+    assert len(pedidas) == len(modulo.DANIA_PAGES)
+
+
+def test_fetch_fallido_usa_paginas_vencidas(monkeypatch):
+    _sin_indice(monkeypatch)
+    monkeypatch.setattr(modulo, "_construir_indice",
+                        lambda pages: setattr(modulo, "_indice", pages))
+    monkeypatch.setattr(
+        modulo, "_cargar_paginas_mongo", lambda: {
+            "paginas": [{
+                "url": "https://hello.dania.ai/precios",
+                "contenido": "Planes y precios"
+            }],
+            "actualizado_en": modulo.datetime(2020, 1, 1,
+                                              tzinfo=modulo.timezone.utc)
+        })
+
+    async def fetch_caido(url):
+        return None
+
+    monkeypatch.setattr(modulo, "fetch_dania_page_jina", fetch_caido)
+
+    asyncio.run(modulo.refrescar_indice_dania())
+    assert modulo._indice == {
+        "https://hello.dania.ai/precios": "Planes y precios"
+    }
@@ -0,0 +1,133 @@
+"""
+Peso de perfiles de LinkedIn (services/social_research.py)
+Los pesos esperados salen de calcular_peso_linkedin antes de pasarla a
+EvaluadorLinkedin (mismos datos, mismo resultado).
+"""
+import pytest
+
+from services.social_research import EvaluadorLinkedin
+
+# (primer_nombre, apellido, empresa, provincia, ciudad, pais)
+ROSARIO = ("Rafael", "Driuzzi", "Fortia Agencia", "Santa Fe", "Rosario",
+           "Argentina")
+MEXICO = ("María", "González", "Grupo Bimbo", "Jalisco", "Guadalajara",
+          "México")
+ESPANA = ("Jordi", "Puig", "Puig", "Cataluña", "Barcelona", "España")
+BRASIL = ("João", "Silva", "Natura", "São Paulo", "São Paulo", "Brasil")
+SIN_DATOS = ("Ana", "Li", "", "", "", "")
+
+# (url, texto, persona, peso)
+GOLDEN = [
+    ("https://www.linkedin.com/in/rafael-driuzzi",
+     "Rafael Driuzzi - CEO en Fortia Agencia - Rosario, Santa Fe, Argentina",
+     ROSARIO, 100),
+    ("https://ar.linkedin.com/in/rafael-driuzzi-123abc",
+     "Rafael Driuzzi. Fundador de Fortia. Rosario",
+     ROSARIO, 90),
+    ("https://ar.linkedin.com/in/rafaeldriuzzi",
+     "Marketing digital",
+     ROSARIO, 83),
+    ("https://py.linkedin.com/in/rafael-driuzzi",
+     "Rafael Driuzzi - Asunción, Paraguay",
+     ROSARIO, 53),
+    ("https://mx.linkedin.com/in/rafael-driuzzi",
+     "Rafael Driuzzi - Fortia Agencia",
+     ROSARIO, 60),
+    ("https://www.linkedin.com/in/jose-filippini",
+     "Fortia Agencia Rosario Santa Fe",
+     ROSARIO, 0),
+    ("https://www.linkedin.com/in/rafael-gomez",
+     "Rafael Gomez Rosario",
+     ROSARIO, 0),
+    ("https://www.linkedin.com/in/samuel_driuzzi",
+     "Driuzzi",
+     ROSARIO, 0),
+    ("https://linkedin.com/in/Rafael-Driuzzi?originalSubdomain=ar",
+     "Trabaja en Argentina",
+     ROSARIO, 83),
+    ("https://www.linkedin.com/in/rafael-driuzzi/es",
+     "Agencia de marketing en la provincia de Santa Fe",
+     ROSARIO, 90),
+    ("https://www.linkedin.com/company/fortia",
+     "Rafael Driuzzi",
+     ROSARIO, 0),
+    ("https://mx.linkedin.com/in/maria-gonzalez-bimbo",
+     "María González - Gerente en Grupo Bimbo - Guadalajara, Jalisco, México",
+     MEXICO, 0),
+    ("https://mx.linkedin.com/in/mariagonzalez",
+     "Ventas en Bimbo. Ciudad de Mexico",
+     MEXICO, 0),
+    ("https://ar.linkedin.com/in/maria-gonzalez",
+     "María González - Buenos Aires, Argentina",
+     MEXICO, 0),
+    ("https://www.linkedin.com/in/maría-gonzález",
+     "Guadalajara",
+     MEXICO, 85),
+    ("https://es.linkedin.com/in/jordi-puig",
+     "Jordi Puig - Director en Puig - Barcelona, Cataluña, España",
+     ESPANA, 100),
+    ("https://es.linkedin.com/in/jordipuigferrer",
+     "Barcelona y alrededores",
+     ESPANA, 85),
+    ("https://uk.linkedin.com/in/jordi-puig",
+     "Jordi Puig - London",
+     ESPANA, 60),
+    ("https://www.linkedin.com/in/jordi-puig",
+     "Spain",
+     ESPANA, 83),
+    ("https://www.linkedin.com/in/ana-li",
+     "Ana Li",
+     SIN_DATOS, 80),
+    ("https://www.linkedin.com/in/a-li",
+     "Ana Li",
+     ("A", "Li", "", "", "", ""), 0),
+    ("https://br.linkedin.com/in/joao-silva",
+     "João Silva - Natura - São Paulo, Brasil",
+     BRASIL, 0),
+    ("https://br.linkedin.com/in/joão-silva-natura",
+     "Gerente na Natura &Co. Sao Paulo",
+     BRASIL, 100),
+    ("https://pt.linkedin.com/in/joão-silva",
+     "Lisboa, Portugal",
+     BRASIL, 50),
+    ("https://www.linkedin.com/in/rafael-driuzzi",
+     "",
+     ROSARIO, 80),
+    ("",
+     "Rafael Driuzzi",
+     ROSARIO, 0),
+    ("https://mx.linkedin.com/in/maría-gonzález-bimbo",
+     "Gerente en Grupo Bimbo - Guadalajara, Jalisco, México",
+     MEXICO, 100),
+    ("https://co.linkedin.com/in/maría-gonzález",
+     "Bimbo Colombia",
+     MEXICO, 55),
+    ("https://ar.linkedin.com/in/ana-li",
+     "Ana Li - Córdoba",
+     SIN_DATOS, 80),
+    ("https://cl.linkedin.com/in/rafael-driuzzi",
+     "Rafael Driuzzi",
+     ("Rafael", "Driuzzi", "", "", "", ""), 80),
+    ("https://www.linkedin.com/in/rafael-driuzzi",
+     "Trabajó en Agencia Norte, Rosario",
+     ("Rafael", "Driuzzi", "Fortia Agencia", "", "Rosario", ""), 90),
+    ("https://uy.linkedin.com/in/rafael-driuzzi",
+     "Montevideo, Uruguay",
+     ("Rafael", "Driuzzi", "", "", "", "Uruguay"), 83),
+]
+
+
+@pytest.mark.parametrize("url, texto, persona, peso", GOLDEN)
+def test_peso_igual_al_original(url, texto, persona, peso):
+    assert EvaluadorLinkedin(*persona).peso(url, texto) == peso
+
+
+def test_pesos_en_lote_igual_que_de_a_uno():
+    por_persona = {}
+    for url, texto, persona, peso in GOLDEN:
+        por_persona.setdefault(persona, []).append(((url, texto), peso))
+    for persona, casos in por_persona.items():
+        evaluador = EvaluadorLinkedin(*persona)
+        assert evaluador.pesos([c for c, _ in casos]) == [
+            p for _, p in casos
+        ]
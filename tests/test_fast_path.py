@@ -0,0 +1,74 @@
+"""Respuesta rápida local (services/fast_path.py)"""
+import pytest
+
+from services import fast_path
+from services.fast_path import clasificar, decidir
+
+HISTORIAL = [{"role": "assistant", "content": "Listo, ya te agendé."}]
+
+
+@pytest.mark.parametrize("texto", [
+    "ok pero cuanto sale",
+    "ok cancelalo",
+    "no gracias",
+    "gracias por la info",
+    "dale pero mañana no puedo",
+    "ok?",
+    "¿ok",
+    "gracias?",
+    "👎",
+    "😡",
+    "🤔",
+    "ok 👎",
+    "si",
+    "no",
+])
+def test_mensajes_con_contenido_van_al_agente(texto):
+    assert clasificar(texto)[0] == "otro"
+    assert decidir(texto, "derivacion", HISTORIAL) is None
+
+
+@pytest.mark.parametrize("texto, clase", [
+    ("ok", "confirmacion"),
+    ("okkkk", "confirmacion"),
+    ("Dale!", "confirmacion"),
+    ("mmm ok", "confirmacion"),
+    ("listo dale", "confirmacion"),
+    ("👍", "confirmacion"),
+    ("👍🏻👍🏻", "confirmacion"),
+    ("gracias", "agradecimiento"),
+    ("graciasss!!", "agradecimiento"),
+    ("perfecto, gracias!", "agradecimiento"),
+    ("buenisimo, mil gracias", "agradecimiento"),
+    ("🙏", "agradecimiento"),
+    ("❤️", "agradecimiento"),
+])
+def test_mensajes_triviales(texto, clase):
+    decision = decidir(texto, "derivacion", HISTORIAL)
+    assert decision is not None
+    assert decision["clase"] == clase
+
+
+def test_margen_no_saturado():
+    # La posterior daba ~1.0 para cualquier texto; el margen no
+    _, margen = fast_path._modelo.predecir("te")
+    assert margen < 1.0
+
+
+def test_pregunta_del_bot_va_al_agente():
+    historial = [{"role": "assistant", "content": "¿Querés que lo agende?"}]
+    assert decidir("dale", "derivacion", historial) is None
+
+
+def test_sin_historial_va_al_agente():
+    assert decidir("gracias", "derivacion", []) is None
+
+
+def test_sticker_se_absorbe():
+    decision = decidir("[Mensaje tipo sticker recibido]", "derivacion",
+                       HISTORIAL)
+    assert decision == {
+        "clase": "sticker",
+        "confianza": 1.0,
+        "respuesta": None
+    }
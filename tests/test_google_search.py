@@ -0,0 +1,58 @@
+"""Cliente de Google CSE (services/google_search.py)"""
+import asyncio
+
+import httpx
+
+from services import google_search as modulo
+from services.google_search import GoogleCSEClient
+
+
+def _cliente(monkeypatch, respuesta):
+
+    async def get(self, url):
+        return respuesta
+
+    monkeypatch.setattr(httpx.AsyncClient, "get", get)
+    monkeypatch.setattr(modulo, "GOOGLE_API_KEY", "clave")
+    monkeypatch.setattr(modulo, "GOOGLE_SEARCH_CX", "cx")
+    cliente = GoogleCSEClient(cuota_diaria=100, reserva=10)
+    cliente._dia = modulo._dia_cuota()
+    monkeypatch.setattr(cliente, "_registrar_uso", lambda dia: None)
+    return cliente
+
+
+def _429(razon, mensaje):
+    return httpx.Response(429,
+                          json={
+                              "error": {
+                                  "code": 429,
+                                  "message": mensaje,
+                                  "errors": [{
+                                      "reason": razon
+                                  }]
+                              }
+                          })
+
+
+def test_429_por_minuto_pausa_sin_agotar_el_dia(monkeypatch):
+    cliente = _cliente(
+        monkeypatch,
+        _429("rateLimitExceeded",
+             "Quota exceeded for quota metric 'Queries' and limit "
+             "'Queries per minute per user'"))
+
+    assert asyncio.run(cliente._request("arcor", 10, "")) == {}
+    assert cliente.restante() == 100
+    assert not cliente.disponible()
+    assert not cliente._reservar(opcional=False)
+    assert cliente.stats()["rate_limit_api"] == 1
+
+
+def test_429_diario_agota_la_cuota(monkeypatch):
+    cliente = _cliente(monkeypatch,
+                       _429("dailyLimitExceeded", "Daily Limit Exceeded"))
+
+    asyncio.run(cliente._request("arcor", 10, ""))
+    assert cliente.restante() == 0
+    assert not cliente.disponible()
+    assert cliente.stats()["cuota_agotada_api"] == 1
@@ -0,0 +1,42 @@
+"""Buffer de estados de entrega (services/message_status.py)"""
+import asyncio
+
+from pymongo.errors import PyMongoError
+
+from services import message_status as modulo
+from services.message_status import MessageStatusBuffer
+
+
+class ColeccionCaida:
+
+    def bulk_write(self, ops, ordered=True):
+        raise PyMongoError("sin conexión")
+
+
+def _estado(message_id):
+    return {"id": message_id, "status": "delivered", "timestamp": "1"}
+
+
+def test_flush_fallido_devuelve_las_ops_al_frente(monkeypatch):
+    monkeypatch.setattr(modulo, "get_database",
+                        lambda: {modulo.COLLECTION_NAME: ColeccionCaida()})
+    buffer = MessageStatusBuffer()
+    buffer.ingest([_estado("wamid.1"), _estado("wamid.2")])
+    asyncio.run(buffer.flush())
+    buffer.ingest([_estado("wamid.3")])
+
+    assert [op._filter["_id"] for op in buffer._ops] == [
+        "wamid.1", "wamid.2", "wamid.3"
+    ]
+    assert buffer.stats()["flushes_fallidos"] == 1
+
+
+def test_sin_base_se_conserva_hasta_el_tope(monkeypatch):
+    monkeypatch.setattr(modulo, "get_database", lambda: None)
+    monkeypatch.setattr(modulo, "MAX_OPS_EN_BUFFER", 2)
+    buffer = MessageStatusBuffer()
+    buffer.ingest([_estado(f"wamid.{i}") for i in range(3)])
+    asyncio.run(buffer.flush())
+
+    assert [op._filter["_id"] for op in buffer._ops] == ["wamid.1", "wamid.2"]
+    assert buffer.stats()["ops_descartadas"] == 1
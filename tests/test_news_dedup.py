@@ -0,0 +1,100 @@
+"""Casi-duplicados de noticias (services/news_dedup.py)"""
+import asyncio
+
+import pytest
+
+from services import mongodb, news_dedup, social_research
+from services.news_dedup import (colapsar, distancia, simhash,
+                                 texto_para_huella, _clave_empresa,
+                                 UMBRAL_HAMMING)
+
+# La misma nota de Google CSE en cuatro medios: fecha antepuesta,
+# "..." y cada snippet cortado en otro punto
+SINDICADAS = [
+    ("Arcor invierte $5.000 millones en una nueva planta en Córdoba - La Voz",
+     "15 mar 2024 ... La compañía Arcor anunció una inversión de $5.000 "
+     "millones para construir una nueva planta de producción en la "
+     "localidad de Arroyito, que generará 200 ..."),
+    ("Arcor invierte $5.000 millones en una nueva planta en Córdoba | Infobae",
+     "La compañía Arcor anunció una inversión de $5.000 millones para "
+     "construir una nueva planta de producción en la localidad de "
+     "Arroyito, que generará 200 puestos de trabajo directos y ..."),
+    ("Arcor invierte $5.000 millones en una nueva planta en Córdoba - Perfil",
+     "hace 2 días ... La compañía Arcor anunció una inversión de $5.000 "
+     "millones para construir una nueva ..."),
+    ("Arcor invierte $5.000 millones en nueva planta en Córdoba",
+     "Mar 15, 2024 — La compañía Arcor anunció una inversión de $5.000 "
+     "millones para construir una nueva planta de producción en "
+     "Arroyito…"),
+]
+
+OTRAS = [
+    ("Arcor lanza una nueva línea de alfajores sin TACC - Clarín",
+     "12 feb 2024 ... Arcor presentó su nueva línea de alfajores aptos "
+     "para celíacos, que llegará a los kioscos de todo el país en marzo "
+     "..."),
+    ("Arcor cerró su planta de Salta y despidió a 150 trabajadores - "
+     "Página 12",
+     "3 ene 2024 ... La empresa Arcor confirmó el cierre de la planta de "
+     "producción en Salta, que dejará sin trabajo a 150 operarios ..."),
+]
+
+
+def _huella(titulo_snippet):
+    return simhash(texto_para_huella(*titulo_snippet))
+
+
+@pytest.mark.parametrize("copia", SINDICADAS[1:])
+def test_sindicadas_a_distancia_baja(copia):
+    assert distancia(_huella(SINDICADAS[0]), _huella(copia)) <= UMBRAL_HAMMING
+
+
+@pytest.mark.parametrize("otra", OTRAS)
+def test_notas_distintas_no_se_confunden(otra):
+    for copia in SINDICADAS:
+        assert distancia(_huella(copia), _huella(otra)) > UMBRAL_HAMMING
+
+
+def test_colapsar_deja_una_por_nota():
+    items = [{"title": t, "snippet": s} for t, s in SINDICADAS + OTRAS]
+    unicos = colapsar(items,
+                      lambda it: texto_para_huella(it["title"], it["snippet"]))
+    assert [it["title"] for it in unicos] == [
+        SINDICADAS[0][0], OTRAS[0][0], OTRAS[1][0]
+    ]
+
+
+def test_texto_sin_fecha_ni_medio():
+    texto = texto_para_huella(*SINDICADAS[0])
+    assert texto.startswith("Arcor invierte")
+    assert "La Voz" not in texto
+    assert "2024" not in texto
+    assert "..." not in texto
+
+
+def test_historial_separado_por_ubicacion():
+    assert (_clave_empresa("Arcor", "Córdoba") !=
+            _clave_empresa("Arcor", "Salta"))
+    assert (_clave_empresa("ARCOR", "Córdoba") ==
+            _clave_empresa("arcor", "cordoba"))
+
+
+def test_noticias_tardias_pasan_por_el_historial(monkeypatch):
+    guardadas = []
+
+    async def historial(empresa, ubicacion=""):
+        return {"noticias": [], "desde_dias": 0}
+
+    async def combinar_y_guardar(empresa, ubicacion, nuevas, previas):
+        guardadas.append((empresa, ubicacion, nuevas))
+        return nuevas
+
+    monkeypatch.setattr(news_dedup, "historial", historial)
+    monkeypatch.setattr(news_dedup, "combinar_y_guardar", combinar_y_guardar)
+    monkeypatch.setattr(mongodb, "get_database", lambda: None)
+
+    nota = {"titulo": "Arcor invierte en Córdoba", "url": "https://x.com/1"}
+    asyncio.run(
+        social_research._guardar_noticias_tardias("5493415551234", [nota],
+                                                  "arcor", "córdoba"))
+    assert guardadas == [("arcor", "córdoba", [nota])]
@@ -0,0 +1,52 @@
+"""Clave de rubro del cache de desafíos (services/challenges_research.py)"""
+import pytest
+
+from services.challenges_research import normalizar_rubro, _singular
+
+
+@pytest.mark.parametrize("rubro, esperado", [
+    ("Inmobiliarias", "inmobiliaria"),
+    ("Bienes Raíces", "inmobiliaria"),
+    ("real estate", "inmobiliaria"),
+    ("Restaurantes", "restaurante"),
+    ("Desarrollo de software", "software"),
+    ("Desarrollo de aplicaciones", "software"),
+    ("Abogados", "estudio juridico"),
+    ("Servicios legales", "estudio juridico"),
+    ("Empresa de construcción", "construccion"),
+    ("Consultorios médicos", "salud"),
+    ("Transporte de cargas", "logistica"),
+])
+def test_sinonimos(rubro, esperado):
+    assert normalizar_rubro(rubro) == esperado
+
+
+@pytest.mark.parametrize("rubro, esperado", [
+    # Palabras genéricas que son de otro rubro
+    ("Obra social", "obra social"),
+    ("Sistemas de riego", "sistema riego"),
+    ("Clínica dental", "odontologia"),
+    ("Bar", "bar"),
+    ("IT", "it"),
+    ("App de delivery", "app delivery"),
+    # Dos rubros: no se adivina
+    ("Inmobiliaria y construcción", "inmobiliaria construccion"),
+])
+def test_no_toma_rubro_ajeno(rubro, esperado):
+    assert normalizar_rubro(rubro) == esperado
+
+
+@pytest.mark.parametrize("plural, singular", [
+    ("hoteles", "hotel"),
+    ("consultores", "consultor"),
+    ("redes", "red"),
+    ("almacenes", "almacen"),
+    ("construcciones", "construccion"),
+    ("restaurantes", "restaurante"),
+    ("padres", "padre"),
+    ("viajes", "viaje"),
+    ("clases", "clase"),
+    ("luces", "luz"),
+])
+def test_singular(plural, singular):
+    assert _singular(plural) == singular
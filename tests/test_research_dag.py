@@ -0,0 +1,62 @@
+"""Etapas de la investigación en background (services/research_dag.py)"""
+import asyncio
+
+from services.research_dag import ejecutar_dag, ETAPAS_INVESTIGACION
+
+SALIDAS = {
+    "web": {
+        "empresa": "Fortia",
+        "rubro": "software"
+    },
+    "redes": {
+        "linkedin_data": {
+            "linkedin_personal": "https://linkedin.com/in/ana"
+        }
+    },
+    "noticias": {
+        "noticias_data": {
+            "noticias_empresa": "No se encontraron noticias"
+        }
+    },
+    "desafios": {
+        "desafios_data": {
+            "desafios": []
+        }
+    }
+}
+
+
+def _correr(datos_iniciales: dict, salidas: dict = SALIDAS) -> dict:
+    entradas = {}
+
+    def _fn(nombre):
+
+        async def fn(datos):
+            entradas[nombre] = datos
+            return salidas[nombre]
+
+        return fn
+
+    etapas = [{**e, "fn": _fn(e["nombre"])} for e in ETAPAS_INVESTIGACION]
+    resultado = asyncio.run(ejecutar_dag(etapas, datos_iniciales))
+    estados = {n: e["estado"] for n, e in resultado["etapas"].items()}
+    return {"estados": estados, "entradas": entradas}
+
+
+def test_noticias_sin_nombre_de_la_persona():
+    corrida = _correr({"web": "fortia.com.ar", "city": "Rosario"})
+    assert corrida["estados"]["redes"] == "omitida"
+    assert corrida["estados"]["noticias"] == "completada"
+    assert corrida["entradas"]["noticias"]["empresa"] == "Fortia"
+    assert corrida["entradas"]["noticias"]["city"] == "Rosario"
+
+
+def test_todas_las_etapas_con_nombre():
+    corrida = _correr({"web": "fortia.com.ar", "nombre": "Ana Pérez"})
+    assert set(corrida["estados"].values()) == {"completada"}
+
+
+def test_noticias_por_dominio_si_la_web_no_da_empresa():
+    salidas = {**SALIDAS, "web": {"rubro": "software"}}
+    corrida = _correr({"web": "https://www.fortia.com.ar/"}, salidas)
+    assert corrida["entradas"]["noticias"]["empresa"] == "fortia.com.ar"
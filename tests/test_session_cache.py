@@ -0,0 +1,112 @@
+"""Cache de sesiones (services/session_cache.py)"""
+import pytest
+
+from services import session_cache as modulo
+from services.session_cache import SessionCache
+
+PHONE = "5493415551234"
+
+
+class ColeccionFalsa:
+    """Un documento por colección; solo lo que usa el cache."""
+
+    def __init__(self, doc):
+        self.doc = doc
+        self.lecturas_version = 0
+
+    def find_one(self, filtro, proyeccion=None):
+        if proyeccion == {"version": 1, "_id": 0}:
+            self.lecturas_version += 1
+        return dict(self.doc) if self.doc else None
+
+    def aggregate(self, pipeline):
+        if not self.doc:
+            return []
+        mensajes = self.doc.get("mensajes", [])
+        return [{**self.doc, "total": len(mensajes)}]
+
+
+@pytest.fixture
+def db(monkeypatch):
+    db = {
+        "chat_history":
+        ColeccionFalsa({
+            "sessionId": PHONE,
+            "version": 1,
+            "mensajes": [{
+                "tipo": "human",
+                "texto": "Hola"
+            }]
+        }),
+        "leads_fortia":
+        ColeccionFalsa({
+            "phone_whatsapp": PHONE,
+            "version": 1,
+            "nombre": "Ana",
+            "reserva_estado": "pending"
+        })
+    }
+    lecturas = []
+
+    def find_lead_by_phone(phone):
+        lecturas.append(phone)
+        return db["leads_fortia"].find_one({})
+
+    monkeypatch.setattr(modulo, "get_database", lambda: db)
+    monkeypatch.setattr(modulo, "find_lead_by_phone", find_lead_by_phone)
+    db["lecturas_lead"] = lecturas
+    return db
+
+
+def test_lead_sin_cambios_no_se_relee(db):
+    cache = SessionCache(version_check_seconds=0)
+    cache.get_lead(PHONE)
+    cache.get_lead(PHONE)
+    assert len(db["lecturas_lead"]) == 1
+
+
+def test_hits_dentro_del_intervalo_no_leen_version(db):
+    cache = SessionCache(version_check_seconds=60)
+    for _ in range(3):
+        cache.get_history(PHONE)
+        cache.get_lead(PHONE)
+
+    assert db["chat_history"].lecturas_version == 0
+    assert db["leads_fortia"].lecturas_version == 0
+    assert len(db["lecturas_lead"]) == 1
+
+
+def test_invalidar_lead_relee_sin_esperar(db):
+    cache = SessionCache(version_check_seconds=60)
+    cache.get_lead(PHONE)
+    db["leads_fortia"].doc.update(reserva_estado="accepted", version=2)
+
+    cache.invalidar_lead(PHONE)
+    assert cache.get_lead(PHONE)["reserva_estado"] == "accepted"
+
+
+def test_lead_escrito_fuera_del_cache_se_relee(db):
+    cache = SessionCache(version_check_seconds=0)
+    assert cache.get_lead(PHONE)["reserva_estado"] == "pending"
+
+    # Webhook de Cal.com (update_lead_booking)
+    db["leads_fortia"].doc.update(reserva_estado="accepted", version=2)
+
+    assert cache.get_lead(PHONE)["reserva_estado"] == "accepted"
+    assert cache.stats()["recargas"] == 1
+
+
+def test_historial_escrito_por_otro_worker_se_relee(db):
+    cache = SessionCache(version_check_seconds=0)
+    assert len(cache.get_history(PHONE)) == 1
+
+    db["chat_history"].doc["mensajes"].append({
+        "tipo": "ai",
+        "texto": "¿Cómo te llamás?"
+    })
+    db["chat_history"].doc["version"] = 2
+
+    assert cache.get_history(PHONE)[-1]["content"] == "¿Cómo te llamás?"
+    assert cache.get_history(PHONE)[-1]["role"] == "assistant"
+    assert cache.total_mensajes(PHONE) == 2
+    assert cache.stats()["recargas"] == 1
@@ -0,0 +1,86 @@
+"""Streaming de respuestas por párrafos (services/openai_agent.py)"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from services import openai_agent, whatsapp
+from services.openai_agent import _completar_streaming, STREAM_CORTADO
+
+PARRAFO = "Te cuento cómo trabajamos. " * 10
+
+
+def _chunk(texto: str):
+    delta = SimpleNamespace(content=texto, tool_calls=None)
+    return SimpleNamespace(usage=None,
+                           choices=[SimpleNamespace(delta=delta)])
+
+
+class StreamCortado:
+    """Entrega los textos y después se corta la conexión."""
+
+    def __init__(self, textos: list):
+        self.textos = textos
+
+    async def __aiter__(self):
+        for texto in self.textos:
+            yield _chunk(texto)
+        raise ConnectionError("stream cortado")
+
+
+@pytest.fixture
+def enviados(monkeypatch):
+    enviados = []
+
+    async def send_whatsapp_message(to, texto):
+        enviados.append(texto)
+        return {"success": True}
+
+    monkeypatch.setattr(whatsapp, "send_whatsapp_message",
+                        send_whatsapp_message)
+    return enviados
+
+
+def _con_stream(monkeypatch, stream):
+
+    async def create(**kwargs):
+        return stream
+
+    cliente = SimpleNamespace(chat=SimpleNamespace(
+        completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr(openai_agent, "async_client", cliente)
+
+
+def test_corte_con_parrafos_enviados_cierra_sin_error(monkeypatch, enviados):
+    _con_stream(monkeypatch,
+                StreamCortado([PARRAFO, "\n\n", "Segundo párrafo a med"]))
+
+    content, tool_calls, _ = asyncio.run(
+        _completar_streaming([], "5493415551234", []))
+
+    assert tool_calls == []
+    assert enviados[0] == PARRAFO.strip()
+    assert enviados[-1] == STREAM_CORTADO
+    # Lo que queda en el historial es lo que le llegó al usuario, sin el
+    # aviso de corte
+    assert content == PARRAFO.strip()
+
+
+def test_corte_guarda_pendientes_sin_el_aviso(monkeypatch, enviados):
+    _con_stream(
+        monkeypatch,
+        StreamCortado([PARRAFO, "\n\n", "Breve.", "\n\n", "Tercero a med"]))
+
+    content, _, _ = asyncio.run(_completar_streaming([], "5493415551234",
+                                                     []))
+
+    assert enviados[-1] == f"Breve.\n\n{STREAM_CORTADO}"
+    assert content == f"{PARRAFO.strip()}\n\nBreve."
+
+
+def test_corte_sin_nada_enviado_propaga_el_error(monkeypatch, enviados):
+    _con_stream(monkeypatch, StreamCortado(["Hola"]))
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(_completar_streaming([], "5493415551234", []))
+    assert enviados == []
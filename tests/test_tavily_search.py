@@ -0,0 +1,26 @@
+"""Cliente Tavily (services/tavily_search.py)"""
+import asyncio
+
+from services import tavily_search as modulo
+from services.tavily_search import TavilyClient
+
+
+class CacheFalso:
+
+    def get(self, call_site, key):
+        raise RuntimeError("Mongo caído")
+
+    def set(self, call_site, key, value, ttl_seconds=0):
+        pass
+
+    def stats(self):
+        return {}
+
+
+def test_buscar_no_lanza_si_falla_el_cache(monkeypatch):
+    monkeypatch.setattr(modulo, "TAVILY_API_KEY", "clave")
+    cliente = TavilyClient()
+    cliente._cache = CacheFalso()
+
+    assert asyncio.run(cliente.buscar("desafíos retail")) == {}
+    assert cliente.stats()["errores"] == 1
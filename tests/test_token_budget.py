@@ -0,0 +1,22 @@
+"""Conteo de tokens y ventana de historial (utils/token_budget.py)"""
+import logging
+
+from utils import token_budget
+from utils.token_budget import count_tokens, window_messages
+
+
+def test_sin_encoding_aproxima_y_avisa(monkeypatch, caplog):
+    monkeypatch.setattr(token_budget, "ENCODING_NAME", "no_existe")
+    monkeypatch.setattr(token_budget, "_ENCODING", None)
+    monkeypatch.setattr(token_budget, "_ENCODING_CARGADO", False)
+
+    with caplog.at_level(logging.WARNING):
+        assert count_tokens("a" * 40) == 11
+        count_tokens("b" * 40)
+    # Se intenta cargar una sola vez
+    assert len([r for r in caplog.records if "[TOKENS]" in r.message]) == 1
+
+
+def test_ventana_conserva_el_ultimo_mensaje():
+    mensajes = [{"role": "user", "content": "hola " * 500}] * 3
+    assert window_messages(mensajes, 10) == mensajes[-1:]
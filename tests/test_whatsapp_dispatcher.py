@@ -0,0 +1,80 @@
+"""Dispatcher de salida de WhatsApp (services/whatsapp.py)"""
+import asyncio
+
+import httpx
+
+from services import whatsapp as modulo
+from services.whatsapp import OutboundDispatcher
+
+
+def _dispatcher(monkeypatch, handler):
+    monkeypatch.setenv("WHATSAPP_TOKEN", "token")
+    monkeypatch.setenv("WHATSAPP_PHONE_NUMBER_ID", "123")
+    monkeypatch.setattr(modulo, "RETRY_BASE_SECONDS", 0)
+    monkeypatch.setattr(modulo.status_buffer, "record_sent",
+                        lambda *a, **k: None)
+    dispatcher = OutboundDispatcher(messages_per_second=0, max_retries=3)
+    dispatcher._client = httpx.AsyncClient(
+        transport=httpx.MockTransport(handler))
+    return dispatcher
+
+
+def _ok(request):
+    return httpx.Response(200, json={"messages": [{"id": "wamid.1"}]})
+
+
+def test_falla_una_parte_y_el_worker_descarta_el_resto(monkeypatch):
+    cuerpos = []
+
+    def handler(request):
+        cuerpos.append(request.content)
+        return httpx.Response(400, text="bad request")
+
+    async def correr():
+        dispatcher = _dispatcher(monkeypatch, handler)
+        lote = {"fallido": False}
+        futures = [
+            dispatcher.submit("549341", {"parte": i}, lote) for i in range(3)
+        ]
+        return dispatcher, [await f for f in futures]
+
+    dispatcher, resultados = asyncio.run(correr())
+    assert len(cuerpos) == 1
+    assert [r["success"] for r in resultados] == [False, False, False]
+    assert dispatcher.stats()["descartados"] == 2
+
+
+def test_5xx_no_se_reintenta(monkeypatch):
+    llamadas = []
+
+    def handler(request):
+        llamadas.append(1)
+        return httpx.Response(503, text="unavailable")
+
+    async def correr():
+        dispatcher = _dispatcher(monkeypatch, handler)
+        return await dispatcher.submit("549341", {"parte": 0})
+
+    assert not asyncio.run(correr())["success"]
+    assert len(llamadas) == 1
+
+
+def test_429_y_error_de_conexion_se_reintentan(monkeypatch):
+    respuestas = [
+        httpx.ConnectError("refused"),
+        httpx.Response(429, text="throttled"), None
+    ]
+
+    def handler(request):
+        respuesta = respuestas.pop(0)
+        if isinstance(respuesta, Exception):
+            raise respuesta
+        return respuesta or _ok(request)
+
+    async def correr():
+        dispatcher = _dispatcher(monkeypatch, handler)
+        return dispatcher, await dispatcher.submit("549341", {"parte": 0})
+
+    dispatcher, resultado = asyncio.run(correr())
+    assert resultado["success"]
+    assert dispatcher.stats()["reintentos"] == 2
@@ -37,7 +37,15 @@ TOOLS = [{
         "Verifica si la investigación en background terminó y retorna el rubro. LLAMAR DESPUÉS de pregunta 3/4 y ANTES de pregunta 4/4.",
         "parameters": {
             "type": "object",
-            "properties": {},
+            "properties": {
+                "para": {
+                    "type":
+                    "string",
+                    "enum": ["desafios", "reporte"],
+                    "description":
+                    "desafios: espera rubro y desafíos. reporte: espera también LinkedIn y noticias."
+                }
+            },
             "required": []
         }
     }
@@ -332,6 +340,41 @@ TOOLS = [{
     }
 }]
 
+# =============================================================================
+# TOOLS POR ETAPA DE LA CONVERSACIÓN
+# =============================================================================
+# Solo se envían las tools válidas en cada etapa (ver detectar_etapa en
+# services/agent_state.py). Se respeta el orden de TOOLS para que el
+# prefijo del request sea idéntico entre turnos de la misma etapa.
+TOOLS_POR_ETAPA = {
+    # Onboarding / flujo sin web: todavía no se lanzó la investigación
+    "captacion": {
+        "extraer_datos_web_cliente", "buscar_redes_personales",
+        "investigar_desafios_empresa", "buscar_web_tavily",
+        "guardar_lead_mongodb", "buscar_info_dania"
+    },
+    # Investigación lanzada, preguntas de calificación y reporte
+    "investigacion": {
+        "extraer_datos_web_cliente", "verificar_investigacion_completa",
+        "buscar_redes_personales", "investigar_desafios_empresa",
+        "buscar_web_tavily", "guardar_lead_mongodb", "buscar_info_dania"
+    },
+    # Lead guardado: derivación, Cal.com y consultas
+    "derivacion": {
+        "buscar_web_tavily", "gestionar_calcom", "buscar_info_dania",
+        "resumir_conversacion"
+    },
+}
+
+
+def tools_para_etapa(etapa: str) -> list:
+    """Subconjunto de TOOLS para la etapa (todas si no se conoce)."""
+    nombres = TOOLS_POR_ETAPA.get(etapa)
+    if not nombres:
+        return TOOLS
+    return [t for t in TOOLS if t["function"]["name"] in nombres]
+
+
 # =============================================================================
 # SYSTEM PROMPT - VERSIÓN 2.1 - FIX ORDEN CORRECTO
 # =============================================================================
@@ -497,11 +540,13 @@ Cuando el tool retorne {"status": "ready"}, hacer inmediatamente:
 PASO 3: Verificar investigación + Mostrar desafíos
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 DESPUÉS de pregunta 3/4, llamar: verificar_investigacion_completa
+(para="desafios")
 
-Este tool espera a que termine el background y retorna:
+Este tool espera el rubro y los desafíos (no LinkedIn ni noticias) y
+retorna:
 - rubro: actividad de la empresa
-- datos: toda la info extraída (web, LinkedIn, etc.)
-- desafios_rubro: lista de desafíos investigados
+- datos: la info ya disponible (web, desafios_rubro...)
+- pendiente: campos que todavía se están buscando
 
 Mostrar TODOS los desafíos de desafios_rubro (normalmente 8):
 "Según mi investigación, las empresas de [rubro] en [país] suelen enfrentar:
@@ -527,6 +572,8 @@ Si el usuario pregunta "¿qué es X?" o "¿a qué te referís?":
 PASO 4: Mostrar REPORTE COMPLETO
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 Usar los DATOS del resultado de verificar_investigacion_completa.
+Si ese resultado tenía campos en "pendiente", llamar antes
+verificar_investigacion_completa(para="reporte").
 
 "Encontré esta información:
 
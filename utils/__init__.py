@@ -1,4 +1,5 @@
 """
 Utils package
 """
-from .text_cleaner import clean_markdown_formatting, clean_url, normalize_phone, filter_valid_email
+from .text_cleaner import clean_markdown_formatting, clean_url, normalize_phone, filter_valid_email, fold_accents
+from .token_budget import count_tokens, pack_content, window_messages
@@ -3,6 +3,7 @@ Utilidades de limpieza de texto para DANIA/Fortia
 Incluye: limpieza de Markdown, normalización de links
 """
 import re
+import unicodedata
 
 
 def clean_markdown_formatting(text: str) -> str:
@@ -42,6 +43,18 @@ def clean_markdown_formatting(text: str) -> str:
     return text.strip()
 
 
+def fold_accents(text: str) -> str:
+    """
+    Quita acentos y diacríticos (á→a, ñ→n, ü→u).
+    Útil para comparar textos escritos con y sin tildes.
+    """
+    if not text:
+        return ""
+    
+    normalizado = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in normalizado if not unicodedata.combining(c))
+
+
 def clean_url(url: str) -> str:
     """
     Limpia y normaliza una URL.
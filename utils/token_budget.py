@@ -0,0 +1,218 @@
+"""
+Empaquetado de contenido por presupuesto de tokens para DANIA/Fortia
+Reemplaza los recortes ciegos (contenido[:N]) en los prompts de GPT:
+divide en chunks, los puntúa por densidad de keywords y llena el
+presupuesto con los mejores, respetando el orden original.
+"""
+import re
+import logging
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# o200k_base (gpt-4o) existe desde tiktoken 0.7
+ENCODING_NAME = "o200k_base"
+# Aproximación cuando tiktoken no está disponible (≈4 chars por token)
+CHARS_POR_TOKEN = 4
+
+# Se carga en el primer uso: get_encoding baja el BPE por red
+_ENCODING = None
+_ENCODING_CARGADO = False
+
+
+def _encoding():
+    """Encoding de tiktoken (None si no se pudo cargar: se aproxima)."""
+    global _ENCODING, _ENCODING_CARGADO
+    if not _ENCODING_CARGADO:
+        _ENCODING_CARGADO = True
+        try:
+            import tiktoken
+            _ENCODING = tiktoken.get_encoding(ENCODING_NAME)
+        except Exception as e:
+            logger.warning(f"[TOKENS] Sin tiktoken ({ENCODING_NAME}): {e}; "
+                           f"se aproxima a {CHARS_POR_TOKEN} chars por token")
+    return _ENCODING
+CHUNK_MAX_CHARS = 600
+
+# ═══════════════════════════════════════════════════════════════════
+# KEYWORDS POR CATEGORÍA (extracción web)
+# ═══════════════════════════════════════════════════════════════════
+KEYWORDS_EXTRACCION = {
+    "contacto": [
+        "contacto", "contactanos", "contáctanos", "contact", "email",
+        "e-mail", "correo", "@", "teléfono", "telefono", "tel:", "tel.",
+        "whatsapp", "wa.me", "llamanos", "escribinos", "horario",
+        "atención", "atencion", "linkedin", "instagram", "facebook"
+    ],
+    "direccion": [
+        "dirección", "direccion", "domicilio", "calle", "avenida", "av.",
+        "piso", "oficina", "local", "ciudad", "provincia", "cp ",
+        "código postal", "codigo postal", "address", "ubicación",
+        "ubicacion", "sucursal", "sede"
+    ],
+    "equipo": [
+        "equipo", "nosotros", "quiénes somos", "quienes somos", "team",
+        "about", "fundador", "fundadora", "director", "directora", "ceo",
+        "gerente", "socio", "socia", "staff", "historia"
+    ],
+    "servicios": [
+        "servicios", "servicio", "productos", "producto", "soluciones",
+        "ofrecemos", "brindamos", "especialistas", "services", "products",
+        "clientes", "rubro", "industria"
+    ],
+}
+
+KEYWORDS_DESAFIOS = {
+    "desafios": [
+        "desafío", "desafio", "reto", "problema", "dificultad", "riesgo",
+        "tendencia", "challenge", "trend", "costos", "competencia",
+        "escasez", "regulación", "regulacion", "digitalización",
+        "digitalizacion", "automatización", "automatizacion", "inflación",
+        "inflacion", "demanda", "crecimiento"
+    ],
+}
+
+
+def count_tokens(text: str) -> int:
+    """Cuenta tokens localmente (tiktoken si está instalado, sino aproxima)."""
+    if not text:
+        return 0
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return len(text) // CHARS_POR_TOKEN + 1
+
+
+def split_chunks(content: str, max_chars: int = CHUNK_MAX_CHARS) -> List[str]:
+    """
+    Divide el contenido en chunks por párrafos.
+    Junta párrafos cortos (menús, links) y parte los muy largos.
+    """
+    chunks = []
+    actual = ""
+
+    for parrafo in re.split(r'\n\s*\n', content):
+        parrafo = parrafo.strip()
+        if not parrafo:
+            continue
+
+        while len(parrafo) > max_chars:
+            corte = parrafo.rfind("\n", 0, max_chars)
+            if corte < max_chars // 2:
+                corte = parrafo.rfind(" ", 0, max_chars)
+            if corte < max_chars // 2:
+                corte = max_chars
+            if actual:
+                chunks.append(actual)
+                actual = ""
+            chunks.append(parrafo[:corte].strip())
+            parrafo = parrafo[corte:].strip()
+
+        if actual and len(actual) + len(parrafo) + 2 > max_chars:
+            chunks.append(actual)
+            actual = parrafo
+        else:
+            actual = actual + "\n\n" + parrafo if actual else parrafo
+
+    if actual:
+        chunks.append(actual)
+
+    return chunks
+
+
+def score_chunk(chunk: str, keywords: Dict[str, List[str]]) -> float:
+    """
+    Puntúa un chunk por densidad de keywords (hits cada 100 palabras).
+    Cada categoría presente suma un bonus para premiar chunks variados.
+    """
+    texto = chunk.lower()
+    palabras = max(len(texto.split()), 1)
+
+    hits = 0
+    categorias = 0
+    for lista in keywords.values():
+        hits_cat = sum(texto.count(kw) for kw in lista)
+        if hits_cat:
+            hits += hits_cat
+            categorias += 1
+
+    return hits * 100.0 / palabras + categorias * 2
+
+
+def pack_content(content: str,
+                 max_tokens: int,
+                 keywords: Optional[Dict[str, List[str]]] = None,
+                 separator: str = "\n\n") -> str:
+    """
+    Llena un presupuesto de tokens con los chunks más relevantes.
+
+    Args:
+        content: Texto completo (markdown, HTML, artículos...)
+        max_tokens: Presupuesto de tokens para el contenido
+        keywords: {categoria: [keywords]} para puntuar (default: extracción web)
+        separator: Separador entre chunks en la salida
+
+    Returns:
+        Contenido empaquetado, con los chunks en su orden original.
+    """
+    if not content:
+        return ""
+
+    if count_tokens(content) <= max_tokens:
+        return content
+
+    keywords = keywords or KEYWORDS_EXTRACCION
+    chunks = split_chunks(content)
+
+    candidatos = []
+    for i, chunk in enumerate(chunks):
+        # Desempate: a igual score, preferir chunks más arriba
+        candidatos.append((score_chunk(chunk, keywords), -i, i, chunk))
+    candidatos.sort(reverse=True)
+
+    sep_tokens = count_tokens(separator)
+    usados = 0
+    elegidos = []
+    for _, _, i, chunk in candidatos:
+        tokens = count_tokens(chunk) + sep_tokens
+        if usados + tokens > max_tokens:
+            continue
+        elegidos.append(i)
+        usados += tokens
+
+    if not elegidos:
+        # Ningún chunk entra entero: recortar el mejor al presupuesto
+        mejor = candidatos[0][3]
+        return mejor[:max_tokens * CHARS_POR_TOKEN]
+
+    elegidos.sort()
+    logger.info(f"[PACKER] {len(elegidos)}/{len(chunks)} chunks, "
+                f"~{usados}/{max_tokens} tokens")
+
+    return separator.join(chunks[i] for i in elegidos)
+
+
+def window_messages(messages: List[dict], max_tokens: int) -> List[dict]:
+    """
+    Ventana de historial por presupuesto de tokens.
+    Recorre del mensaje más nuevo al más viejo y corta cuando el
+    siguiente ya no entra. Siempre conserva el último mensaje.
+
+    Args:
+        messages: [{"role": ..., "content": ...}] en orden cronológico
+        max_tokens: Presupuesto para el historial
+
+    Returns:
+        Los mensajes más recientes que entran, en orden cronológico.
+    """
+    ventana = []
+    usados = 0
+    for msg in reversed(messages):
+        # ~4 tokens de overhead por mensaje en el formato de chat
+        tokens = count_tokens(msg.get("content") or "") + 4
+        if ventana and usados + tokens > max_tokens:
+            break
+        ventana.append(msg)
+        usados += tokens
+    ventana.reverse()
+    return ventana